@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Incremental build state shared by the Sensitive Beings build scripts.
+Records size, mtime and SHA-256 of every input and output so reruns only
+redo the steps whose files actually changed, and caches parsed archive
+members so a changed deck only re-parses the parts that changed.
+"""
+
+import os
+import json
+import hashlib
+
+from file_placement import place_file
+
+BUILD_STATE_FILE = ".build_state.json"
+STATE_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+MEMBER_CACHE_DIR = ".cache/members"
+MEMBER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def hash_file(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class BuildState:
+    """
+    Persistent record of file fingerprints and build steps.
+    A step is fresh when its parameters match and every input and output it
+    recorded last time still has the same content. Hashes are only
+    recomputed when a file's size or mtime moved, so a no-op rebuild is a
+    stat() per file.
+    """
+
+    def __init__(self, path=BUILD_STATE_FILE, force=False):
+        self.path = path
+        self.force = force
+        self.files = {}
+        self.steps = {}
+        self.dirty = False
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('version') == STATE_VERSION:
+                    self.files = state.get('files', {})
+                    self.steps = state.get('steps', {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable build state {path}: {e}")
+
+    def fingerprint(self, path):
+        """Content hash of path, or None if it does not exist"""
+        path = str(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        known = self.files.get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        sha256 = hash_file(path)
+        self.files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        self.dirty = True
+        return sha256
+
+    def assume(self, path, sha256):
+        """Record a known content hash for path without reading it again"""
+        stat = os.stat(path)
+        self.files[str(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+        self.dirty = True
+
+    def is_fresh(self, step, inputs, params=None):
+        """True if step already ran on these exact inputs and its outputs are untouched"""
+        if self.force:
+            return False
+
+        record = self.steps.get(step)
+        if not record or record.get('params') != params:
+            return False
+        if sorted(record['inputs']) != sorted(str(p) for p in inputs):
+            return False
+
+        recorded = list(record['inputs'].items()) + list(record['outputs'].items())
+        return all(self.fingerprint(path) == sha256 for path, sha256 in recorded)
+
+    def record(self, step, inputs, outputs, params=None):
+        """Remember a finished step with the current fingerprints of its files"""
+        self.steps[step] = {
+            'params': params,
+            'inputs': {str(p): self.fingerprint(p) for p in inputs},
+            'outputs': {str(p): self.fingerprint(p) for p in outputs}
+        }
+        self.dirty = True
+
+    def outputs(self, step):
+        """Outputs recorded for step, in the order they were recorded"""
+        record = self.steps.get(step)
+        return list(record['outputs']) if record else []
+
+    def adopt_output(self, path):
+        """
+        Accept path's current content as the output of whichever steps
+        produced it, so a later in-place rewrite (e.g. an optimizer pass)
+        does not make those steps run again and undo it.
+        """
+        path = str(path)
+        sha256 = self.fingerprint(path)
+        for record in self.steps.values():
+            if path in record['outputs']:
+                record['outputs'][path] = sha256
+                self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        # Write atomically so an interrupted run never leaves half a state file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'files': self.files, 'steps': self.steps}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+def place_if_changed(state, source, destination, strategy='copy'):
+    """
+    Place source at destination (see file_placement.place_file) unless that
+    exact file is already in place. Returns the method used, or None if the
+    destination was already current.
+    """
+    step = f"copy:{destination}"
+    params = {'strategy': strategy}
+    if state.is_fresh(step, [source], params):
+        return None
+
+    method = place_file(source, destination, strategy)
+    # The destination has the source's content, no need to hash it twice
+    state.assume(destination, state.fingerprint(source))
+    state.record(step, [source], [destination], params)
+    return method
+
+class MemberCache:
+    """
+    On-disk cache of parse results for zip members, keyed by member name and
+    the CRC32/size the zip central directory already gives us for free.
+    Each entry is one small JSON file; reading an entry bumps its mtime and
+    the least recently used entries are evicted once the cache outgrows
+    max_bytes. Safe to share between worker processes.
+    """
+
+    def __init__(self, cache_dir=MEMBER_CACHE_DIR, max_bytes=MEMBER_CACHE_MAX_BYTES, namespace=''):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._total = None
+
+    def __getstate__(self):
+        # Workers rescan the directory size themselves
+        state = self.__dict__.copy()
+        state['_total'] = None
+        return state
+
+    def _entry_path(self, info):
+        key = f"{self.namespace}:{info.filename}:{info.CRC:08x}:{info.file_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, info):
+        """Cached value for a zipfile.ZipInfo, or None"""
+        path = self._entry_path(info)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    def put(self, info, value):
+        """Store a JSON-serialisable value for a zipfile.ZipInfo"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._entry_path(info)
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        if self._total is None:
+            self._total = sum(entry.stat().st_size for entry in self._entries())
+        else:
+            self._total += len(data)
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        try:
+            return [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+        except OSError:
+            return []
+
+    def evict(self):
+        """Drop least recently used entries until the cache is back to 3/4 of max_bytes"""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 3 // 4
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total = total
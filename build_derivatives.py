@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Build responsive image derivatives for the Sensitive Beings exhibition website.
+Every image used by the pages, the artwork database or the image manifest is
+resized to a set of widths in AVIF and WebP, recorded in image_derivatives.json,
+and the pages' <img> tags are wrapped in <picture> elements with srcset/sizes so
+phones download a small version instead of the multi-MB original.
+
+Requires Pillow (pip install Pillow); AVIF output needs Pillow 11.2+ or the
+pillow-avif-plugin package and is skipped when unavailable.
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import argparse
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  registers the AVIF plugin on older Pillow
+except ImportError:
+    pass
+
+from build_cache import BuildState
+from parallel_jobs import run_tasks, report_errors
+
+DERIVED_DIR = "images/derived"
+DERIVATIVES_MANIFEST = "image_derivatives.json"
+# Bump when derived_dir_for changes so derivatives are rebuilt at their new paths
+DERIVED_LAYOUT = 2
+PAGES = ["index.html", "artworks.html", "workshops.html"]
+
+# Width buckets in CSS pixels times common device pixel ratios
+WIDTHS = [320, 640, 960, 1280, 1920]
+FORMATS = ['avif', 'webp']
+QUALITY = {'avif': 50, 'webp': 75}
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+# sizes attribute per image class, matching the max-widths in the stylesheets
+SIZES = {
+    'chapter-image': '(max-width: 700px) 100vw, 700px',
+    'artist-image': '(max-width: 400px) 100vw, 400px',
+    'artwork-image': '(max-width: 500px) 100vw, 500px',
+    'workshop-image': '100vw'
+}
+DEFAULT_SIZES = '(max-width: 768px) 100vw, 600px'
+
+IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.DOTALL)
+PICTURE_PATTERN = re.compile(r'<picture class="responsive-image"[^>]*>\s*(?:<source\b[^>]*>\s*)*(<img\b[^>]*>)\s*</picture>', re.DOTALL)
+ATTRIBUTE_PATTERN = re.compile(r'([\w-]+)="([^"]*)"')
+
+def available_formats():
+    """Requested output formats this Pillow build can encode"""
+    formats = []
+    for fmt in FORMATS:
+        if fmt == 'avif':
+            supported = 'AVIF' in Image.SAVE or (hasattr(features, 'check') and features.check('avif'))
+        else:
+            supported = fmt.upper() in Image.SAVE
+        if supported:
+            formats.append(fmt)
+        else:
+            print(f"⚠️  Pillow cannot write {fmt.upper()} here, skipping it")
+    return formats
+
+def derived_dir_for(source):
+    """images/derived/<source path with its extension as _ext>, made URL-safe (foo.png -> foo_png/)"""
+    stem, suffix = os.path.splitext(Path(source).as_posix())
+    return Path(DERIVED_DIR) / re.sub(r'[^A-Za-z0-9._/-]+', '_', f"{stem}_{suffix.lstrip('.')}" if suffix else stem)
+
+def target_widths(original_width, widths=WIDTHS):
+    """Width buckets narrower than the original, plus the original if it is smaller than the largest bucket"""
+    chosen = [w for w in widths if w < original_width]
+    if original_width < widths[-1]:
+        chosen.append(original_width)
+    return chosen
+
+def build_image(source, widths, formats):
+    """Resize one image to every width and format; returns its manifest entry"""
+    out_dir = derived_dir_for(source)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+
+        entry = {'width': img.width, 'height': img.height, 'variants': {fmt: [] for fmt in formats}}
+        for width in target_widths(img.width, widths):
+            height = max(1, round(img.height * width / img.width))
+            resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+
+            for fmt in formats:
+                path = out_dir / f"{width}w.{fmt}"
+                resized.save(path, fmt.upper(), quality=QUALITY[fmt])
+                entry['variants'][fmt].append({'width': width, 'path': path.as_posix(), 'size': path.stat().st_size})
+
+    return entry
+
+def collect_sources(pages):
+    """Local images referenced by the pages, the artwork database and the image manifest"""
+    sources = []
+
+    for page in pages:
+        if not os.path.exists(page):
+            continue
+        with open(page, 'r', encoding='utf-8') as f:
+            for tag in IMG_PATTERN.findall(f.read()):
+                src = dict(ATTRIBUTE_PATTERN.findall(tag)).get('src')
+                if src:
+                    sources.append(html.unescape(src))
+
+    if os.path.exists('artwork_database.json'):
+        with open('artwork_database.json', 'r', encoding='utf-8') as f:
+            database = json.load(f)
+        for chapter in database.values():
+            for artist in chapter.get('artists', []):
+                sources.extend(artwork['image'] for artwork in artist.get('artworks', []) if artwork.get('image'))
+
+    if os.path.exists('image_manifest.json'):
+        with open('image_manifest.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        for images in manifest.get('artists', {}).values():
+            sources.extend(f"images/{image['path']}" for image in images)
+        sources.extend(f"images/{image['path']}" for image in manifest.get('general_images', []))
+
+    # Keep first-seen order, drop remote and missing files
+    seen = set()
+    result = []
+    for source in sources:
+        if source in seen or '://' in source or not os.path.isfile(source):
+            continue
+        seen.add(source)
+        result.append(source)
+    return result
+
+def srcset(variants):
+    return ', '.join(f"{variant['path']} {variant['width']}w" for variant in variants)
+
+def picture_markup(img_tag, entry):
+    """Wrap an <img> in a <picture> offering the derivatives, keeping the original as fallback"""
+    attributes = dict(ATTRIBUTE_PATTERN.findall(img_tag))
+    sizes = SIZES.get(attributes.get('class', ''), DEFAULT_SIZES)
+
+    # Intrinsic size lets the browser reserve space before anything loads
+    img_tag = re.sub(r'\s(?:width|height)="[^"]*"', '', img_tag)
+    img_tag = re.sub(r'\s*/?>$', f' width="{entry["width"]}" height="{entry["height"]}">', img_tag)
+
+    sources = ''.join(
+        f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset(variants)}" sizes="{sizes}">'
+        for fmt, variants in entry['variants'].items() if variants
+    )
+    # display: contents keeps the existing img styling and layout untouched
+    return f'<picture class="responsive-image" style="display: contents">{sources}{img_tag}</picture>'
+
+def rewrite_page(page, derivatives):
+    """Rewrite a page's <img> tags to responsive <picture> elements; returns the number rewritten"""
+    with open(page, 'r', encoding='utf-8') as f:
+        original = f.read()
+
+    # Unwrap pictures from an earlier run so the rewrite is idempotent
+    content = PICTURE_PATTERN.sub(lambda m: m.group(1), original)
+    rewritten = 0
+
+    def replace(match):
+        nonlocal rewritten
+        tag = match.group(0)
+        src = html.unescape(dict(ATTRIBUTE_PATTERN.findall(tag)).get('src', ''))
+        entry = derivatives.get(src)
+        if not entry or not any(entry['variants'].values()):
+            return tag
+        rewritten += 1
+        return picture_markup(tag, entry)
+
+    content = IMG_PATTERN.sub(replace, content)
+    if content != original:
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(content)
+    return rewritten
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build responsive AVIF/WebP image derivatives")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="worker processes (0 = one per CPU, default: 0)")
+    parser.add_argument("--force", action="store_true", help="rebuild every derivative")
+    parser.add_argument("--no-rewrite", action="store_true", help="only build derivatives, leave the pages alone")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if Image is None:
+        print("❌ Pillow is required to build derivatives: pip install Pillow")
+        sys.exit(1)
+
+    formats = available_formats()
+    if not formats:
+        print("❌ No supported output format")
+        sys.exit(1)
+
+    derivatives = {}
+    if os.path.exists(DERIVATIVES_MANIFEST):
+        with open(DERIVATIVES_MANIFEST, 'r', encoding='utf-8') as f:
+            derivatives = json.load(f)
+
+    state = BuildState(force=args.force)
+    params = {'widths': WIDTHS, 'formats': formats, 'quality': QUALITY, 'layout': DERIVED_LAYOUT}
+    sources = collect_sources(PAGES)
+
+    # Only images whose source or derivatives changed are rebuilt
+    stale = [source for source in sources
+             if not (source in derivatives and state.is_fresh(f"derive:{source}", [source], params))]
+    print(f"🖼️  {len(sources)} images, {len(stale)} need derivatives")
+
+    results = run_tasks(build_image, [(source, WIDTHS, formats) for source in stale], args.jobs)
+
+    errors = []
+    for source, (entry, error) in zip(stale, results):
+        if error:
+            errors.append((source, error))
+            continue
+        derivatives[source] = entry
+        outputs = [variant['path'] for variants in entry['variants'].values() for variant in variants]
+        state.record(f"derive:{source}", [source], outputs, params)
+
+    derivatives = {source: derivatives[source] for source in sources if source in derivatives}
+    with open(DERIVATIVES_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(derivatives, f, indent=2, ensure_ascii=False)
+    state.save()
+
+    original_bytes = sum(os.path.getsize(source) for source in derivatives)
+    smallest_bytes = sum(min((v['size'] for vs in entry['variants'].values() for v in vs), default=0)
+                         for entry in derivatives.values())
+    print(f"📉 Originals: {original_bytes / 1e6:.1f} MB, smallest derivatives: {smallest_bytes / 1e6:.1f} MB")
+
+    if not args.no_rewrite:
+        for page in PAGES:
+            if os.path.exists(page):
+                print(f"📝 {page}: {rewrite_page(page, derivatives)} images made responsive")
+
+    if report_errors(errors):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Join the Sensitive Beings catalog facts from their three sources: the RTF
+artwork cards, the price list (extracted_content/pricing.json) and the
+artwork slides of the presentation (extracted_content/artist and
+artwork.json). Every source is parsed into records, artist and title
+names are normalized into keys, each source is indexed by key and the
+records are merged in one pass. Sources that disagree about a size,
+year, price or medium are reported; sizes are compared in centimetres,
+so "22.5 x 30 inches" and "57 cm × 76 cm" agree. The artist slides that
+introduce each artist give their name as they write it and a short bio.
+"""
+
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+from itertools import permutations
+
+from rtf_cards import parse_cards, normalize_spaces, normalize_price, normalize_dimensions
+from name_matching import NameMatcher, MATCH_THRESHOLD, name_key, artist_key
+from image_probe import find_image
+
+PRICING_FILE = "extracted_content/pricing.json"
+SLIDES_FILE = "extracted_content/artist and artwork.json"
+CATALOG_FILE = "catalog.json"
+
+# Earlier sources win when they disagree
+SOURCE_PRIORITY = ['cards', 'pricing', 'slides']
+
+# Fields joined across sources, and compared for conflicts
+FACT_FIELDS = ['medium', 'dimensions', 'year', 'price']
+
+# "Title:", "Materials：", "Size？" ... as written on the slides and in the price list
+LABEL = re.compile(r'(Title|Materials?|Techniques|Size|Dimensions|Year)\s*[:：？?]')
+LABEL_FIELDS = {
+    'title': 'title',
+    'material': 'medium',
+    'materials': 'medium',
+    'techniques': 'techniques',
+    'size': 'dimensions',
+    'dimensions': 'dimensions',
+    'year': 'year'
+}
+
+# Catalog numbers on the artwork slides: "2.15" is chapter 2, artwork 15
+CATALOG_NUMBER = re.compile(r'(\d)\.\s?(\d{1,2})')
+
+YEAR = re.compile(r'\b(?:19|20)\d\d\b')
+TRAILING_YEAR = re.compile(r'^(.*\D)((?:19|20)\d\d)$')
+DIMENSIONS = re.compile(
+    r'\d+(?:\.\d+)?\s*(?:inches|in|cm|mm)?\s*[x×]\s*\d+(?:\.\d+)?'
+    r'(?:\s*(?:inches|in|cm|mm)?\s*[x×]\s*\d+(?:\.\d+)?)?\s*(?:inches|in|cm|mm)?'
+)
+PRICE = re.compile(r'^(?:\$|PoA$)', re.IGNORECASE)
+
+# Price list cells that are column headings, not data
+PRICING_HEADINGS = {'artwork price list', 'additional artwork price list', 'artist name', 'artwork', 'photo', 'price'}
+
+# Title similarity (see name_matching.py) a record needs to join an artwork of another source
+JOIN_THRESHOLD = 0.8
+
+# Share of a catalog title's words a short title must cover to stand for it
+CONTAINMENT_THRESHOLD = 0.25
+
+# An artist bio starts at the first run this long (or one that carries on the name)
+BIO_MIN_LENGTH = 40
+
+# Sizes within this many centimetres (or this fraction) of each other agree
+SIZE_TOLERANCE_CM = 1.0
+SIZE_TOLERANCE = 0.03
+
+def title_key(value):
+    """Title without case, punctuation or spacing, so "Ec ho" and "Echo" agree"""
+    return name_key(value).replace(' ', '')
+
+def record_key(record):
+    return artist_key(record.get('artist', '')), title_key(record['title'])
+
+def clean_record(record):
+    """Normalize the free-text fields of a parsed record in place; returns it"""
+    for field in list(record):
+        if isinstance(record[field], str):
+            record[field] = normalize_spaces(record[field])
+
+    if 'year' in record:
+        year = YEAR.search(record['year'])
+        if year:
+            record['year'] = year.group()
+        else:
+            del record['year']
+    if 'dimensions' in record:
+        if re.search(r'\d', record['dimensions']):
+            # "57.× 76 cm" and "129 × 172 cm." lose their stray full stops
+            record['dimensions'] = normalize_dimensions(re.sub(r'(\d)\.(?!\d)', r'\1', record['dimensions']).rstrip('.'))
+        else:
+            del record['dimensions']
+    if 'price' in record:
+        record['price'] = normalize_price(record['price'])
+    return {field: value for field, value in record.items() if value}
+
+def split_labels(text):
+    """[(field or None, text)] pieces of text split at its labels"""
+    pieces = []
+    field = None
+    pos = 0
+    for match in LABEL.finditer(text):
+        pieces.append((field, text[pos:match.start()]))
+        field = LABEL_FIELDS[match.group(1).lower()]
+        pos = match.end()
+    pieces.append((field, text[pos:]))
+    return [(field, value.strip()) for field, value in pieces if field or value.strip()]
+
+# Slides
+
+def slide_runs(content):
+    """
+    (text, glued) for the non-empty text runs of a slide; glued is True when
+    the run directly follows another run, i.e. the two belong to one line.
+    Lone colons and split catalog numbers ("2." "8") are joined back on.
+    """
+    runs = []
+    glued = False
+    for run in content:
+        if not run:
+            glued = False
+            continue
+        if runs and glued and (re.fullmatch(r'[:：？?]+', run) or (re.search(r'\d\.$', runs[-1][0]) and run.isdigit())):
+            runs[-1] = (runs[-1][0] + run, runs[-1][1])
+        elif runs and re.fullmatch(r'[:：]', run):
+            runs[-1] = (runs[-1][0] + run, runs[-1][1])
+        else:
+            runs.append((run, glued))
+        glued = True
+    return runs
+
+def parse_slide(slide):
+    """
+    Artwork records on one slide. A record starts at a catalog number or a
+    "Title:" label; labelled values run on over the pieces of a split line,
+    and unlabelled lines fill title, medium, size and year in that order.
+    """
+    records = []
+    block = None
+    pending = None
+
+    def start(catalog=None):
+        block = {'slide': slide['slide']}
+        if catalog:
+            block['catalog'] = f"{catalog.group(1)}.{int(catalog.group(2))}"
+            block['chapter'] = f"chapter{catalog.group(1)}"
+        records.append(block)
+        return block
+
+    for text, glued in slide_runs(slide.get('content', [])):
+        catalog = CATALOG_NUMBER.fullmatch(text)
+        if catalog:
+            block = start(catalog)
+            pending = None
+            continue
+
+        for field, value in split_labels(text):
+            if field:
+                if field == 'title' and (block is None or 'title' in block):
+                    block = start()
+                if block is not None:
+                    # A label replaces whatever an unlabelled line put in its field
+                    block.pop(field, None)
+                    if value:
+                        block[field] = value
+                    pending = field
+            elif block is None or ('year' in block and YEAR.search(block['year'])):
+                # Text before the first artwork or after a finished one is description
+                continue
+            elif pending and not YEAR.fullmatch(value) and (
+                    glued or not block.get(pending) or block[pending].endswith(',') or not re.search(r'\s', value)):
+                block[pending] = f"{block.get(pending, '')} {value}"
+            else:
+                pending = None
+                if YEAR.fullmatch(value):
+                    block['year'] = value
+                elif DIMENSIONS.search(value) and 'dimensions' not in block:
+                    block['dimensions'] = value
+                    pending = 'dimensions'
+                elif 'title' not in block:
+                    block['title'] = value
+                    pending = 'title'
+                elif 'medium' not in block and len(value) <= 100:
+                    block['medium'] = value
+                    pending = 'medium'
+                continue
+
+            if pending == 'year' and YEAR.search(block.get('year', '')):
+                pending = None
+
+    return [clean_record(record) for record in records if record.get('title')]
+
+def parse_slides(data):
+    records = []
+    for slide in data.get('slides', []):
+        records.extend(parse_slide(slide))
+    for record in records:
+        record['source'] = record['slide']
+    return records
+
+# Price list
+
+def pricing_cells(data, artists):
+    """
+    ('artist' | 'cell', text) for the price list. Table rows from
+    extract_content.py name the artist in their first column; the flat
+    content list only has cells, so an artist is any cell naming a known artist.
+    """
+    if data.get('blocks'):
+        for block in data['blocks']:
+            cells = block.get('cells') if block['type'] == 'row' else [block['text']]
+            if block['type'] == 'row' and len(cells) >= 4 and cells[0].strip():
+                yield 'artist', cells[0]
+                cells = cells[1:]
+            for cell in cells:
+                for line in cell.split('\n'):
+                    if line.strip():
+                        yield 'cell', line
+        return
+
+    for cell in data.get('content', []):
+        yield ('artist' if artist_key(cell) in artists else 'cell'), cell
+
+def parse_pricing_cell(record, cell):
+    """Fill record from one price list cell, which may hold several fields glued together"""
+    cell = normalize_spaces(cell)
+    if not record.get('year'):
+        glued = TRAILING_YEAR.match(cell)
+        if glued and not DIMENSIONS.fullmatch(cell):
+            cell, record['year'] = glued.group(1).strip(), glued.group(2)
+
+    pieces = split_labels(cell)
+    if len(pieces) > 1 or pieces[0][0]:
+        for field, value in pieces:
+            field = field or ('title' if 'title' not in record else 'medium')
+            if value and field not in record:
+                record[field] = value
+        return
+
+    if 'title' not in record:
+        # "Wild Grass15 cm × 15 cmOil on canvas" and "Bird of ParadiseDigital tablet drawing"
+        size = DIMENSIONS.search(cell)
+        if size:
+            title, rest = cell[:size.start()], cell[size.end():]
+            record['dimensions'] = size.group()
+        else:
+            title, _, rest = re.sub(r'(?<=[a-z])(?=[A-Z])', '\n', cell, count=1).partition('\n')
+        record['title'] = title.strip()
+        if rest.strip():
+            record['medium'] = rest.strip()
+    elif YEAR.fullmatch(cell):
+        record['year'] = cell
+    elif DIMENSIONS.search(cell) and 'dimensions' not in record:
+        record['dimensions'] = cell
+    elif 'medium' not in record:
+        record['medium'] = cell
+
+def parse_pricing(data, artists=()):
+    """Artwork records of the price list; artists are the names that head each artist's rows"""
+    known = {artist_key(name): normalize_spaces(name) for name in artists}
+    records = []
+    artist = None
+    record = None
+
+    for kind, cell in pricing_cells(data, known):
+        text = normalize_spaces(cell)
+        if text.lower() in PRICING_HEADINGS:
+            record = None
+        elif kind == 'artist':
+            artist = known.get(artist_key(text), text)
+            record = None
+        elif PRICE.match(text):
+            if record is not None:
+                record['price'] = text
+            record = None
+        elif artist:
+            if record is None:
+                record = {'artist': artist}
+                records.append(record)
+            parse_pricing_cell(record, text)
+
+    records = [clean_record(record) for record in records if record.get('title')]
+    for record in records:
+        record['source'] = 'pricing'
+    return records
+
+# Artists
+
+def compact(value):
+    """Letters and digits only, so "J" "un" "Wu" reads as junwu"""
+    return name_key(value).replace(' ', '')
+
+def slide_text(runs):
+    """Runs joined with spaces, without a space before punctuation"""
+    return re.sub(r'\s+([,.;:!?’)])', r'\1', ' '.join(text for text, glued in runs))
+
+def name_orders(name):
+    """(compact spelling, name as written) for every word order of name"""
+    spelled = {word.lower(): word for word in normalize_spaces(name).split()}
+    for order in permutations(name_key(name).split()):
+        yield ''.join(order), ' '.join(spelled.get(word, word.capitalize()) for word in order)
+
+def is_prose(text):
+    return len(text) >= BIO_MIN_LENGTH or bool(re.match(r'[a-z(]', text) and ' ' in text)
+
+def slide_artist(runs, names):
+    """
+    (name, index of the run the bio starts from) for a slide that opens
+    with one of names, in any word order ("J" "un" "Wu" for the card's "Wu
+    Jun"), or whose first prose run names exactly one of them; else None.
+    The name is as the slide opens with it, or as given in names.
+    """
+    opening = ''
+    for i, (text, glued) in enumerate(runs[:6]):
+        opening += compact(text)
+        for name in names:
+            for spelling, written in name_orders(name):
+                if opening == spelling:
+                    return written, i + 1
+                if opening.startswith(spelling) and is_prose(text):
+                    return written, i
+
+    prose = next((i for i, (text, glued) in enumerate(runs) if is_prose(text)), None)
+    if prose is None:
+        return None
+    text = compact(runs[prose][0])
+    named = [name for name in names if any(spelling in text for spelling, written in name_orders(name))]
+    if len(named) == 1:
+        return named[0], prose
+    return None
+
+def parse_artist_slides(data, names):
+    """
+    {artist key: {'name', 'bio', 'slide'}} from the slides that introduce an
+    artist: slides without artworks that open with, or start their text
+    with, the artist's name. The bio is the first sentence of the text from
+    the first run that reads as prose; the name is put in front when that
+    sentence carries on from it ("is a Chinese artist ...").
+    """
+    artists = {}
+    for slide in data.get('slides', []):
+        runs = slide_runs(slide.get('content', []))
+        if any(CATALOG_NUMBER.fullmatch(text) or LABEL.search(text) for text, glued in runs):
+            continue
+        found = slide_artist(runs, names)
+        if not found:
+            continue
+        name, start = found
+        prose = next((i for i in range(start, len(runs)) if is_prose(runs[i][0])), None)
+        if prose is None:
+            continue
+        text = slide_text(runs[prose:])
+        sentence = re.match(r'.+?[.!?](?=\s+[A-Z“"]|$)', text)
+        bio = (sentence.group() if sentence else text).strip()
+        if re.match(r'[a-z(]', bio):
+            bio = f"{name} {bio}"
+        artists.setdefault(artist_key(name), {'name': name, 'bio': bio, 'slide': slide['slide']})
+    return artists
+
+def join_artists(artworks, slides=None):
+    """
+    One record per artist of the joined artworks, in artwork order:
+    {'artist': name as on the cards, 'name', 'bio', 'specialty', 'slides',
+    'chapters'}. name and bio come from the artist's own slide when there
+    is one; specialty is their most common medium, and chapters the
+    chapters their catalog numbers put them in, most common first.
+    """
+    by_artist = {}
+    for artwork in artworks:
+        by_artist.setdefault(artist_key(artwork['artist']), []).append(artwork)
+    introduced = parse_artist_slides(slides or {}, [works[0]['artist'] for works in by_artist.values()])
+
+    artists = []
+    for key, works in by_artist.items():
+        mediums = [work['medium'] for work in works if work.get('medium')]
+        chapters = [work['chapter'] for work in works if work.get('chapter')]
+        slide = introduced.get(key, {})
+        artists.append({
+            'artist': works[0]['artist'],
+            'name': slide.get('name', works[0]['artist']),
+            'bio': slide.get('bio', ''),
+            'specialty': max(mediums, key=mediums.count) if mediums else '',
+            'slides': [slide['slide']] if slide else [],
+            'chapters': sorted(set(chapters), key=lambda chapter: (-chapters.count(chapter), chapter))
+        })
+    return artists
+
+# Join
+
+def size_values(text):
+    """Numbers of a size in centimetres, largest first"""
+    scale = 1.0
+    if re.search(r'inch|\bin\b|"', text):
+        scale = 2.54
+    elif 'mm' in text:
+        scale = 0.1
+    return sorted((float(n) * scale for n in re.findall(r'\d+(?:\.\d+)?', text)), reverse=True)
+
+def same_fact(field, a, b):
+    if field == 'dimensions':
+        a, b = size_values(a), size_values(b)
+        return len(a) == len(b) and all(abs(x - y) <= max(SIZE_TOLERANCE_CM, SIZE_TOLERANCE * y) for x, y in zip(a, b))
+    if field == 'price':
+        a_values = set(re.findall(r'\d+', a.replace(',', '')))
+        b_values = set(re.findall(r'\d+', b.replace(',', '')))
+        if a_values and b_values:
+            # "$230 each or $330" does not contradict "$330"
+            return bool(a_values & b_values)
+    return title_key(a) == title_key(b)
+
+def merge_record(entry, record, score, conflicts):
+    """Add one source record to a joined artwork, noting facts it disagrees on"""
+    entry['sources'].append(record['source'])
+    entry['confidence'] = min(entry['confidence'], score)
+
+    for field, value in record.items():
+        if field in ('artist', 'title', 'source'):
+            continue
+        if field not in entry:
+            entry[field] = value
+            entry.setdefault('from', {})[field] = record['source']
+        elif field in FACT_FIELDS and not same_fact(field, entry[field], value):
+            conflicts.append({
+                'artist': entry['artist'],
+                'title': entry['title'],
+                'field': field,
+                'values': {entry['from'][field]: entry[field], record['source']: value}
+            })
+
+def join_records(sources, threshold=JOIN_THRESHOLD):
+    """
+    Merge {source name: records} into one record per artwork.
+    Each source is first joined on exact (artist, title) keys; its other
+    records are then matched by title similarity against the artworks the
+    source has not matched yet, so "Predicament" joins "Predicament I" and
+    not "Predicament II". Records without an artist (slides) take the
+    artist of the artwork they match. An artwork's 'confidence' is its
+    weakest match score, 1.0 when every source matched exactly.
+    Returns (artworks, conflicts, unmatched records).
+    """
+    merged = {}
+    conflicts = []
+    unmatched = []
+    for name in SOURCE_PRIORITY:
+        titles = {}
+        for artist, title in merged:
+            titles.setdefault(title, set()).add(artist)
+
+        claimed = set()
+        leftovers = []
+        for record in sources.get(name, []):
+            key = record_key(record)
+            if not key[0] and len(titles.get(key[1], ())) == 1:
+                # Only a title that belongs to exactly one artist can be placed
+                key = (next(iter(titles[key[1]])), key[1])
+            if key in merged and key not in claimed:
+                claimed.add(key)
+                merge_record(merged[key], record, 1.0, conflicts)
+            else:
+                leftovers.append(record)
+
+        matcher = NameMatcher((key, merged[key]['title']) for key in merged if key not in claimed)
+        for record in leftovers:
+            key = record_key(record)
+            match = next((candidate for candidate in matcher.candidates(record['title'], threshold, limit=10)
+                          if candidate.key not in claimed and (not key[0] or candidate.key[0] == key[0])), None)
+            if match:
+                key, score = match.key, match.score
+            elif key[0]:
+                score = 1.0
+                if key not in merged:
+                    merged[key] = {'artist': record['artist'], 'title': record['title'], 'sources': [], 'confidence': 1.0}
+            else:
+                unmatched.append(record)
+                continue
+            claimed.add(key)
+            merge_record(merged[key], record, score, conflicts)
+
+    return list(merged.values()), conflicts, unmatched
+
+def load_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def build_catalog(artists=(), cards_dir="artwork", pricing_file=PRICING_FILE, slides_file=SLIDES_FILE):
+    """
+    Parse and join every source that is present. artists are extra names
+    to recognise in the price list on top of the card artists.
+    Returns {'artworks': [...], 'artists': [...], 'conflicts': [...],
+    'unmatched': [...]}; see join_artists() for the artist records.
+    """
+    cards, errors = parse_cards(cards_dir)
+    for path, error in errors:
+        print(f"  ⚠️  {path}: {error}")
+
+    names = [card['artist'] for card in cards if card.get('artist')] + list(artists)
+    sources = {'cards': cards}
+
+    pricing = load_json(pricing_file)
+    if pricing:
+        sources['pricing'] = parse_pricing(pricing, names)
+    slides = load_json(slides_file)
+    if slides:
+        sources['slides'] = parse_slides(slides)
+
+    artworks, conflicts, unmatched = join_records(sources)
+    return {'artworks': artworks, 'artists': join_artists(artworks, slides),
+            'conflicts': conflicts, 'unmatched': unmatched}
+
+def catalog_index(catalog):
+    """
+    Exact (artist key, title key) lookups, each artist's (key, title words)
+    and a title matcher over the catalog artworks
+    """
+    by_key = {}
+    artists = {}
+    matcher = NameMatcher()
+    for artwork in catalog['artworks']:
+        key = record_key(artwork)
+        by_key[key] = artwork
+        artists.setdefault(key[0], []).append((key, name_key(artwork['title']).split()))
+        matcher.add(key, artwork['title'])
+    return by_key, artists, matcher
+
+def contains_words(words, part):
+    """True if part occurs in words as a run of whole words"""
+    return any(words[i:i + len(part)] == part for i in range(len(words) - len(part) + 1))
+
+def find_artwork(index, artist, title, threshold=MATCH_THRESHOLD):
+    """
+    (catalog artwork, match score) for an artist's title, or (None, 0).
+    Exact titles score 1.0; otherwise the most similar title of that artist
+    is taken, or the one title of that artist a short title is part of as
+    whole words ("Raindrop" in '"Raindrop" Water Droplet Series'), scored by
+    the share of its words covered. Artists the catalog does not know can
+    match any artist's title.
+    """
+    by_key, artists, matcher = index
+    key = (artist_key(artist), title_key(title))
+    if key in by_key:
+        return by_key[key], 1.0
+
+    for match in matcher.candidates(title, threshold, limit=10):
+        if match.key[0] == key[0] or key[0] not in artists:
+            return by_key[match.key], match.score
+
+    words = name_key(title).split()
+    containing = [(other, other_words) for other, other_words in artists.get(key[0], [])
+                  if words and contains_words(other_words, words)]
+    if len(containing) == 1:
+        other, other_words = containing[0]
+        score = round(len(words) / len(other_words), 3)
+        if score >= CONTAINMENT_THRESHOLD:
+            return by_key[other], score
+    return None, 0
+
+def card_image(record):
+    """
+    (path, probe info) of the picture kept beside a joined artwork's RTF
+    card (artwork/artwork5.png for artwork/artwork5.rtf), or (None, None)
+    """
+    for source in record.get('sources', []):
+        if source.endswith('.rtf'):
+            card = Path(source)
+            return find_image(card.parent, card.stem)
+    return None, None
+
+def print_conflicts(conflicts):
+    for conflict in conflicts:
+        values = ', '.join(f"{source}: {value}" for source, value in conflict['values'].items())
+        print(f"  ⚠️  {conflict['artist']} - {conflict['title']}: {conflict['field']} differs ({values})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Join artwork cards, price list and slides into one catalog")
+    parser.add_argument("--cards", default="artwork", help="folder of .rtf cards (default: artwork)")
+    parser.add_argument("--output", default=CATALOG_FILE, help=f"where to write the catalog (default: {CATALOG_FILE})")
+    parser.add_argument("--strict", action="store_true", help="exit with an error if the sources conflict")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    catalog = build_catalog(cards_dir=args.cards)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=2, ensure_ascii=False)
+
+    print(f"🔗 Joined {len(catalog['artworks'])} artworks into {args.output}")
+    if catalog['unmatched']:
+        print(f"❓ {len(catalog['unmatched'])} records could not be placed with an artist:")
+        for record in catalog['unmatched']:
+            print(f"  {record['source']}: {record['title']}")
+    if catalog['conflicts']:
+        print(f"⚠️  {len(catalog['conflicts'])} conflicts between sources:")
+        print_conflicts(catalog['conflicts'])
+        if args.strict:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+In-memory record model for the Sensitive Beings catalog.
+Artist, Artwork and MediaAsset are slotted classes, so a record costs a
+fixed handful of pointers instead of a dict, and the short strings that
+repeat across thousands of records (keys, chapters, slide ids, media,
+years, image formats) are interned so every record shares one copy.
+A Catalog is built once and handed from stage to stage; it is only turned
+into the artwork_database.json shape when it is written out.
+"""
+
+import sys
+
+# Chapter titles and blurbs; every artist hangs in one of these
+CHAPTERS = {
+    'chapter1': {
+        'title': 'The Replicated Self',
+        'description': 'Selfhood is not self-made, but shaped in subtle repetitions, negotiated glances, and quiet adjustments to what is expected.'
+    },
+    'chapter2': {
+        'title': 'The Rewilded Senses',
+        'description': 'Even in the default disciplinary reality, feelings still find their way to nurturing the part of us that continues to listen beneath it all.'
+    }
+}
+
+def intern_text(value):
+    """Shared copy of a short, often repeated string"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class MediaAsset:
+    """An image file with its probed size and format"""
+    __slots__ = ('path', 'width', 'height', 'format')
+
+    def __init__(self, path, width=None, height=None, format=None):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.format = intern_text(format)
+
+    @classmethod
+    def from_probe(cls, path, info):
+        """Asset for path from an image_probe.probe_image() result (which may be None)"""
+        if not info:
+            return cls(path)
+        return cls(path, info['width'], info['height'], info['format'])
+
+    def __repr__(self):
+        return f"MediaAsset({self.path!r}, {self.width}x{self.height})"
+
+class Artwork:
+    """One catalogued work; image is a MediaAsset once the file has been placed"""
+    __slots__ = ('title', 'medium', 'dimensions', 'year', 'price', 'description', 'slides', 'image')
+
+    # Facts the catalog sources fill in (see catalog_join.py)
+    FACTS = ('medium', 'dimensions', 'year', 'price')
+
+    def __init__(self, title, medium='', dimensions='', year='', price='', description='', slides=(), image=None):
+        self.title = title
+        self.medium = intern_text(medium)
+        self.dimensions = dimensions
+        self.year = intern_text(year)
+        self.price = price
+        self.description = description
+        self.slides = tuple(intern_text(slide) for slide in slides)
+        self.image = image
+
+    def set_fact(self, field, value):
+        setattr(self, field, intern_text(value) if field in ('medium', 'year') else value)
+
+    def to_json(self, fallback_image=''):
+        """Entry in the artwork_database.json shape"""
+        entry = {
+            'title': self.title,
+            'image': self.image.path if self.image else fallback_image,
+            'medium': self.medium,
+            'dimensions': self.dimensions,
+            'year': self.year,
+            'price': self.price,
+            'description': self.description
+        }
+        if self.image and self.image.width:
+            entry['width'] = self.image.width
+            entry['height'] = self.image.height
+        return entry
+
+    def __repr__(self):
+        return f"Artwork({self.title!r})"
+
+class Artist:
+    """An exhibiting artist and their works, in display order"""
+    __slots__ = ('key', 'name', 'chapter', 'slides', 'bio', 'specialty', 'artworks')
+
+    def __init__(self, key, name, chapter, slides=(), bio='', specialty='', artworks=()):
+        self.key = intern_text(key)
+        self.name = name
+        self.chapter = intern_text(chapter)
+        self.slides = tuple(intern_text(slide) for slide in slides)
+        self.bio = bio or f"Artist information from {name}"
+        self.specialty = specialty
+        self.artworks = list(artworks)
+
+    def to_json(self, artworks):
+        """Entry in the artwork_database.json shape, given its artworks' entries"""
+        return {
+            'key': self.key,
+            'name': self.name,
+            'bio': self.bio,
+            'specialty': self.specialty or (self.artworks[0].medium if self.artworks else '') or 'Mixed Media',
+            'artworks': artworks
+        }
+
+    def __repr__(self):
+        return f"Artist({self.key!r}, {len(self.artworks)} artworks)"
+
+class Catalog:
+    """The one authoritative set of artists, keyed and ordered by artist key"""
+    __slots__ = ('chapters', 'artists')
+
+    def __init__(self, chapters=CHAPTERS):
+        self.chapters = chapters
+        self.artists = {}
+
+    @classmethod
+    def from_mapping(cls, mapping, chapters=CHAPTERS):
+        """Catalog from the curated {artist key: {'name', 'chapter', 'slides', 'artworks': [...]}} form"""
+        catalog = cls(chapters)
+        for key, data in mapping.items():
+            catalog.add(Artist(
+                key, data['name'], data['chapter'], data.get('slides', ()),
+                bio=data.get('bio', ''), specialty=data.get('specialty', ''),
+                artworks=[Artwork(
+                    artwork['title'],
+                    **{field: artwork[field] for field in Artwork.FACTS + ('description',) if field in artwork},
+                    slides=artwork.get('slides', ())
+                ) for artwork in data.get('artworks', [])]
+            ))
+        return catalog
+
+    def add(self, artist):
+        if artist.chapter not in self.chapters:
+            raise ValueError(f"{artist.key} is in unknown chapter {artist.chapter}")
+        self.artists[artist.key] = artist
+
+    def __iter__(self):
+        return iter(self.artists.values())
+
+    def __len__(self):
+        return len(self.artists)
+
+    def artworks(self):
+        """(artist, artwork) for every work, in display order"""
+        for artist in self.artists.values():
+            for artwork in artist.artworks:
+                yield artist, artwork
+
+    def to_database(self, fallback_image=None):
+        """
+        The artwork_database.json document. fallback_image(artist, artwork)
+        gives the image path written for works that have no MediaAsset yet.
+        """
+        database = {
+            key: {'title': chapter['title'], 'description': chapter['description'], 'artists': []}
+            for key, chapter in self.chapters.items()
+        }
+        for artist in self.artists.values():
+            artworks = [artwork.to_json(fallback_image(artist, artwork) if fallback_image and not artwork.image else '')
+                        for artwork in artist.artworks]
+            database[artist.chapter]['artists'].append(artist.to_json(artworks))
+        return database
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite catalog for the Sensitive Beings build scripts.
+Keeps exhibitions, chapters, artists, artworks and media in one local
+database file with indexed tables, so an archive of many exhibitions can
+be queried, and one exhibition re-exported, without loading all of them.
+Imports are incremental: only rows whose values changed are written.
+export produces the artwork_database.json shape the site reads today.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+CATALOG_DB = "catalog.sqlite"
+DEFAULT_EXHIBITION = "sensitive-beings"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exhibitions (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    id INTEGER PRIMARY KEY,
+    exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    UNIQUE (exhibition_id, key)
+);
+CREATE TABLE IF NOT EXISTS artists (
+    id INTEGER PRIMARY KEY,
+    exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    chapter_id INTEGER NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL DEFAULT '',
+    bio TEXT NOT NULL DEFAULT '',
+    specialty TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (exhibition_id, key)
+);
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    placeholder TEXT,
+    palette TEXT,
+    UNIQUE (exhibition_id, path)
+);
+CREATE TABLE IF NOT EXISTS artworks (
+    id INTEGER PRIMARY KEY,
+    exhibition_id INTEGER NOT NULL REFERENCES exhibitions(id) ON DELETE CASCADE,
+    artist_id INTEGER NOT NULL REFERENCES artists(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    image TEXT NOT NULL DEFAULT '',
+    medium TEXT NOT NULL DEFAULT '',
+    dimensions TEXT NOT NULL DEFAULT '',
+    year TEXT NOT NULL DEFAULT '',
+    price TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (exhibition_id, artist_id, title)
+);
+CREATE INDEX IF NOT EXISTS chapters_in_order ON chapters (exhibition_id, position);
+CREATE INDEX IF NOT EXISTS artists_in_order ON artists (exhibition_id, chapter_id, position);
+CREATE INDEX IF NOT EXISTS artists_by_name ON artists (name);
+CREATE INDEX IF NOT EXISTS artworks_in_order ON artworks (exhibition_id, artist_id, position);
+CREATE INDEX IF NOT EXISTS artworks_by_title ON artworks (title);
+CREATE INDEX IF NOT EXISTS artworks_by_image ON artworks (exhibition_id, image);
+"""
+
+# Columns written for each table; the leading KEY_COLUMNS of them identify a row within an exhibition
+TABLE_COLUMNS = {
+    'chapters': ('key', 'position', 'title', 'description'),
+    'artists': ('key', 'chapter_id', 'position', 'name', 'bio', 'specialty', 'extra'),
+    'media': ('path', 'position', 'width', 'height', 'placeholder', 'palette'),
+    'artworks': ('artist_id', 'title', 'position', 'image', 'medium', 'dimensions', 'year', 'price', 'description', 'extra')
+}
+KEY_COLUMNS = {'chapters': 1, 'artists': 1, 'media': 1, 'artworks': 2}
+
+# Fields with their own columns; anything else an entry carries is kept as JSON in 'extra'
+ARTIST_FIELDS = ('key', 'name', 'bio', 'specialty', 'artworks')
+ARTWORK_FIELDS = ('title', 'image', 'medium', 'dimensions', 'year', 'price', 'description')
+MEDIA_FIELDS = ('width', 'height', 'placeholder', 'palette')
+
+# Artworks with the size and placeholder of their image, as artwork_entry() reads them
+ARTWORK_COLUMNS = ', '.join([f"artworks.{field}" for field in ARTWORK_FIELDS] +
+                            [f"media.{field}" for field in MEDIA_FIELDS] + ["artworks.extra"])
+ARTWORK_JOIN = ("FROM artworks LEFT JOIN media "
+                "ON media.exhibition_id = artworks.exhibition_id AND media.path = artworks.image")
+
+def artwork_entry(row):
+    """artwork_database.json entry from a row of ARTWORK_COLUMNS"""
+    entry = dict(zip(ARTWORK_FIELDS, row))
+    media = zip(MEDIA_FIELDS, row[len(ARTWORK_FIELDS):-1])
+    entry.update((field, json.loads(value) if field == 'palette' else value) for field, value in media if value is not None)
+    entry.update(json.loads(row[-1]))
+    return entry
+
+def database_chapters(database):
+    """(key, chapter) of the chapters of a database in the artwork_database.json shape"""
+    return [(key, chapter) for key, chapter in database.items() if isinstance(chapter, dict) and 'artists' in chapter]
+
+def extra_json(entry, fields):
+    extra = {key: value for key, value in entry.items() if key not in fields}
+    return json.dumps(extra, ensure_ascii=False) if extra else '{}'
+
+class CatalogStore:
+    """
+    A catalog database file. import_database() upserts one exhibition given
+    in the artwork_database.json shape, export_database() rebuilds that
+    shape from the tables.
+    """
+
+    def __init__(self, path=CATALOG_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def exhibitions(self):
+        """(slug, title) of every exhibition"""
+        return self.conn.execute("SELECT slug, title FROM exhibitions ORDER BY slug").fetchall()
+
+    def exhibition_id(self, slug, title=None):
+        """Row id of an exhibition, creating it if title is given; None if it does not exist"""
+        row = self.conn.execute("SELECT id, title FROM exhibitions WHERE slug = ?", (slug,)).fetchone()
+        if title is None:
+            return row[0] if row else None
+        if row is None:
+            return self.conn.execute("INSERT INTO exhibitions (slug, title) VALUES (?, ?)", (slug, title)).lastrowid
+        if title and row[1] != title:
+            self.conn.execute("UPDATE exhibitions SET title = ? WHERE id = ?", (title, row[0]))
+        return row[0]
+
+    def sync_rows(self, table, exhibition_id, rows):
+        """
+        Make an exhibition's rows of table equal rows (value tuples in
+        TABLE_COLUMNS order), writing only the ones that differ.
+        Returns ({key: row id}, rows written, ids of rows no longer present).
+        """
+        columns = TABLE_COLUMNS[table]
+        width = KEY_COLUMNS[table]
+        existing = {}
+        for row in self.conn.execute(f"SELECT id, {', '.join(columns)} FROM {table} WHERE exhibition_id = ?",
+                                     (exhibition_id,)):
+            existing[row[1:1 + width]] = (row[0], row[1:])
+
+        insert = (f"INSERT INTO {table} (exhibition_id, {', '.join(columns)}) "
+                  f"VALUES (?, {', '.join('?' for _ in columns)})")
+        update = f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?"
+
+        ids = {}
+        written = 0
+        for values in rows:
+            key = values[:width]
+            if key in ids:
+                raise ValueError(f"{table} has two entries for {' / '.join(map(str, key))}")
+            found = existing.pop(key, None)
+            if found is None:
+                ids[key] = self.conn.execute(insert, (exhibition_id,) + values).lastrowid
+                written += 1
+            else:
+                ids[key] = found[0]
+                if found[1] != values:
+                    self.conn.execute(update, values + (found[0],))
+                    written += 1
+        return ids, written, [row_id for row_id, _ in existing.values()]
+
+    def import_database(self, database, exhibition=DEFAULT_EXHIBITION, title=''):
+        """
+        Upsert a database in the artwork_database.json shape as one
+        exhibition, replacing what was stored for it. Returns (rows written,
+        rows deleted); a rerun on unchanged data writes nothing.
+        """
+        chapters = database_chapters(database)
+
+        with self.conn:
+            exhibition_id = self.exhibition_id(exhibition, title)
+            written = 0
+            stale = {}
+
+            chapter_ids, count, stale['chapters'] = self.sync_rows('chapters', exhibition_id, [
+                (key, position, chapter.get('title', ''), chapter.get('description', ''))
+                for position, (key, chapter) in enumerate(chapters)
+            ])
+            written += count
+
+            artists = [(chapter_ids[(key,)], artist) for key, chapter in chapters for artist in chapter['artists']]
+            artist_ids, count, stale['artists'] = self.sync_rows('artists', exhibition_id, [
+                (artist['key'], chapter_id, position, artist.get('name', ''), artist.get('bio', ''),
+                 artist.get('specialty', ''), extra_json(artist, ARTIST_FIELDS))
+                for position, (chapter_id, artist) in enumerate(artists)
+            ])
+            written += count
+
+            # Each artwork image once
+            media = {}
+            for _, artist in artists:
+                for artwork in artist.get('artworks', []):
+                    if artwork.get('image'):
+                        media.setdefault(artwork['image'], {}).update(
+                            {field: artwork[field] for field in MEDIA_FIELDS if field in artwork})
+            _, count, stale['media'] = self.sync_rows('media', exhibition_id, [
+                (path, position, entry.get('width'), entry.get('height'), entry.get('placeholder'),
+                 json.dumps(entry['palette']) if 'palette' in entry else None)
+                for position, (path, entry) in enumerate(media.items())
+            ])
+            written += count
+
+            _, count, stale['artworks'] = self.sync_rows('artworks', exhibition_id, [
+                (artist_ids[(artist['key'],)], artwork['title'], position,
+                 *(artwork.get(field, '') for field in ARTWORK_FIELDS[1:]),
+                 extra_json(artwork, ARTWORK_FIELDS + MEDIA_FIELDS))
+                for _, artist in artists
+                for position, artwork in enumerate(artist.get('artworks', []))
+            ])
+            written += count
+
+            deleted = 0
+            for table in ('artworks', 'media', 'artists', 'chapters'):
+                self.conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in stale[table]])
+                deleted += len(stale[table])
+
+        return written, deleted
+
+    def export_database(self, exhibition=DEFAULT_EXHIBITION):
+        """One exhibition in the artwork_database.json shape"""
+        exhibition_id = self.exhibition_id(exhibition)
+        if exhibition_id is None:
+            raise KeyError(f"no exhibition {exhibition} in {self.path}")
+
+        database = {}
+        chapter_artists = {}
+        for chapter_id, key, title, description in self.conn.execute(
+                "SELECT id, key, title, description FROM chapters WHERE exhibition_id = ? ORDER BY position",
+                (exhibition_id,)):
+            database[key] = {'title': title, 'description': description, 'artists': []}
+            chapter_artists[chapter_id] = database[key]['artists']
+
+        artworks = {}
+        for artist_id, chapter_id, key, name, bio, specialty, extra in self.conn.execute(
+                "SELECT id, chapter_id, key, name, bio, specialty, extra FROM artists "
+                "WHERE exhibition_id = ? ORDER BY position", (exhibition_id,)):
+            entry = {'key': key, 'name': name, 'bio': bio, 'specialty': specialty, 'artworks': []}
+            entry.update(json.loads(extra))
+            chapter_artists[chapter_id].append(entry)
+            artworks[artist_id] = entry['artworks']
+
+        for row in self.conn.execute(
+                f"SELECT artworks.artist_id, {ARTWORK_COLUMNS} {ARTWORK_JOIN} "
+                "WHERE artworks.exhibition_id = ? ORDER BY artworks.artist_id, artworks.position", (exhibition_id,)):
+            entry = artwork_entry(row[1:])
+            artworks[row[0]].append(entry)
+        return database
+
+def sync_database(database, path=CATALOG_DB, exhibition=DEFAULT_EXHIBITION):
+    """Upsert database into the catalog file at path and report what changed"""
+    with CatalogStore(path) as store:
+        written, deleted = store.import_database(database, exhibition)
+    print(f"🗄️  {path}: {written} rows written, {deleted} removed for {exhibition}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Keep artwork_database.json in an indexed SQLite catalog")
+    parser.add_argument("command", choices=["import", "export", "list"],
+                        help="import a JSON database, export one as JSON, or list the exhibitions")
+    parser.add_argument("json", nargs="?", default="artwork_database.json",
+                        help="JSON file to import from or export to (default: artwork_database.json)")
+    parser.add_argument("--db", default=CATALOG_DB, help=f"catalog database file (default: {CATALOG_DB})")
+    parser.add_argument("--exhibition", default=DEFAULT_EXHIBITION,
+                        help=f"exhibition to import or export (default: {DEFAULT_EXHIBITION})")
+    parser.add_argument("--title", default="", help="exhibition title to store on import")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.command == "import":
+        with open(args.json, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+        with CatalogStore(args.db) as store:
+            written, deleted = store.import_database(database, args.exhibition, args.title)
+        print(f"🗄️  Imported {args.json} as {args.exhibition}: {written} rows written, {deleted} removed")
+
+    elif args.command == "export":
+        if not os.path.exists(args.db):
+            print(f"❌ Catalog database not found: {args.db}")
+            sys.exit(1)
+        with CatalogStore(args.db) as store:
+            try:
+                database = store.export_database(args.exhibition)
+            except KeyError as e:
+                print(f"❌ {e.args[0]}")
+                sys.exit(1)
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(database, f, indent=2, ensure_ascii=False)
+        print(f"📝 Exported {args.exhibition} to {args.json}")
+
+    else:
+        with CatalogStore(args.db) as store:
+            for slug, title in store.exhibitions():
+                print(f"{slug}\t{title}")
+
+if __name__ == "__main__":
+    main()
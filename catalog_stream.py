@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Newline-delimited JSON export of the Sensitive Beings catalog.
+One record per line, in display order: a chapter header, then for each of
+its artists an artist header followed by that artist's artworks. A client
+can render every artist as soon as its lines arrive instead of waiting for
+the whole nested document. Records are generated and written one at a
+time, and when read from the SQLite catalog (catalog_store.py) the full
+catalog is never in memory at once.
+"""
+
+import os
+import sys
+import json
+import filecmp
+import argparse
+
+from catalog_store import (CatalogStore, CATALOG_DB, DEFAULT_EXHIBITION, ARTWORK_COLUMNS, ARTWORK_JOIN,
+                           artwork_entry, database_chapters)
+
+ARTWORK_DATABASE = "artwork_database.json"
+CATALOG_NDJSON = "artwork_catalog.ndjson"
+
+def chapter_record(key, chapter):
+    return {'type': 'chapter', 'key': key, 'title': chapter.get('title', ''), 'description': chapter.get('description', '')}
+
+def artist_record(chapter_key, artist, artwork_count):
+    record = {'type': 'artist', 'chapter': chapter_key}
+    record.update((field, value) for field, value in artist.items() if field != 'artworks')
+    record['artworks'] = artwork_count
+    return record
+
+def artwork_record(artist_key, artwork):
+    record = {'type': 'artwork', 'artist': artist_key}
+    record.update(artwork)
+    return record
+
+def database_records(database):
+    """Records of a database in the artwork_database.json shape"""
+    for key, chapter in database_chapters(database):
+        yield chapter_record(key, chapter)
+        for artist in chapter['artists']:
+            artworks = artist.get('artworks', [])
+            yield artist_record(key, artist, len(artworks))
+            for artwork in artworks:
+                yield artwork_record(artist['key'], artwork)
+
+def store_records(store, exhibition=DEFAULT_EXHIBITION):
+    """Records of one exhibition in a CatalogStore, read row by row"""
+    exhibition_id = store.exhibition_id(exhibition)
+    if exhibition_id is None:
+        raise KeyError(f"no exhibition {exhibition} in {store.path}")
+
+    chapters = store.conn.execute(
+        "SELECT id, key, title, description FROM chapters WHERE exhibition_id = ? ORDER BY position", (exhibition_id,))
+    for chapter_id, key, title, description in chapters:
+        yield chapter_record(key, {'title': title, 'description': description})
+
+        artists = store.conn.execute(
+            "SELECT id, key, name, bio, specialty, extra, "
+            "(SELECT COUNT(*) FROM artworks WHERE artworks.exhibition_id = artists.exhibition_id "
+            "AND artworks.artist_id = artists.id) "
+            "FROM artists WHERE exhibition_id = ? AND chapter_id = ? ORDER BY position", (exhibition_id, chapter_id))
+        for artist_id, artist_key, name, bio, specialty, extra, count in artists:
+            artist = {'key': artist_key, 'name': name, 'bio': bio, 'specialty': specialty}
+            artist.update(json.loads(extra))
+            yield artist_record(key, artist, count)
+
+            artworks = store.conn.execute(
+                f"SELECT {ARTWORK_COLUMNS} {ARTWORK_JOIN} "
+                "WHERE artworks.exhibition_id = ? AND artworks.artist_id = ? ORDER BY artworks.position",
+                (exhibition_id, artist_id))
+            for row in artworks:
+                yield artwork_record(artist_key, artwork_entry(row))
+
+def write_ndjson(records, path=CATALOG_NDJSON):
+    """
+    Write records one line at a time; the file only replaces path once
+    complete, and not at all if path already holds the same records.
+    Returns the record count.
+    """
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    count = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                f.write('\n')
+                count += 1
+        if not (os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False)):
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export the catalog as newline-delimited JSON in display order")
+    parser.add_argument("--output", default=CATALOG_NDJSON, help=f"NDJSON file to write (default: {CATALOG_NDJSON})")
+    parser.add_argument("--database", default=ARTWORK_DATABASE,
+                        help=f"JSON database to export (default: {ARTWORK_DATABASE})")
+    parser.add_argument("--db", metavar="PATH", nargs="?", const=CATALOG_DB,
+                        help=f"stream from a SQLite catalog instead (default path: {CATALOG_DB})")
+    parser.add_argument("--exhibition", default=DEFAULT_EXHIBITION,
+                        help=f"exhibition to export from the SQLite catalog (default: {DEFAULT_EXHIBITION})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.db:
+        if not os.path.exists(args.db):
+            print(f"❌ Catalog database not found: {args.db}")
+            sys.exit(1)
+        with CatalogStore(args.db) as store:
+            try:
+                count = write_ndjson(store_records(store, args.exhibition), args.output)
+            except KeyError as e:
+                print(f"❌ {e.args[0]}")
+                sys.exit(1)
+        source = f"{args.db} ({args.exhibition})"
+    else:
+        with open(args.database, 'r', encoding='utf-8') as f:
+            database = json.load(f)
+        count = write_ndjson(database_records(database), args.output)
+        source = args.database
+
+    print(f"📜 {count} records from {source} streamed to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Minified, precompressed shards of artwork_database.json for the website.
+Next to the pretty-printed database, every chapter and every artist gets
+its own minified JSON file, with a small index.json that lists them. Each
+file has .gz and (with the brotli package) .br siblings a static server can
+send as they are. artwork-loader.js reads the index, then fetches only the
+shards of the artists on the page.
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from catalog_store import database_chapters
+from catalog_stream import CATALOG_NDJSON, database_records, write_ndjson
+from search_index import SEARCH_INDEX, build_search_index
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ARTWORK_DATABASE = "artwork_database.json"
+SHARD_DIR = "artwork_shards"
+SHARD_INDEX = "index.json"
+SHARD_VERSION = 1
+
+COMPRESSED_SUFFIXES = ['.gz', '.br']
+
+def minified(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def shard_name(kind, key):
+    # Keys come from the curated roster, but keep anything odd out of file names
+    return f"{kind}/{re.sub(r'[^A-Za-z0-9_-]', '_', key)}.json"
+
+def compressed_variants(data):
+    """(suffix, bytes) of every compressed form of data that can be made here"""
+    variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(data, quality=11)))
+    return variants
+
+def write_if_changed(path, data):
+    """Write bytes to path unless it already holds them; returns True if written"""
+    path = Path(path)
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+def write_shard(path, data):
+    """
+    Write data to path with its compressed siblings, unless path already
+    holds exactly data and the siblings exist. Returns True if written.
+    """
+    suffixes = ['.gz'] + (['.br'] if brotli is not None else [])
+    if path.exists() and all(Path(f"{path}{suffix}").exists() for suffix in suffixes):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for suffix, payload in [('', data)] + compressed_variants(data):
+        target = Path(f"{path}{suffix}")
+        tmp_path = target.with_name(f".{target.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, target)
+
+    # A .br left from a run with brotli would now be stale
+    if brotli is None and Path(f"{path}.br").exists():
+        Path(f"{path}.br").unlink()
+    return True
+
+def write_shards(database, shard_dir=SHARD_DIR):
+    """
+    Write the index, chapter and artist shards of database under shard_dir
+    and remove the shards of chapters and artists that are gone.
+    Returns (shards written, shards in total).
+    """
+    shard_dir = Path(shard_dir)
+    shards = {}
+    index = {'version': SHARD_VERSION, 'chapters': {}, 'artists': {}}
+
+    for key, chapter in database_chapters(database):
+        name = shard_name('chapters', key)
+        shards[name] = minified(chapter)
+        index['chapters'][key] = {
+            'title': chapter.get('title', ''),
+            'shard': name,
+            'hash': hashlib.sha256(shards[name]).hexdigest()[:12],
+            'artists': [artist['key'] for artist in chapter['artists']]
+        }
+        for artist in chapter['artists']:
+            name = shard_name('artists', artist['key'])
+            shards[name] = minified(artist)
+            index['artists'][artist['key']] = {
+                'name': artist.get('name', ''),
+                'chapter': key,
+                'shard': name,
+                'hash': hashlib.sha256(shards[name]).hexdigest()[:12]
+            }
+    shards[SHARD_INDEX] = minified(index)
+
+    written = sum(write_shard(shard_dir / name, data) for name, data in shards.items())
+
+    for kind in ('chapters', 'artists'):
+        for path in sorted((shard_dir / kind).glob("*.json*")):
+            name = path.relative_to(shard_dir).as_posix()
+            for suffix in COMPRESSED_SUFFIXES:
+                if name.endswith(suffix):
+                    name = name[:-len(suffix)]
+            if name not in shards:
+                path.unlink()
+
+    return written, len(shards)
+
+def write_search_index(database, path=SEARCH_INDEX):
+    """Write the search index of database with its compressed siblings; returns True if it changed"""
+    return write_shard(Path(path), minified(build_search_index(database)))
+
+def write_database(database, path=ARTWORK_DATABASE, shard_dir=SHARD_DIR, ndjson=CATALOG_NDJSON,
+                   search_index=SEARCH_INDEX):
+    """
+    Write the pretty-printed database to path and refresh its shards, NDJSON
+    stream and search index. Files that would come out the same are left
+    untouched, and only changed shards are compressed again.
+    """
+    write_if_changed(path, json.dumps(database, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    if ndjson:
+        write_ndjson(database_records(database), ndjson)
+    if search_index:
+        write_search_index(database, search_index)
+
+    if shard_dir:
+        written, total = write_shards(database, shard_dir)
+        print(f"🧩 {written} of {total} database shards rewritten in {shard_dir}/")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Write minified, precompressed shards of artwork_database.json")
+    parser.add_argument("database", nargs="?", default=ARTWORK_DATABASE,
+                        help=f"database to shard (default: {ARTWORK_DATABASE})")
+    parser.add_argument("--output", default=SHARD_DIR, help=f"shard folder (default: {SHARD_DIR})")
+    parser.add_argument("--search-index", default=SEARCH_INDEX,
+                        help=f"search index to write alongside (default: {SEARCH_INDEX})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if brotli is None:
+        print("⚠️  brotli not found, only .gz siblings will be written (pip install brotli)")
+
+    with open(args.database, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    written, total = write_shards(database, args.output)
+    if write_search_index(database, args.search_index):
+        print(f"🔎 Search index written to {args.search_index} ({Path(args.search_index).stat().st_size / 1e3:.1f} KB)")
+    sizes = {suffix: 0 for suffix in [''] + COMPRESSED_SUFFIXES}
+    for path in Path(args.output).rglob("*.json*"):
+        suffix = path.suffix if path.suffix in COMPRESSED_SUFFIXES else ''
+        sizes[suffix] += path.stat().st_size
+
+    print(f"🧩 {written} of {total} shards rewritten in {args.output}/")
+    print(f"📦 {os.path.getsize(args.database) / 1e3:.1f} KB database -> {sizes[''] / 1e3:.1f} KB minified shards, "
+          f"{sizes['.gz'] / 1e3:.1f} KB gzip" + (f", {sizes['.br'] / 1e3:.1f} KB brotli" if sizes['.br'] else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Script to extract text and images from docx and pptx files in a single pass.
+Each archive is opened once and shared by the text and image pipelines.
+"""
+
+import os
+import sys
+import json
+import argparse
+import resource
+from pathlib import Path
+
+from build_cache import BuildState, MemberCache, MEMBER_CACHE_DIR, MEMBER_CACHE_MAX_BYTES
+from media_store import MediaStore, MEDIA_STORE_DIR
+from office_archive import OfficeArchive
+from parallel_jobs import run_tasks, report_errors
+from extract_content import extract_file, SLIDE_CACHE_NAMESPACE
+from extract_images import (
+    CHUNK_SIZE, MAX_MEMBER_SIZE, MAX_ARCHIVE_SIZE,
+    plan_media, extract_members, organize_artwork_images, create_image_manifest, peak_rss_mb
+)
+
+# Changing any of the extraction code invalidates previous results
+CODE_FILES = [Path(__file__)] + [Path(__file__).with_name(name) for name in
+                                 ('extract_content.py', 'extract_images.py', 'office_archive.py')]
+
+def extract_archive(file_path, media_dir, member_names, skipped, chunk_size=CHUNK_SIZE,
+                    max_member_size=MAX_MEMBER_SIZE, cache=None, store=None, max_archive_size=MAX_ARCHIVE_SIZE):
+    """Extract the text document and the planned media members of one archive from a single open zip"""
+    with OfficeArchive(file_path) as archive:
+        document = extract_file(archive, cache)
+        extracted, member_skips = extract_members(archive, member_names, media_dir,
+                                                  chunk_size, max_member_size, store, max_archive_size)
+    
+    return {
+        'document': document,
+        'extracted': extracted,
+        'skipped': member_skips + skipped
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract text and images from docx and pptx files")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="worker processes, one archive each (0 = one per CPU, default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="bytes copied per read when streaming media (default: 1 MB)")
+    parser.add_argument("--max-member-size", type=int, default=MAX_MEMBER_SIZE,
+                        help="skip media members larger than this many bytes")
+    parser.add_argument("--max-archive-size", type=int, default=MAX_ARCHIVE_SIZE,
+                        help="stop extracting an archive once this many media bytes are written")
+    parser.add_argument("--force", action="store_true",
+                        help="re-extract every archive even if it has not changed")
+    parser.add_argument("--cache-dir", default=MEMBER_CACHE_DIR,
+                        help=f"where parsed slides are cached (default: {MEMBER_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=MEMBER_CACHE_MAX_BYTES,
+                        help="evict least recently used slides beyond this many bytes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse every slide, ignoring the slide cache")
+    parser.add_argument("--store", action="store_true",
+                        help=f"keep each distinct image once in {MEDIA_STORE_DIR} and link extracted files to it")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    content_dir = Path("content files")
+    output_dir = Path("extracted_content")
+    images_dir = Path("images")
+    output_dir.mkdir(exist_ok=True)
+    images_dir.mkdir(exist_ok=True)
+    
+    # Extract from docx files, then pptx files
+    archives = [(docx_file, images_dir / "documents") for docx_file in sorted(content_dir.glob("*.docx"))]
+    archives += [(pptx_file, images_dir / "presentations") for pptx_file in sorted(content_dir.glob("*.pptx"))]
+    
+    # Plan every archive's media before any worker writes, so when two archives hold a
+    # file of the same name for one folder the later archive wins, as in a sequential run
+    errors = []
+    plans = []
+    owners = {}
+    for file_path, media_dir in archives:
+        try:
+            with OfficeArchive(file_path) as archive:
+                members, skipped = plan_media(archive, args.max_archive_size)
+        except Exception as e:
+            errors.append((str(file_path), f"{type(e).__name__}: {e}"))
+            continue
+        for member in members:
+            owners[os.path.join(media_dir, os.path.basename(member.filename))] = (file_path, member.filename)
+        plans.append((file_path, media_dir, members, skipped))
+    
+    # Skip archives whose text and media are unchanged since the last run
+    state = BuildState(force=args.force)
+    store = MediaStore() if args.store else None
+    stale = []
+    for file_path, media_dir, members, skipped in plans:
+        owned = [m.filename for m in members
+                 if owners[os.path.join(media_dir, os.path.basename(m.filename))] == (file_path, m.filename)]
+        params = {"max_member_size": args.max_member_size, "max_archive_size": args.max_archive_size,
+                  "members": owned, "store": store.root if store else None}
+        if state.is_fresh(f"extract_all:{file_path}", [file_path] + CODE_FILES, params):
+            print(f"\nUp to date: {file_path.name}")
+        else:
+            stale.append((file_path, media_dir, owned, skipped, params))
+    
+    cache = None if args.no_cache else MemberCache(args.cache_dir, args.cache_size, SLIDE_CACHE_NAMESPACE)
+    tasks = [(file_path, media_dir, owned, skipped, args.chunk_size, args.max_member_size, cache, store,
+              args.max_archive_size)
+             for file_path, media_dir, owned, skipped, _ in stale]
+    results = run_tasks(extract_archive, tasks, args.jobs)
+    
+    for (file_path, media_dir, _, _, params), (result, error) in zip(stale, results):
+        print(f"\nProcessing {file_path.name}...")
+        if error:
+            errors.append((str(file_path), error))
+            continue
+        
+        output_file = output_dir / f"{file_path.stem}.json"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(result['document'], f, indent=2, ensure_ascii=False)
+        
+        outputs = [output_file] + [media_dir / filename for filename, _, _ in result['extracted']]
+        state.record(f"extract_all:{file_path}", [file_path] + CODE_FILES, outputs, params)
+        
+        for filename, written, digest in result['extracted']:
+            print(f"Extracted: {filename} ({written} bytes)")
+            if store:
+                store.record(media_dir / filename, digest, store.blob_path(digest, Path(filename).suffix), written)
+        for message in result['skipped']:
+            print(message)
+        print(f"Extracted text and {len(result['extracted'])} images from {file_path.name}")
+    
+    state.save()
+    if store:
+        store.save()
+    
+    # Organize images
+    organize_artwork_images(images_dir)
+    
+    # Create manifest
+    create_image_manifest()
+    
+    print(f"\nExtraction completed!")
+    print(f"Peak memory: {peak_rss_mb():.1f} MB (largest worker: {peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB)")
+    
+    if report_errors(errors):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
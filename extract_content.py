@@ -4,111 +4,238 @@ Script to extract text and images from docx and pptx files for Sensitive Beings
 """
 
 import os
+import sys
 import json
+import argparse
 from pathlib import Path
-import zipfile
 import xml.etree.ElementTree as ET
 
-def extract_from_docx(docx_path):
-    """Extract text from docx file"""
-    content = []
-    
-    try:
-        with zipfile.ZipFile(docx_path, 'r') as zip_file:
-            # Extract document.xml which contains the main content
-            doc_xml = zip_file.read('word/document.xml')
-            root = ET.fromstring(doc_xml)
-            
-            # Define namespaces
-            namespaces = {
-                'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
-            }
+from build_cache import BuildState, MemberCache, MEMBER_CACHE_DIR, MEMBER_CACHE_MAX_BYTES
+from office_archive import open_archive, slide_id
+from parallel_jobs import run_tasks, report_errors
+
+# Changing the extraction code invalidates previously extracted content
+CODE_FILES = [Path(__file__), Path(__file__).with_name('office_archive.py')]
+
+# Bump when slide text parsing changes so cached slides are not reused
+SLIDE_PARSER_VERSION = 1
+SLIDE_CACHE_NAMESPACE = f"slide-text-v{SLIDE_PARSER_VERSION}"
+
+# WordprocessingML tags, in the {namespace}local form iterparse reports
+W_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_BODY = W_NAMESPACE + 'body'
+W_PARAGRAPH = W_NAMESPACE + 'p'
+W_TEXT = W_NAMESPACE + 't'
+W_TABLE = W_NAMESPACE + 'tbl'
+W_ROW = W_NAMESPACE + 'tr'
+W_CELL = W_NAMESPACE + 'tc'
+
+def release_finished(parent, elem):
+    """Detach elem and every sibling before it; iterparse has already reported them"""
+    while len(parent):
+        first = parent[0]
+        del parent[0]
+        if first is elem:
+            break
+
+def iter_docx_records(docx_path):
+    """
+    Stream word/document.xml and yield one record per top-level block:
+    {'type': 'paragraph', 'text': ...} or {'type': 'row', 'cells': [...]}.
+    Finished body blocks and table rows are detached from the tree, so memory
+    stays flat no matter how long the document is. Tables nested inside a cell
+    are folded into that cell's text.
+    """
+    with open_archive(docx_path) as archive:
+        with archive.open('word/document.xml') as source:
+            stack = []
+            body = None
+            table = None
+            table_depth = 0
+            para_text = []
+            cell_paras = None
+            row_cells = None
             
-            # Extract text from paragraphs
-            for para in root.findall('.//w:p', namespaces):
-                para_text = ""
-                for text_elem in para.findall('.//w:t', namespaces):
-                    if text_elem.text:
-                        para_text += text_elem.text
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                tag = elem.tag
                 
-                if para_text.strip():
-                    content.append(para_text.strip())
-    
-    except Exception as e:
-        print(f"Error extracting from {docx_path}: {e}")
-    
+                if event == 'start':
+                    stack.append(elem)
+                    if tag == W_BODY:
+                        body = elem
+                    elif tag == W_TABLE:
+                        table_depth += 1
+                        if table_depth == 1:
+                            table = elem
+                    elif tag == W_ROW and table_depth == 1:
+                        row_cells = []
+                    elif tag == W_CELL and table_depth == 1:
+                        cell_paras = []
+                    continue
+                
+                stack.pop()
+                
+                if tag == W_TEXT:
+                    if elem.text:
+                        para_text.append(elem.text)
+                elif tag == W_PARAGRAPH:
+                    text = ''.join(para_text).strip()
+                    para_text = []
+                    if cell_paras is not None:
+                        if text:
+                            cell_paras.append(text)
+                    elif text:
+                        yield {'type': 'paragraph', 'text': text}
+                elif tag == W_CELL and table_depth == 1:
+                    # Keep empty cells so columns stay aligned
+                    row_cells.append('\n'.join(cell_paras))
+                    cell_paras = None
+                elif tag == W_ROW and table_depth == 1:
+                    yield {'type': 'row', 'cells': row_cells}
+                    row_cells = None
+                elif tag == W_TABLE:
+                    table_depth -= 1
+                    if table_depth == 0:
+                        table = None
+                
+                # Long bodies are released block by block and long tables row by row
+                if stack and (stack[-1] is body or stack[-1] is table):
+                    release_finished(stack[-1], elem)
+
+def flatten_docx_records(records):
+    """Flatten docx records to the plain list of non-empty paragraphs we have always written"""
+    content = []
+    for record in records:
+        if record['type'] == 'paragraph':
+            content.append(record['text'])
+        else:
+            for cell in record['cells']:
+                content.extend(para for para in cell.split('\n') if para)
     return content
 
-def extract_from_pptx(pptx_path):
-    """Extract text from pptx file"""
+def extract_from_docx(docx_path):
+    """Extract text from docx file (a path or an open OfficeArchive)"""
+    return flatten_docx_records(iter_docx_records(docx_path))
+
+def extract_from_pptx(pptx_path, cache=None):
+    """
+    Extract text from pptx file (a path or an open OfficeArchive).
+    With a MemberCache, slides whose name and CRC32 are unchanged reuse their
+    cached text instead of being parsed again.
+    """
     content = []
     
-    try:
-        with zipfile.ZipFile(pptx_path, 'r') as zip_file:
-            # Get list of slide files
-            slide_files = [name for name in zip_file.namelist() if name.startswith('ppt/slides/slide') and name.endswith('.xml')]
-            
-            # Define namespaces
-            namespaces = {
-                'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-                'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'
-            }
+    with open_archive(pptx_path) as archive:
+        # Define namespaces
+        namespaces = {
+            'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+            'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'
+        }
+        
+        # Which media each slide shows, from the slide _rels parts
+        slide_media, _ = archive.media_index()
+        
+        for slide_file in archive.slides():
+            slide_content = cache.get(slide_file) if cache else None
             
-            for slide_file in sorted(slide_files):
+            if slide_content is None:
                 slide_content = []
-                slide_xml = zip_file.read(slide_file)
-                root = ET.fromstring(slide_xml)
+                root = archive.read_xml(slide_file.filename)
                 
                 # Extract text from text elements
                 for text_elem in root.findall('.//a:t', namespaces):
                     if text_elem.text:
                         slide_content.append(text_elem.text.strip())
                 
-                if slide_content:
-                    content.append({
-                        'slide': slide_file.replace('ppt/slides/', '').replace('.xml', ''),
-                        'content': slide_content
-                    })
-    
-    except Exception as e:
-        print(f"Error extracting from {pptx_path}: {e}")
+                if cache:
+                    cache.put(slide_file, slide_content)
+            
+            slide = slide_id(slide_file.filename)
+            media = slide_media.get(slide, [])
+            
+            if slide_content or media:
+                content.append({
+                    'slide': slide,
+                    'content': slide_content,
+                    'media': media
+                })
     
     return content
 
+def extract_file(file_path, cache=None):
+    """Extract one docx or pptx file (a path or an open OfficeArchive) into the JSON document written for it"""
+    with open_archive(file_path) as archive:
+        source = str(archive.path)
+        
+        if archive.kind == 'docx':
+            # One streaming pass gives both the flat text and the table structure
+            records = list(iter_docx_records(archive))
+            return {
+                'source': source,
+                'type': 'docx',
+                'content': flatten_docx_records(records),
+                'blocks': records
+            }
+        
+        return {
+            'source': source,
+            'type': 'pptx',
+            'slides': extract_from_pptx(archive, cache)
+        }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract text from docx and pptx files")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="worker processes, one archive each (0 = one per CPU, default: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-extract every file even if it has not changed")
+    parser.add_argument("--cache-dir", default=MEMBER_CACHE_DIR,
+                        help=f"where parsed slides are cached (default: {MEMBER_CACHE_DIR})")
+    parser.add_argument("--cache-size", type=int, default=MEMBER_CACHE_MAX_BYTES,
+                        help="evict least recently used slides beyond this many bytes")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse every slide, ignoring the slide cache")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     content_dir = Path("content files")
     output_dir = Path("extracted_content")
     output_dir.mkdir(exist_ok=True)
     
-    # Extract from docx files
-    docx_files = list(content_dir.glob("*.docx"))
-    for docx_file in docx_files:
-        print(f"Extracting from {docx_file.name}...")
-        text_content = extract_from_docx(docx_file)
-        
-        output_file = output_dir / f"{docx_file.stem}.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'source': str(docx_file),
-                'type': 'docx',
-                'content': text_content
-            }, f, indent=2, ensure_ascii=False)
+    state = BuildState(force=args.force)
+    
+    # Extract from docx files, then pptx files, skipping the ones that have not changed
+    source_files = sorted(content_dir.glob("*.docx")) + sorted(content_dir.glob("*.pptx"))
+    stale_files = []
+    for source_file in source_files:
+        if state.is_fresh(f"extract_content:{source_file}", [source_file] + CODE_FILES):
+            print(f"Up to date: {source_file.name}")
+        else:
+            stale_files.append(source_file)
+    
+    cache = None if args.no_cache else MemberCache(args.cache_dir, args.cache_size, SLIDE_CACHE_NAMESPACE)
+    results = run_tasks(extract_file, [(source_file, cache) for source_file in stale_files], args.jobs)
     
-    # Extract from pptx files
-    pptx_files = list(content_dir.glob("*.pptx"))
-    for pptx_file in pptx_files:
-        print(f"Extracting from {pptx_file.name}...")
-        slide_content = extract_from_pptx(pptx_file)
+    errors = []
+    for source_file, (document, error) in zip(stale_files, results):
+        print(f"Extracting from {source_file.name}...")
+        if error:
+            errors.append((str(source_file), error))
+            continue
         
-        output_file = output_dir / f"{pptx_file.stem}.json"
+        output_file = output_dir / f"{source_file.stem}.json"
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'source': str(pptx_file),
-                'type': 'pptx',
-                'slides': slide_content
-            }, f, indent=2, ensure_ascii=False)
+            json.dump(document, f, indent=2, ensure_ascii=False)
+        
+        state.record(f"extract_content:{source_file}", [source_file] + CODE_FILES, [output_file])
     
+    state.save()
     print("Content extraction completed!")
+    
+    if report_errors(errors):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
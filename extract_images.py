@@ -4,43 +4,254 @@ Script to extract images from docx and pptx files for Sensitive Beings exhibitio
 """
 
 import os
-import zipfile
+import sys
 import shutil
+import argparse
+import resource
 from pathlib import Path
 
-def extract_images_from_office_file(file_path, output_dir):
-    """Extract images from docx or pptx files"""
-    images_extracted = []
+from build_cache import BuildState
+from image_folders import GENERATED_IMAGE_DIRS
+from image_probe import probe_image, extension_matches
+from media_store import MediaStore, MEDIA_STORE_DIR
+from office_archive import OfficeArchive, open_archive
+from parallel_jobs import run_tasks, report_errors
+
+# Streaming extraction settings
+CHUNK_SIZE = 1024 * 1024  # Copy media members 1 MB at a time
+MAX_MEMBER_SIZE = 512 * 1024 * 1024  # Largest single media file we accept
+MAX_ARCHIVE_SIZE = 4 * 1024 * 1024 * 1024  # Total media bytes we accept per archive
+PARALLEL_MEMBER_SIZE = 16 * 1024 * 1024  # Members this big get their own worker task
+
+# Changing the extraction code invalidates previously extracted media
+CODE_FILES = [Path(__file__), Path(__file__).with_name('office_archive.py')]
+
+class MediaSizeError(Exception):
+    """Raised when a media member or archive exceeds the configured size ceiling"""
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in MB (of this process, or its largest child)"""
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+def copy_member(archive, member, target_path, chunk_size=CHUNK_SIZE, max_member_size=MAX_MEMBER_SIZE, store=None):
+    """
+    Copy one zip member to disk in fixed-size chunks.
+    With a MediaStore the bytes go into the store once, hashed on the way,
+    and target_path is placed from the blob.
+    Returns (bytes written, sha256 or None).
+    """
+    if member.file_size > max_member_size:
+        raise MediaSizeError(f"{member.filename} is {member.file_size} bytes (limit {max_member_size})")
     
+    written = 0
+    target = store.writer(os.path.splitext(target_path)[1]) if store else open(target_path, 'wb')
     try:
-        with zipfile.ZipFile(file_path, 'r') as zip_file:
-            # Look for media files in the archive
-            media_files = [name for name in zip_file.namelist() if name.startswith('word/media/') or name.startswith('ppt/media/')]
+        with archive.open(member) as source:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                # Don't trust the header size alone, the stream can be longer
+                if written > max_member_size:
+                    raise MediaSizeError(f"{member.filename} exceeds {max_member_size} bytes")
+                target.write(chunk)
+    except Exception:
+        if store:
+            target.abort()
+        else:
+            target.close()
+        raise
+    
+    if not store:
+        target.close()
+        return written, None
+    
+    digest = target.commit()
+    store.place(target.blob, target_path)
+    return written, digest
+
+def plan_media(archive, max_archive_size=MAX_ARCHIVE_SIZE):
+    """
+    Pick the media members of an open OfficeArchive to extract, in archive order.
+    Uses the sizes from the central directory, so the archive budget is
+    decided before anything is written.
+    Returns (members, skipped) where skipped is a list of messages.
+    """
+    members = []
+    skipped = []
+    archive_bytes = 0
+    
+    # Media files are already indexed by the archive reader
+    for media_file in archive.media():
+        # Stop before planning anything that would break the archive budget
+        if archive_bytes + media_file.file_size > max_archive_size:
+            skipped.append(f"media exceeds archive limit of {max_archive_size} bytes, stopped at {media_file.filename}")
+            break
+        archive_bytes += media_file.file_size
+        members.append(media_file)
+    
+    return members, skipped
+
+def extract_members(file_path, member_names, output_dir, chunk_size=CHUNK_SIZE, max_member_size=MAX_MEMBER_SIZE,
+                    store=None, max_archive_size=MAX_ARCHIVE_SIZE):
+    """
+    Stream the named members of one archive (a path or an open OfficeArchive) into output_dir.
+    Stops once the bytes actually written pass max_archive_size, whatever the
+    central directory claimed the members hold.
+    Returns (extracted, skipped): extracted is a list of (filename, bytes, sha256) tuples,
+    sha256 being None unless a MediaStore is given.
+    """
+    extracted = []
+    skipped = []
+    archive_bytes = 0
+    
+    # Create output directory
+    os.makedirs(output_dir, exist_ok=True)
+    
+    with open_archive(file_path) as archive:
+        for member_name in member_names:
+            media_file = archive.members[member_name]
             
-            if not media_files:
-                print(f"No media files found in {file_path}")
-                return images_extracted
+            # Get the filename
+            filename = os.path.basename(media_file.filename)
+            target_path = os.path.join(output_dir, filename)
             
-            # Create output directory
-            os.makedirs(output_dir, exist_ok=True)
+            # Extract the file without ever holding it fully in memory, and
+            # never past what is left of the archive budget
+            remaining = max_archive_size - archive_bytes
+            try:
+                written, digest = copy_member(archive, media_file, target_path, chunk_size,
+                                              min(max_member_size, remaining), store)
+            except MediaSizeError as e:
+                # Never leave a truncated file behind
+                if os.path.exists(target_path):
+                    os.remove(target_path)
+                if remaining < max_member_size:
+                    skipped.append(f"media exceeds archive limit of {max_archive_size} bytes, stopped at {filename}")
+                    break
+                skipped.append(f"Skipped {filename}: {e}")
+                continue
             
-            # Extract each media file
-            for media_file in media_files:
-                # Get the filename
-                filename = os.path.basename(media_file)
-                
-                # Extract the file
-                with zip_file.open(media_file) as source:
-                    with open(os.path.join(output_dir, filename), 'wb') as target:
-                        target.write(source.read())
-                
-                images_extracted.append(filename)
-                print(f"Extracted: {filename}")
+            archive_bytes += written
+            extracted.append((filename, written, digest))
+    
+    return extracted, skipped
+
+def extract_images_from_office_file(file_path, output_dir, chunk_size=CHUNK_SIZE,
+                                    max_member_size=MAX_MEMBER_SIZE, max_archive_size=MAX_ARCHIVE_SIZE, store=None):
+    """Extract images from docx or pptx files (a path or an open OfficeArchive), streaming each member in chunks"""
+    with open_archive(file_path) as archive:
+        members, skipped = plan_media(archive, max_archive_size)
+        
+        if not members:
+            print(f"No media files found in {archive.path}")
+            return []
+        
+        extracted, member_skips = extract_members(archive, [m.filename for m in members], output_dir,
+                                                  chunk_size, max_member_size, store, max_archive_size)
     
-    except Exception as e:
-        print(f"Error extracting from {file_path}: {e}")
+    for filename, written, _ in extracted:
+        print(f"Extracted: {filename} ({written} bytes)")
+    for message in member_skips + skipped:
+        print(message)
     
-    return images_extracted
+    return [filename for filename, _, _ in extracted]
+
+def extract_all_archives(archives, jobs=1, chunk_size=CHUNK_SIZE, max_member_size=MAX_MEMBER_SIZE,
+                         max_archive_size=MAX_ARCHIVE_SIZE, state=None, store=None):
+    """
+    Extract media from many archives across a process pool.
+    archives is a list of (file_path, output_dir) pairs. Each archive's small
+    members form one task and every member of PARALLEL_MEMBER_SIZE or more gets
+    its own task, so one huge video does not hold up a whole archive. The
+    archive's byte ceiling is shared out between its tasks by their declared
+    sizes, so the bytes its tasks actually write together stay under it.
+    When two archives write the same output file the later archive wins, as in
+    a sequential run. With a BuildState, archives whose inputs and outputs are
+    unchanged since the last run are skipped. With a MediaStore, every
+    extracted file is recorded in the store manifest.
+    Returns (results, errors) with results in archive order.
+    """
+    plans = []
+    errors = []
+    owners = {}
+    
+    for file_path, output_dir in archives:
+        try:
+            with OfficeArchive(file_path) as archive:
+                members, skipped = plan_media(archive, max_archive_size)
+        except Exception as e:
+            errors.append((str(file_path), f"{type(e).__name__}: {e}"))
+            continue
+        
+        for member in members:
+            owners[os.path.join(output_dir, os.path.basename(member.filename))] = (file_path, member.filename)
+        plans.append((file_path, output_dir, members, skipped))
+    
+    tasks = []
+    task_archive = []
+    results = []
+    for index, (file_path, output_dir, members, skipped) in enumerate(plans):
+        # Drop members a later archive overwrites anyway
+        members = [m for m in members
+                   if owners[os.path.join(output_dir, os.path.basename(m.filename))] == (file_path, m.filename)]
+        
+        step = f"extract_images:{file_path}"
+        params = {"output_dir": str(output_dir), "members": [m.filename for m in members],
+                  "max_member_size": max_member_size, "store": store.root if store else None}
+        up_to_date = state is not None and state.is_fresh(step, [file_path] + CODE_FILES, params)
+        results.append({"file": file_path, "extracted": [], "skipped": [], "up_to_date": up_to_date,
+                        "step": step, "params": params, "failed": False})
+        if up_to_date:
+            continue
+        
+        small = [m.filename for m in members if m.file_size < PARALLEL_MEMBER_SIZE]
+        large = [m.filename for m in members if m.file_size >= PARALLEL_MEMBER_SIZE]
+        
+        groups = ([small] if small else []) + [[name] for name in large]
+        sizes = {m.filename: m.file_size for m in members}
+        declared = sum(sizes.values())
+        for group in groups:
+            if declared:
+                budget = max_archive_size * sum(sizes[name] for name in group) // declared
+            else:
+                budget = max_archive_size // len(groups)
+            tasks.append((file_path, group, output_dir, chunk_size, max_member_size, store, budget))
+            task_archive.append(index)
+    
+    outcomes = run_tasks(extract_members, tasks, jobs)
+    
+    for index, task, (outcome, error) in zip(task_archive, tasks, outcomes):
+        if error:
+            errors.append((f"{task[0]} [{', '.join(task[1])}]", error))
+            results[index]["failed"] = True
+            continue
+        extracted, skipped = outcome
+        results[index]["extracted"].extend(extracted)
+        results[index]["skipped"].extend(skipped)
+    
+    for (file_path, output_dir, members, skipped), result in zip(plans, results):
+        if result["up_to_date"]:
+            continue
+        
+        # Keep the archive's own member order regardless of how tasks were split
+        order = {os.path.basename(m.filename): i for i, m in enumerate(members)}
+        result["extracted"].sort(key=lambda item: order[item[0]])
+        result["skipped"].extend(skipped)
+        
+        outputs = [os.path.join(output_dir, filename) for filename, _, _ in result["extracted"]]
+        if store is not None:
+            for output, (filename, written, digest) in zip(outputs, result["extracted"]):
+                store.record(output, digest, store.blob_path(digest, os.path.splitext(filename)[1]), written)
+        if state is not None and not result["failed"]:
+            state.record(result["step"], [file_path] + CODE_FILES, outputs, result["params"])
+    
+    return results, errors
 
 def organize_artwork_images(images_dir):
     """Organize extracted images by artist/artwork"""
@@ -60,6 +271,22 @@ def organize_artwork_images(images_dir):
     
     print("Created artist directories for image organization")
 
+def manifest_entry(image_file, images_dir):
+    """Manifest record for one image, with its real format and pixel size from the header"""
+    entry = {
+        "filename": image_file.name,
+        "path": str(image_file.relative_to(images_dir)),
+        "size": image_file.stat().st_size
+    }
+    
+    info = probe_image(image_file)
+    if info:
+        entry.update(info)
+        if not extension_matches(image_file, info):
+            print(f"Warning: {entry['path']} is really {info['format']}")
+    
+    return entry
+
 def create_image_manifest():
     """Create a manifest of available images for the website"""
     images_dir = Path("images")
@@ -70,17 +297,13 @@ def create_image_manifest():
     }
     
     if images_dir.exists():
-        # Scan for artist images
+        # Scan for artist images, skipping folders the build scripts generate
         for artist_dir in images_dir.iterdir():
-            if artist_dir.is_dir():
+            if artist_dir.is_dir() and artist_dir.name not in GENERATED_IMAGE_DIRS:
                 artist_images = []
                 for image_file in artist_dir.glob("*"):
                     if image_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                        artist_images.append({
-                            "filename": image_file.name,
-                            "path": str(image_file.relative_to(images_dir)),
-                            "size": image_file.stat().st_size if image_file.exists() else 0
-                        })
+                        artist_images.append(manifest_entry(image_file, images_dir))
                 
                 if artist_images:
                     manifest["artists"][artist_dir.name] = artist_images
@@ -88,11 +311,7 @@ def create_image_manifest():
         # Scan for general images
         for image_file in images_dir.glob("*"):
             if image_file.is_file() and image_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                manifest["general_images"].append({
-                    "filename": image_file.name,
-                    "path": str(image_file.relative_to(images_dir)),
-                    "size": image_file.stat().st_size
-                })
+                manifest["general_images"].append(manifest_entry(image_file, images_dir))
     
     # Write manifest
     import json
@@ -102,26 +321,59 @@ def create_image_manifest():
     print("Created image manifest")
     return manifest
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract images from docx and pptx files")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="bytes copied per read when streaming media (default: 1 MB)")
+    parser.add_argument("--max-member-size", type=int, default=MAX_MEMBER_SIZE,
+                        help="skip media members larger than this many bytes")
+    parser.add_argument("--max-archive-size", type=int, default=MAX_ARCHIVE_SIZE,
+                        help="stop extracting an archive once this many media bytes are written")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="worker processes for extraction (0 = one per CPU, default: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-extract every archive even if it has not changed")
+    parser.add_argument("--store", action="store_true",
+                        help=f"keep each distinct image once in {MEDIA_STORE_DIR} and link extracted files to it")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    limits = {
+        "chunk_size": args.chunk_size,
+        "max_member_size": args.max_member_size,
+        "max_archive_size": args.max_archive_size
+    }
+    
     content_dir = Path("content files")
     images_dir = Path("images")
     
     # Create images directory
     images_dir.mkdir(exist_ok=True)
     
-    # Extract from docx files
-    docx_files = list(content_dir.glob("*.docx"))
-    for docx_file in docx_files:
-        print(f"\nProcessing {docx_file.name}...")
-        extracted = extract_images_from_office_file(docx_file, images_dir / "documents")
-        print(f"Extracted {len(extracted)} images from {docx_file.name}")
+    # Extract from docx files, then pptx files
+    archives = [(docx_file, images_dir / "documents") for docx_file in sorted(content_dir.glob("*.docx"))]
+    archives += [(pptx_file, images_dir / "presentations") for pptx_file in sorted(content_dir.glob("*.pptx"))]
     
-    # Extract from pptx files
-    pptx_files = list(content_dir.glob("*.pptx"))
-    for pptx_file in pptx_files:
-        print(f"\nProcessing {pptx_file.name}...")
-        extracted = extract_images_from_office_file(pptx_file, images_dir / "presentations")
-        print(f"Extracted {len(extracted)} images from {pptx_file.name}")
+    state = BuildState(force=args.force)
+    store = MediaStore() if args.store else None
+    results, errors = extract_all_archives(archives, args.jobs, state=state, store=store, **limits)
+    state.save()
+    if store:
+        store.save()
+    
+    for result in results:
+        if result["up_to_date"]:
+            print(f"\nUp to date: {result['file'].name}")
+            continue
+        print(f"\nProcessing {result['file'].name}...")
+        if not result["extracted"] and not result["skipped"]:
+            print(f"No media files found in {result['file']}")
+        for filename, written, _ in result["extracted"]:
+            print(f"Extracted: {filename} ({written} bytes)")
+        for message in result["skipped"]:
+            print(message)
+        print(f"Extracted {len(result['extracted'])} images from {result['file'].name}")
     
     # Organize images
     organize_artwork_images(images_dir)
@@ -133,6 +385,10 @@ def main():
     print(f"Check the 'images' directory for extracted files")
     print(f"Image manifest created with {len(manifest['general_images'])} general images")
     print(f"Artist directories created for {len(manifest['artists'])} artists")
+    print(f"Peak memory: {peak_rss_mb():.1f} MB (largest worker: {peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB)")
+    
+    if report_errors(errors):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
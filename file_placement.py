@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Near-zero-copy file placement for the Sensitive Beings build scripts.
+Puts a file at a new path by reflink, hardlink, symlink or plain copy,
+picking the cheapest method each target filesystem supports. 'clone'
+does the same but never links, for files that may be edited in place.
+"""
+
+import os
+import sys
+import shutil
+
+STRATEGIES = ['auto', 'clone', 'reflink', 'hardlink', 'symlink', 'copy']
+
+# Order tried by 'auto'. Symlinks are left out because they break when the
+# site is copied or deployed without the source folders.
+AUTO_ORDER = ['reflink', 'hardlink', 'copy']
+
+# Order tried by 'clone': an edit to either file never shows up in the other
+CLONE_ORDER = ['reflink', 'copy']
+
+ORDERS = {'auto': AUTO_ORDER, 'clone': CLONE_ORDER}
+
+# FICLONE ioctl from linux/fs.h
+FICLONE = 0x40049409
+
+# (source device, target device) -> methods that failed there, so 'auto'
+# only probes each filesystem pair once per run
+_unsupported = {}
+
+def reflink(source, target):
+    """Copy-on-write clone of source at target, raising OSError where unsupported"""
+    if sys.platform.startswith('linux'):
+        import fcntl
+        with open(source, 'rb') as src, open(target, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                os.remove(target)
+                raise
+        shutil.copystat(source, target)
+        return
+
+    if sys.platform == 'darwin':
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(target), 0) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), target)
+        return
+
+    raise OSError(f"reflink is not supported on {sys.platform}")
+
+def hardlink(source, target):
+    os.link(source, target)
+
+def symlink(source, target):
+    # Relative links keep working if the whole tree is moved
+    os.symlink(os.path.relpath(source, os.path.dirname(os.path.abspath(target))), target)
+
+def copy(source, target):
+    shutil.copy2(source, target)
+
+METHODS = {'reflink': reflink, 'hardlink': hardlink, 'symlink': symlink, 'copy': copy}
+
+def _devices(source, target):
+    target_dir = os.path.dirname(os.path.abspath(target))
+    return os.stat(source).st_dev, os.stat(target_dir).st_dev
+
+def place_file(source, target, strategy='auto'):
+    """
+    Make target have source's content and return the method used.
+    The new file is built beside the target and renamed over it, so an
+    existing target is replaced atomically. With 'auto' or 'clone', each
+    method in AUTO_ORDER or CLONE_ORDER is tried until one works on this
+    pair of filesystems.
+    """
+    source = str(source)
+    target = str(target)
+
+    if strategy in ORDERS:
+        devices = _devices(source, target)
+        candidates = [m for m in ORDERS[strategy] if m not in _unsupported.get(devices, set())]
+    else:
+        devices = None
+        candidates = [strategy]
+
+    tmp_path = os.path.join(os.path.dirname(os.path.abspath(target)), f".{os.path.basename(target)}.{os.getpid()}.tmp")
+    for index, method in enumerate(candidates):
+        try:
+            METHODS[method](source, tmp_path)
+        except OSError:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            # 'copy' is the last resort, and explicit strategies should fail loudly
+            if devices is None or index == len(candidates) - 1:
+                raise
+            _unsupported.setdefault(devices, set()).add(method)
+            continue
+
+        os.replace(tmp_path, target)
+        return method
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Content-hashed asset names for the Sensitive Beings website.
+Builds a deployable copy of the site in site/ where every stylesheet,
+script and image a page or the catalog refers to is published as
+<name>.<hash>.<ext>, so it can be cached for good: a changed file gets a
+new name instead of going stale. index.html, artworks.html, workshops.html
+(and the rendered chapter pages) and the catalog JSON keep their names and
+are rewritten to point at the hashed files. asset_manifest.json maps each
+source path to its published name. Deep-zoom pyramids are published
+under names hashed from their source image. The source tree is left
+untouched.
+"""
+
+import os
+import re
+import glob
+import json
+import html
+import shutil
+import hashlib
+import argparse
+import posixpath
+from pathlib import Path
+from urllib.parse import unquote
+
+from build_cache import BuildState, place_if_changed
+from file_placement import STRATEGIES
+from catalog_store import database_chapters
+from catalog_stream import CATALOG_NDJSON
+from database_shards import ARTWORK_DATABASE, SHARD_DIR, write_database, write_if_changed
+from search_index import SEARCH_INDEX
+
+SITE_DIR = "site"
+ASSET_MANIFEST = "asset_manifest.json"
+ASSET_MANIFEST_VERSION = 1
+
+PAGES = ["index.html", "artworks.html", "workshops.html"]
+CHAPTER_PAGES = "artworks-*.html"
+DEEP_ZOOM_MANIFEST = "deep_zoom.json"
+
+HASH_LENGTH = 10
+ASSET_SUFFIXES = {'.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico',
+                  '.woff', '.woff2', '.mp4', '.webm'}
+
+ATTRIBUTE_PATTERN = re.compile(r'\b(src|href|srcset)="([^"]*)"')
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+def local_asset(url, base=''):
+    """Repository path of the file url points at from base, or None for pages, links and remote files"""
+    url = html.unescape(url.strip())
+    if not url or url.startswith(('#', 'data:', 'mailto:', 'tel:', '//')) or '://' in url:
+        return None
+    path = unquote(re.split(r'[?#]', url, maxsplit=1)[0])
+    path = posixpath.normpath(posixpath.join(base, path))
+    if Path(path).suffix.lower() not in ASSET_SUFFIXES or not os.path.isfile(path):
+        return None
+    return path
+
+def hashed_name(path, digest):
+    """path with the start of digest before its extension (styles/main.css -> styles/main.1a2b3c4d5e.css)"""
+    stem, suffix = posixpath.splitext(path)
+    return f"{stem}.{digest[:HASH_LENGTH]}{suffix}"
+
+def replace_file_name(url, published):
+    """url pointing at published's file name instead, keeping its folder, query and fragment as written"""
+    match = re.match(r'([^?#]*/)?[^/?#]*(.*)$', url)
+    return f"{match.group(1) or ''}{posixpath.basename(published)}{match.group(2)}"
+
+class AssetPublisher:
+    """
+    Publishes assets under their hashed names in output, once each.
+    assets maps source paths to published paths, both relative to the
+    repository root.
+    """
+
+    def __init__(self, state, output=SITE_DIR, placement='auto'):
+        self.state = state
+        self.output = Path(output)
+        self.placement = placement
+        self.assets = {}
+        self.written = 0
+
+    def publish(self, path):
+        """Published path of the asset at path"""
+        if path in self.assets:
+            return self.assets[path]
+
+        if path.endswith('.css'):
+            # A stylesheet's hash covers the hashed names of what it refers to
+            with open(path, 'r', encoding='utf-8') as f:
+                data = self.rewrite_css(f.read(), posixpath.dirname(path)).encode('utf-8')
+            published = hashed_name(path, hashlib.sha256(data).hexdigest())
+            self.written += write_if_changed(self.output / published, data)
+        else:
+            published = hashed_name(path, self.state.fingerprint(path))
+            destination = self.output / published
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            self.written += place_if_changed(self.state, path, destination, self.placement) is not None
+
+        self.assets[path] = published
+        return published
+
+    def rewrite_url(self, url, base=''):
+        path = local_asset(url, base)
+        return replace_file_name(url, self.publish(path)) if path else url
+
+    def rewrite_css(self, text, base=''):
+        return CSS_URL_PATTERN.sub(
+            lambda m: f"url({m.group(1)}{self.rewrite_url(m.group(2), base)}{m.group(1)})", text)
+
+    def rewrite_page(self, text):
+        """Page markup with src, href, srcset and inline url() references pointing at published assets"""
+        def attribute(match):
+            name, value = match.groups()
+            if name == 'srcset':
+                # "path 480w, path 960w": only the path of each candidate changes
+                value = ', '.join(re.sub(r'^(\S+)', lambda m: self.rewrite_url(m.group(1)), candidate.strip())
+                                  for candidate in value.split(','))
+            else:
+                value = self.rewrite_url(value)
+            return f'{name}="{value}"'
+
+        return self.rewrite_css(ATTRIBUTE_PATTERN.sub(attribute, text))
+
+    def place(self, path, published=None):
+        """Publish path under published, or its own name for files scripts fetch by a fixed URL"""
+        destination = self.output / (published or path)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        self.written += place_if_changed(self.state, path, destination, self.placement) is not None
+
+def publish_pages(publisher, pages):
+    for page in pages:
+        with open(page, 'r', encoding='utf-8') as f:
+            content = publisher.rewrite_page(f.read())
+        if write_if_changed(publisher.output / page, content.encode('utf-8')):
+            print(f"📝 {page}")
+
+def publish_catalog(publisher, database):
+    """
+    Write the database with published image paths to the site, with its
+    shards, NDJSON stream and search index rebuilt from it.
+    """
+    database = json.loads(json.dumps(database))
+    for _, chapter in database_chapters(database):
+        for artist in chapter['artists']:
+            for artwork in artist.get('artworks', []):
+                if artwork.get('image'):
+                    artwork['image'] = publisher.rewrite_url(artwork['image'])
+
+    output = publisher.output
+    write_database(database, output / ARTWORK_DATABASE, output / SHARD_DIR, output / CATALOG_NDJSON,
+                   output / SEARCH_INDEX)
+
+def publish_deep_zoom(publisher, manifest):
+    """
+    Publish each pyramid under names hashed from its source image and
+    tiling settings: the .dzi as <name>.<hash>.dzi and the tiles in
+    <tiles>.<hash>/, so a re-tiled image never serves stale tiles. The
+    published deep_zoom.json is keyed by published image paths and points
+    at the hashed names; only it keeps a fixed name.
+    """
+    published = {}
+    for image, entry in manifest.items():
+        settings = {field: value for field, value in entry.items() if field not in ('dzi', 'tiles')}
+        digest = hashlib.sha256(json.dumps([publisher.state.fingerprint(image), settings], sort_keys=True,
+                                           ensure_ascii=False).encode('utf-8')).hexdigest()
+        dzi = hashed_name(entry['dzi'], digest)
+        tiles = f"{entry['tiles']}.{digest[:HASH_LENGTH]}"
+
+        publisher.place(entry['dzi'], dzi)
+        for tile in sorted(Path(entry['tiles']).rglob('*')):
+            if tile.is_file():
+                publisher.place(tile.as_posix(), posixpath.join(tiles, tile.relative_to(entry['tiles']).as_posix()))
+        publisher.assets[entry['dzi']] = dzi
+        publisher.assets[entry['tiles']] = tiles
+
+        published[publisher.rewrite_url(image)] = {**entry, 'dzi': dzi, 'tiles': tiles}
+    data = json.dumps(published, indent=2, ensure_ascii=False).encode('utf-8')
+    write_if_changed(publisher.output / DEEP_ZOOM_MANIFEST, data)
+
+def prune(output, previous, current):
+    """Remove hashed files (and tile folders) an earlier run published that nothing refers to now"""
+    removed = 0
+    for path in set(previous.values()) - set(current.values()):
+        target = Path(output) / path
+        if target.is_dir():
+            shutil.rmtree(target)
+            removed += 1
+        elif target.exists():
+            target.unlink()
+            removed += 1
+    return removed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the site with content-hashed asset names")
+    parser.add_argument("--output", default=SITE_DIR, help=f"folder to build the site in (default: {SITE_DIR})")
+    parser.add_argument("--placement", choices=STRATEGIES, default="auto",
+                        help="how unchanged assets are put in the site folder (default: auto)")
+    parser.add_argument("--force", action="store_true", help="publish every asset even if it is current")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    output = Path(args.output)
+    manifest_path = output / ASSET_MANIFEST
+
+    previous = {}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('assets', {})
+
+    state = BuildState(force=args.force)
+    publisher = AssetPublisher(state, output, args.placement)
+
+    pages = [page for page in PAGES if os.path.exists(page)] + sorted(glob.glob(CHAPTER_PAGES))
+    publish_pages(publisher, pages)
+
+    if os.path.exists(ARTWORK_DATABASE):
+        with open(ARTWORK_DATABASE, 'r', encoding='utf-8') as f:
+            publish_catalog(publisher, json.load(f))
+    else:
+        print(f"⚠️  {ARTWORK_DATABASE} not found, publishing the pages only")
+
+    if os.path.exists(DEEP_ZOOM_MANIFEST):
+        with open(DEEP_ZOOM_MANIFEST, 'r', encoding='utf-8') as f:
+            publish_deep_zoom(publisher, json.load(f))
+
+    assets = dict(sorted(publisher.assets.items()))
+    removed = prune(output, previous, assets)
+    write_if_changed(manifest_path, json.dumps({'version': ASSET_MANIFEST_VERSION, 'assets': assets},
+                                               indent=2, ensure_ascii=False).encode('utf-8'))
+    state.save()
+
+    print(f"🔖 {len(assets)} assets fingerprinted, {publisher.written} written, {removed} stale removed")
+    print(f"✅ Site built in {output}/ (asset map in {manifest_path})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Layout of the images/ folder shared by the Sensitive Beings build scripts.
+Kept apart from the stages themselves so importing it costs nothing.
+"""
+
+IMAGES_DIR = "images"
+
+# Folders under images/ written by other build stages rather than by artists
+GENERATED_IMAGE_DIRS = ['store', 'derived', 'tiles']
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash index for the Sensitive Beings exhibition images.
+The same artworks turn up under different names in artwork/,
+Exhibition Chapters/Image/ and images/presentations/. Every image gets a
+64-bit DCT perceptual hash; images whose hashes are within a few bits of
+each other are grouped as the same picture, and each group is matched to
+the artwork_database.json entry whose image it contains.
+
+Hashes are computed for a whole batch at once and compared with a
+vectorized Hamming distance, so even thousands of images take seconds.
+Requires Pillow and NumPy (pip install Pillow numpy).
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from build_cache import BuildState
+from image_placeholders import np, load_sample, downsample, IMAGE_EXTENSIONS, BATCH_SIZE
+
+HASH_INDEX_FILE = "image_hashes.json"
+MATCHES_FILE = "image_matches.json"
+
+# Folders holding the same artworks under different names
+IMAGE_SETS = {
+    'artwork': "artwork",
+    'chapters': "Exhibition Chapters/Image",
+    'presentations': "images/presentations"
+}
+
+# Images are hashed from a HASH_SAMPLE_SIZE greyscale square; the hash keeps
+# the lowest HASH_SIZE x HASH_SIZE DCT frequencies
+HASH_SAMPLE_SIZE = 32
+HASH_SIZE = 8
+
+# Hashes this many bits apart or fewer are treated as the same picture
+MATCH_THRESHOLD = 10
+
+# Bump when the hash changes so cached hashes are recomputed
+HASH_VERSION = 1
+
+# Hashes are compared this many rows at a time, so memory stays flat however many images there are
+HAMMING_BLOCK = 1024
+
+def dct_matrix(n):
+    """Orthonormal DCT-II basis as an n x n matrix"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.sqrt(2 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+def phash_batch(samples):
+    """
+    64-bit perceptual hashes for an (N, S, S, 3) batch of RGB samples:
+    greyscale, shrink to HASH_SAMPLE_SIZE, 2D DCT, and one bit per low
+    frequency telling whether it is above that image's median.
+    """
+    grey = samples @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    grey = downsample(grey[..., None], HASH_SAMPLE_SIZE)[..., 0]
+
+    basis = dct_matrix(HASH_SAMPLE_SIZE).astype(np.float32)
+    frequencies = basis @ grey @ basis.T
+    low = frequencies[:, :HASH_SIZE, :HASH_SIZE].reshape(len(samples), -1)
+
+    # The DC term only says how bright the image is, leave it out of the median
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    bits = (low > median).astype(np.uint64)
+    weights = np.uint64(1) << np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64)[::-1]
+    return (bits * weights).sum(axis=1, dtype=np.uint64)
+
+# Set bits of every byte value, for NumPy versions without bitwise_count
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8) if np is not None else None
+
+def hamming(hashes_a, hashes_b):
+    """(len(a), len(b)) matrix of bit differences between two uint64 hash arrays"""
+    diff = np.bitwise_xor(hashes_a[:, None], hashes_b[None, :])
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(diff)
+    return POPCOUNT[diff.view(np.uint8)].reshape(*diff.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+def hamming_blocks(hashes_a, hashes_b, block=HAMMING_BLOCK):
+    """(start, distances) for each run of block rows of hamming(hashes_a, hashes_b)"""
+    for start in range(0, len(hashes_a), block):
+        yield start, hamming(hashes_a[start:start + block], hashes_b)
+
+def iter_set_images(image_sets=IMAGE_SETS):
+    """(set name, path) for every image in the image sets"""
+    for name, folder in image_sets.items():
+        folder = Path(folder)
+        if not folder.exists():
+            continue
+        for path in sorted(folder.iterdir()):
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                yield name, path.as_posix()
+
+def hash_images(paths, index, state):
+    """Fill index[path] = hex hash for every path, reusing hashes of unchanged files"""
+    params = {'version': HASH_VERSION, 'sample': HASH_SAMPLE_SIZE, 'size': HASH_SIZE}
+    stale = [path for path in paths if not (path in index and state.is_fresh(f"phash:{path}", [path], params))]
+
+    # A changed file that no longer loads must not keep the hash of its old content
+    for path in stale:
+        index.pop(path, None)
+
+    errors = []
+    for start in range(0, len(stale), BATCH_SIZE):
+        samples = []
+        loaded = []
+        for path in stale[start:start + BATCH_SIZE]:
+            try:
+                samples.append(load_sample(path))
+                loaded.append(path)
+            except Exception as e:
+                errors.append((path, f"{type(e).__name__}: {e}"))
+        if not samples:
+            continue
+
+        for path, value in zip(loaded, phash_batch(np.stack(samples).astype(np.float32))):
+            index[path] = f"{int(value):016x}"
+            state.record(f"phash:{path}", [path], [], params)
+    return len(stale), errors
+
+def group_duplicates(paths, hashes, threshold):
+    """Connected groups of images within threshold bits of each other, as lists of indices"""
+    parent = list(range(len(paths)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for start, distances in hamming_blocks(hashes, hashes):
+        for i, j in zip(*np.nonzero(distances <= threshold)):
+            i += start
+            if i < j:
+                parent[find(i)] = find(j)
+
+    groups = {}
+    for i in range(len(paths)):
+        groups.setdefault(find(i), []).append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+def nearest(hashes, references):
+    """(index into references, bit difference) of the closest reference hash to each hash"""
+    closest = np.empty(len(hashes), dtype=np.intp)
+    bits = np.empty(len(hashes), dtype=np.uint8)
+    for start, distances in hamming_blocks(hashes, references):
+        rows = np.arange(len(distances))
+        closest[start:start + len(distances)] = best = np.argmin(distances, axis=1)
+        bits[start:start + len(distances)] = distances[rows, best]
+    return closest, bits
+
+def build_matches(database, image_sets=IMAGE_SETS, threshold=MATCH_THRESHOLD, force=False):
+    """
+    Hash every set image and catalog image, then return
+    {'images': {path: {...}}, 'duplicates': [[paths]]} where each image
+    carries its set, hash and matched catalog entry (or None).
+    """
+    state = BuildState(force=force)
+    index = {}
+    if os.path.exists(HASH_INDEX_FILE):
+        with open(HASH_INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+    catalog = {}
+    for chapter in database.values():
+        for artist in chapter.get('artists', []):
+            for artwork in artist.get('artworks', []):
+                if artwork.get('image') and os.path.isfile(artwork['image']):
+                    catalog[artwork['image']] = {'artist': artist['key'], 'title': artwork['title']}
+
+    sets = {path: name for name, path in iter_set_images(image_sets)}
+    for path in catalog:
+        sets.setdefault(path, 'catalog')
+    paths = list(sets)
+
+    hashed, errors = hash_images(paths, index, state)
+    for path, error in errors:
+        print(f"  ⚠️  {path}: {error}")
+    paths = [path for path in paths if path in index]
+
+    with open(HASH_INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump({path: index[path] for path in paths}, f, indent=2)
+    state.save()
+    print(f"🔑 {len(paths)} images hashed ({hashed} new or changed)")
+
+    if not paths:
+        return {'images': {}, 'duplicates': []}
+
+    hashes = np.array([int(index[path], 16) for path in paths], dtype=np.uint64)
+    groups = group_duplicates(paths, hashes, threshold)
+
+    # Each image takes the nearest catalog image within the threshold
+    catalog_indices = [i for i, path in enumerate(paths) if path in catalog]
+    if catalog_indices:
+        closest, bits = nearest(hashes, hashes[catalog_indices])
+    images = {}
+    for i, path in enumerate(paths):
+        match = None
+        if catalog_indices and bits[i] <= threshold:
+            reference = paths[catalog_indices[closest[i]]]
+            match = {**catalog[reference], 'image': reference, 'distance': int(bits[i])}
+        images[path] = {'set': sets[path], 'hash': index[path], 'match': match}
+
+    duplicates = [sorted(paths[i] for i in members) for members in groups]
+    return {'images': images, 'duplicates': sorted(duplicates)}
+
+def load_assignments(path=MATCHES_FILE, image_set='presentations'):
+    """
+    [{'artist': artist key, 'title', 'image'}] for the images of image_set a
+    build_matches() file matched to catalog entries, the closest image
+    where several match one artwork. Empty when there is no match file.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            matches = json.load(f)
+    except FileNotFoundError:
+        return []
+
+    closest = {}
+    for image, entry in sorted(matches.get('images', {}).items()):
+        match = entry.get('match')
+        if entry.get('set') != image_set or not match:
+            continue
+        key = (match['artist'], match['title'])
+        if key not in closest or match['distance'] < closest[key][1]:
+            closest[key] = (image, match['distance'])
+    return [{'artist': artist, 'title': title, 'image': image} for (artist, title), (image, distance) in closest.items()]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Match images across the image sets by perceptual hash")
+    parser.add_argument("--threshold", type=int, default=MATCH_THRESHOLD,
+                        help=f"max differing hash bits for two images to match (default: {MATCH_THRESHOLD})")
+    parser.add_argument("--output", default=MATCHES_FILE, help=f"where to write the matches (default: {MATCHES_FILE})")
+    parser.add_argument("--force", action="store_true", help="rehash every image")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if np is None:
+        print("❌ NumPy and Pillow are required: pip install numpy Pillow")
+        sys.exit(1)
+
+    with open('artwork_database.json', 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    matches = build_matches(database, threshold=args.threshold, force=args.force)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(matches, f, indent=2, ensure_ascii=False)
+
+    matched = sum(1 for image in matches['images'].values() if image['match'] and image['set'] != 'catalog')
+    unmatched = [path for path, image in matches['images'].items() if not image['match']]
+    print(f"🎯 {matched} images matched to catalog entries, {len(unmatched)} unmatched")
+
+    if matches['duplicates']:
+        print(f"🔁 {len(matches['duplicates'])} groups of near-duplicates:")
+        for group in matches['duplicates']:
+            print(f"  {', '.join(group)}")
+
+    print(f"✅ Matches written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Low-quality image placeholders and dominant colours for the Sensitive Beings website.
+Every image in images/<artist>/, artwork/ and Exhibition Chapters/Image/ gets
+a tiny blurred preview (as a data URI) and a small palette. Artworks carry
+theirs inline in artwork_database.json so the gallery can paint before any
+image loads; the other images' go to image_placeholders.json.
+
+Images are decoded to a small fixed-size sample with Pillow, then a whole
+batch is downsampled, blurred and colour-counted at once with NumPy.
+Requires Pillow and NumPy (pip install Pillow numpy).
+"""
+
+import io
+import os
+import sys
+import json
+import base64
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image, ImageOps
+except ImportError:
+    np = None
+    Image = None
+
+from build_cache import BuildState
+from image_folders import IMAGES_DIR, GENERATED_IMAGE_DIRS
+from database_shards import write_database, write_if_changed
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+PLACEHOLDER_SOURCES = ["artwork", "Exhibition Chapters/Image"]
+PLACEHOLDERS_FILE = "image_placeholders.json"
+
+# Every image is sampled to SAMPLE_SIZE square; the placeholder is a
+# PLACEHOLDER_SIZE square the browser stretches back to the image's aspect
+SAMPLE_SIZE = 64
+PLACEHOLDER_SIZE = 8
+PALETTE_SIZE = 5
+BATCH_SIZE = 64
+
+# Colours are counted in 3-bit-per-channel bins, 512 bins per image; palette
+# colours closer than MIN_COLOUR_DISTANCE to a more common one are dropped
+QUANT_BITS = 3
+BINS = 1 << (3 * QUANT_BITS)
+PALETTE_CANDIDATES = 16
+MIN_COLOUR_DISTANCE = 40
+
+# Bump when the output changes so cached placeholders are recomputed
+PLACEHOLDER_VERSION = 1
+
+def iter_placeholder_sources():
+    """Artist folders under images/ plus the artwork and chapter image folders"""
+    images_dir = Path(IMAGES_DIR)
+    folders = []
+    if images_dir.exists():
+        folders = sorted(d for d in images_dir.iterdir() if d.is_dir() and d.name not in GENERATED_IMAGE_DIRS)
+    folders += [Path(source) for source in PLACEHOLDER_SOURCES]
+
+    for folder in folders:
+        if not folder.exists():
+            continue
+        for path in sorted(folder.iterdir()):
+            if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+                yield path.as_posix()
+
+def load_sample(path):
+    """Decode an image to an RGB SAMPLE_SIZE x SAMPLE_SIZE uint8 array"""
+    with Image.open(path) as img:
+        # JPEG can decode straight to a fraction of its size
+        img.draft('RGB', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+            # Transparent areas show the page background, which is white
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            img = img.convert('RGB')
+        img = img.resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.BOX, reducing_gap=2.0)
+        return np.asarray(img, dtype=np.uint8)
+
+def downsample(batch, size):
+    """Box-average an (N, S, S, C) batch down to (N, size, size, C)"""
+    n, s = batch.shape[:2]
+    block = s // size
+    return batch.reshape(n, size, block, size, block, batch.shape[-1]).mean(axis=(2, 4))
+
+def blur(batch):
+    """Separable [1, 2, 1] blur over every image in the batch, edges clamped"""
+    padded = np.pad(batch, ((0, 0), (1, 1), (0, 0), (0, 0)), mode='edge')
+    batch = (padded[:, :-2] + 2 * padded[:, 1:-1] + padded[:, 2:]) / 4
+    padded = np.pad(batch, ((0, 0), (0, 0), (1, 1), (0, 0)), mode='edge')
+    return (padded[:, :, :-2] + 2 * padded[:, :, 1:-1] + padded[:, :, 2:]) / 4
+
+def colour_bins(batch, candidates=PALETTE_CANDIDATES):
+    """
+    Busiest colour bins of each image, as (N, candidates, 3) mean colours and
+    (N, candidates) pixel shares, most common first. All images are counted
+    in one bincount by giving each its own range of bins.
+    """
+    n = batch.shape[0]
+    pixels = batch.reshape(n, -1, 3).astype(np.int64)
+    shift = 8 - QUANT_BITS
+    bins = (pixels[..., 0] >> shift) << (2 * QUANT_BITS) | (pixels[..., 1] >> shift) << QUANT_BITS | (pixels[..., 2] >> shift)
+    bins += np.arange(n)[:, None] * BINS
+
+    counts = np.bincount(bins.ravel(), minlength=n * BINS).reshape(n, BINS)
+    sums = np.stack([
+        np.bincount(bins.ravel(), weights=pixels[..., channel].ravel(), minlength=n * BINS).reshape(n, BINS)
+        for channel in range(3)
+    ], axis=-1)
+
+    top = np.argsort(-counts, axis=1, kind='stable')[:, :candidates]
+    top_counts = np.take_along_axis(counts, top, axis=1)
+    top_sums = np.take_along_axis(sums, top[..., None], axis=1)
+    colours = top_sums / np.maximum(top_counts, 1)[..., None]
+    return colours, top_counts / pixels.shape[1]
+
+def distinct_palette(colours, shares, count=PALETTE_SIZE):
+    """Up to count colours, skipping ones too close to a more common pick"""
+    palette = []
+    for colour, share in zip(colours, shares):
+        if share == 0 or len(palette) == count:
+            break
+        if all(np.linalg.norm(colour - chosen) >= MIN_COLOUR_DISTANCE for chosen in palette):
+            palette.append(colour)
+    return palette
+
+def encode_placeholder(pixels):
+    """A tiny PNG data URI for a (size, size, 3) array"""
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(np.rint(pixels), 0, 255).astype(np.uint8), 'RGB').save(buffer, 'PNG', optimize=True)
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def hex_colour(rgb):
+    return '#' + ''.join(f"{int(round(c)):02x}" for c in rgb)
+
+def compute_placeholders(paths):
+    """{path: {'placeholder', 'palette'}} for the given images, BATCH_SIZE images at a time"""
+    results = {}
+    errors = []
+
+    for start in range(0, len(paths), BATCH_SIZE):
+        samples = []
+        loaded = []
+        for path in paths[start:start + BATCH_SIZE]:
+            try:
+                samples.append(load_sample(path))
+                loaded.append(path)
+            except Exception as e:
+                errors.append((path, f"{type(e).__name__}: {e}"))
+        if not samples:
+            continue
+
+        batch = np.stack(samples).astype(np.float32)
+        previews = blur(downsample(batch, PLACEHOLDER_SIZE))
+        colours, shares = colour_bins(batch)
+
+        for i, path in enumerate(loaded):
+            results[path] = {
+                'placeholder': encode_placeholder(previews[i]),
+                'palette': [hex_colour(colour) for colour in distinct_palette(colours[i], shares[i])]
+            }
+    return results, errors
+
+def database_artworks(database):
+    return [artwork for chapter in database.values() if isinstance(chapter, dict)
+            for artist in chapter.get('artists', []) for artwork in artist.get('artworks', [])]
+
+def load_placeholders(path=PLACEHOLDERS_FILE):
+    """Placeholders of non-artwork images from an earlier run, keyed by image path"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def known_placeholders(database):
+    """Placeholders already stored inline in a database, keyed by image path"""
+    known = {}
+    for artwork in database_artworks(database):
+        if artwork.get('placeholder'):
+            known[artwork['image']] = {'placeholder': artwork['placeholder'], 'palette': artwork.get('palette', [])}
+    return known
+
+def add_placeholders(database, state=None, force=False, previous=None, placeholders_file=PLACEHOLDERS_FILE):
+    """
+    Fill in placeholder and palette for every artwork in the database, and
+    write the rest to placeholders_file keyed by image path. Placeholders
+    of unchanged images are reused from the database and that file, or
+    from previous when the database is being rebuilt from scratch.
+    Returns the non-artwork placeholders.
+    """
+    if np is None:
+        print("⚠️  NumPy and Pillow are needed for placeholders, skipping them")
+        return {}
+
+    own_state = state is None
+    if own_state:
+        state = BuildState(force=force)
+
+    known = load_placeholders(placeholders_file)
+    # Databases from before image_placeholders.json kept them inline
+    known.update(database.pop('placeholders', {}))
+    if previous:
+        known.update(previous.get('placeholders', {}))
+        known.update(known_placeholders(previous))
+    known.update(known_placeholders(database))
+    artworks = database_artworks(database)
+
+    paths = list(iter_placeholder_sources())
+    paths += [artwork['image'] for artwork in artworks if artwork.get('image') and os.path.isfile(artwork['image'])]
+    paths = list(dict.fromkeys(paths))
+
+    params = {'version': PLACEHOLDER_VERSION, 'sample': SAMPLE_SIZE, 'size': PLACEHOLDER_SIZE, 'palette': PALETTE_SIZE}
+    stale = [path for path in paths if not (path in known and state.is_fresh(f"placeholder:{path}", [path], params))]
+    print(f"🎨 {len(paths)} images, {len(stale)} need placeholders")
+
+    computed, errors = compute_placeholders(stale)
+    for path, entry in computed.items():
+        known[path] = entry
+        state.record(f"placeholder:{path}", [path], [], params)
+    for path, error in errors:
+        print(f"  ⚠️  {path}: {error}")
+
+    used = set()
+    for artwork in artworks:
+        entry = known.get(artwork.get('image'))
+        if entry:
+            artwork['placeholder'] = entry['placeholder']
+            artwork['palette'] = entry['palette']
+            used.add(artwork['image'])
+
+    others = {path: known[path] for path in paths if path in known and path not in used}
+    write_if_changed(placeholders_file, json.dumps(others, indent=2, ensure_ascii=False).encode('utf-8'))
+    if own_state:
+        state.save()
+    return others
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Add blurred placeholders and palettes to artwork_database.json")
+    parser.add_argument("--force", action="store_true", help="recompute every placeholder")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if np is None:
+        print("❌ NumPy and Pillow are required: pip install numpy Pillow")
+        sys.exit(1)
+
+    with open('artwork_database.json', 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    others = add_placeholders(database, force=args.force)
+
+    write_database(database)
+
+    placeholder_bytes = sum(len(entry['placeholder']) for entry in others.values())
+    print(f"✅ Placeholders written to artwork_database.json and {PLACEHOLDERS_FILE} "
+          f"({len(others)} non-artwork images, {placeholder_bytes / 1e3:.1f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Header-only image probe for the Sensitive Beings build scripts.
+Detects the real format and pixel size of PNG, JPEG, GIF and WebP files by
+reading a few header bytes, without decoding (or even fully reading) the image.
+"""
+
+import struct
+from pathlib import Path
+
+# How much of the file is read up front; JPEG may seek further to find its frame header
+HEADER_SIZE = 64
+
+# Extensions web servers map to each format
+FORMAT_EXTENSIONS = {
+    'png': ['.png'],
+    'jpeg': ['.jpg', '.jpeg'],
+    'gif': ['.gif'],
+    'webp': ['.webp']
+}
+
+# JPEG start-of-frame markers that carry the image size (not DHT/JPG/DAC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# EXIF orientations that rotate the image by 90 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+def _probe_png(header):
+    if len(header) < 24 or header[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', header[16:24])
+    return {'format': 'png', 'width': width, 'height': height}
+
+def _probe_gif(header):
+    if len(header) < 10:
+        return None
+    width, height = struct.unpack('<HH', header[6:10])
+    return {'format': 'gif', 'width': width, 'height': height}
+
+def _probe_webp(header):
+    chunk = header[12:16]
+    if chunk == b'VP8 ' and len(header) >= 30:
+        width, height = struct.unpack('<HH', header[26:30])
+        return {'format': 'webp', 'width': width & 0x3FFF, 'height': height & 0x3FFF}
+    if chunk == b'VP8L' and len(header) >= 25:
+        bits = int.from_bytes(header[21:25], 'little')
+        return {'format': 'webp', 'width': (bits & 0x3FFF) + 1, 'height': ((bits >> 14) & 0x3FFF) + 1}
+    if chunk == b'VP8X' and len(header) >= 30:
+        width = int.from_bytes(header[24:27], 'little') + 1
+        height = int.from_bytes(header[27:30], 'little') + 1
+        return {'format': 'webp', 'width': width, 'height': height}
+    return None
+
+def exif_orientation(segment):
+    """Orientation tag from an APP1 Exif segment, or 1"""
+    if segment[:6] != b'Exif\x00\x00':
+        return 1
+    tiff = segment[6:]
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return 1
+
+    try:
+        ifd_offset = struct.unpack(endian + 'I', tiff[4:8])[0]
+        entries = struct.unpack(endian + 'H', tiff[ifd_offset:ifd_offset + 2])[0]
+        for i in range(entries):
+            entry = tiff[ifd_offset + 2 + i * 12:ifd_offset + 14 + i * 12]
+            tag, _, _, value = struct.unpack(endian + 'HHIH', entry[:10])
+            if tag == 0x0112:
+                return value
+    except struct.error:
+        pass
+    return 1
+
+def _probe_jpeg(f):
+    """Walk JPEG marker segments, seeking past their payloads, until a frame header"""
+    f.seek(2)
+    orientation = 1
+
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        # Fill bytes before a marker are allowed
+        while marker[1] == 0xFF:
+            fill = f.read(1)
+            if not fill:
+                return None
+            marker = marker[1:] + fill
+        code = marker[1]
+
+        # Standalone markers have no length field
+        if code == 0x01 or 0xD0 <= code <= 0xD8:
+            continue
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        # The length counts its own two bytes; anything less is corrupt
+        if length < 2:
+            return None
+
+        if code in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return {'format': 'jpeg', 'width': width, 'height': height, 'orientation': orientation}
+
+        if code == 0xE1:
+            orientation = exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, 1)
+
+def probe_image(path):
+    """
+    Detect an image's real format and size from its header.
+    Returns {'format', 'width', 'height'} or None for unknown or broken files.
+    Sizes are display sizes, so a JPEG with a 90 degree EXIF rotation has
+    its width and height swapped.
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+
+            if header.startswith(b'\x89PNG\r\n\x1a\n'):
+                return _probe_png(header)
+            if header[:6] in (b'GIF87a', b'GIF89a'):
+                return _probe_gif(header)
+            if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+                return _probe_webp(header)
+            if header[:2] == b'\xff\xd8':
+                info = _probe_jpeg(f)
+                if info is None:
+                    return None
+                if info.pop('orientation') in ROTATED_ORIENTATIONS:
+                    info['width'], info['height'] = info['height'], info['width']
+                return info
+    except OSError:
+        return None
+    return None
+
+def find_image(directory, stem):
+    """
+    The real image file for stem in directory, whatever case or extension it
+    ended up with. Returns (path, probe info) or (None, None).
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return None, None
+
+    for candidate in sorted(directory.iterdir()):
+        if candidate.stem != stem or not candidate.is_file():
+            continue
+        info = probe_image(candidate)
+        if info:
+            return candidate, info
+    return None, None
+
+def extension_matches(path, info):
+    """True if the file extension agrees with the format found in its header"""
+    return Path(path).suffix.lower() in FORMAT_EXTENSIONS.get(info['format'], [])
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Content-addressed media store for the Sensitive Beings exhibition website.
+Every distinct image is kept once as images/store/<ab>/<sha256><ext> and
+media_manifest.json maps each logical image path to its blob, so the same
+picture shipped in several decks, documents and folders is stored and
+hashed only once. Blobs are reflinked from their files where the
+filesystem can, so duplicates take their space only once, and copied
+otherwise. They are never hardlinked: editing a file in place must not
+change the blob filed under its old hash.
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from build_cache import BuildState, hash_file
+from file_placement import place_file
+from image_folders import IMAGES_DIR, GENERATED_IMAGE_DIRS
+
+MEDIA_STORE_DIR = "images/store"
+MEDIA_MANIFEST_FILE = "media_manifest.json"
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+
+# Placements that keep a blob's data its own (see file_placement.STRATEGIES)
+BLOB_STRATEGIES = ['clone', 'reflink', 'copy']
+
+# Image folders scanned by default when building the store from existing files
+DEFAULT_SOURCES = ["images", "artwork", "Exhibition Chapters/Image"]
+
+class BlobWriter:
+    """Streams bytes into a temporary file while hashing, then files it under its hash"""
+
+    def __init__(self, store, ext):
+        self.store = store
+        self.ext = ext.lower()
+        self.digest = hashlib.sha256()
+        self.size = 0
+        os.makedirs(store.root, exist_ok=True)
+        self.tmp_path = os.path.join(store.root, f".incoming.{os.getpid()}.{id(self)}")
+        self.file = open(self.tmp_path, 'wb')
+        self.blob = None
+
+    def write(self, chunk):
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        self.file.write(chunk)
+
+    def commit(self):
+        """Move the data into the store, dropping it if the blob already exists"""
+        self.file.close()
+        digest = self.digest.hexdigest()
+        self.blob = self.store.blob_path(digest, self.ext)
+
+        if os.path.exists(self.blob):
+            os.remove(self.tmp_path)
+        else:
+            os.makedirs(os.path.dirname(self.blob), exist_ok=True)
+            os.replace(self.tmp_path, self.blob)
+        return digest
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+class MediaStore:
+    """
+    A directory of blobs named by content hash plus a manifest of which
+    logical paths point at which blob. Blob writes are atomic, so worker
+    processes may add blobs concurrently; the manifest itself is only
+    updated by the process that calls record() and save().
+    """
+
+    def __init__(self, root=MEDIA_STORE_DIR, manifest_path=MEDIA_MANIFEST_FILE):
+        self.root = str(root)
+        self.manifest_path = str(manifest_path)
+        self.blobs = {}
+        self.files = {}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.blobs = manifest.get('blobs', {})
+            self.files = manifest.get('files', {})
+
+    def __getstate__(self):
+        # Workers only write blobs, they never need the manifest
+        return {'root': self.root, 'manifest_path': self.manifest_path, 'blobs': {}, 'files': {}}
+
+    def blob_path(self, digest, ext):
+        """Where the blob for a digest lives, fanned out by its first two hex digits"""
+        known = self.blobs.get(digest)
+        if known:
+            return known['blob']
+        return os.path.join(self.root, digest[:2], digest + ext.lower())
+
+    def writer(self, ext):
+        return BlobWriter(self, ext)
+
+    def add_file(self, path, digest=None, strategy='clone'):
+        """
+        Add a file to the store with one of BLOB_STRATEGIES: a new blob is
+        cloned from path, and a duplicate path is replaced by a reflink of
+        the existing blob where the filesystem has them.
+        Returns (digest, blob).
+        """
+        if strategy not in BLOB_STRATEGIES:
+            raise ValueError(f"blobs are placed by {', '.join(BLOB_STRATEGIES)}, not {strategy}")
+        path = str(path)
+        if digest is None:
+            digest = hash_file(path)
+
+        blob = self.blob_path(digest, os.path.splitext(path)[1])
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            place_file(path, blob, strategy)
+        elif os.path.samefile(path, blob):
+            # Hardlinked by an earlier run: give the blob data of its own
+            place_file(path, blob, strategy)
+        elif strategy != 'copy':
+            # Copying a duplicate over itself would save nothing, only a reflink shares the space
+            try:
+                place_file(blob, path, 'reflink')
+            except OSError:
+                if strategy == 'reflink':
+                    raise
+        return digest, blob
+
+    def place(self, blob, target, strategy='clone'):
+        """Make target show the blob's content, reflinking instead of copying where possible"""
+        if strategy not in BLOB_STRATEGIES:
+            raise ValueError(f"blobs are placed by {', '.join(BLOB_STRATEGIES)}, not {strategy}")
+        return place_file(blob, target, strategy)
+
+    def record(self, path, digest, blob, size):
+        """Point a logical path at a blob in the manifest"""
+        self.blobs[digest] = {'blob': str(blob), 'size': size}
+        self.files[str(path)] = digest
+
+    def prune(self):
+        """Forget logical paths that no longer exist, and delete the blobs nothing points at. Returns the blobs deleted."""
+        self.files = {path: digest for path, digest in self.files.items() if os.path.exists(path)}
+        referenced = set(self.files.values())
+        removed = 0
+        for digest, blob in list(self.blobs.items()):
+            if digest in referenced:
+                continue
+            if os.path.exists(blob['blob']):
+                os.remove(blob['blob'])
+                removed += 1
+            del self.blobs[digest]
+        return removed
+
+    def duplicates(self):
+        """Digests referenced by more than one logical path, with those paths"""
+        paths = {}
+        for path, digest in self.files.items():
+            paths.setdefault(digest, []).append(path)
+        return {digest: sorted(group) for digest, group in paths.items() if len(group) > 1}
+
+    def save(self):
+        manifest = {
+            'store': self.root,
+            'blobs': dict(sorted(self.blobs.items())),
+            'files': dict(sorted(self.files.items()))
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+def iter_images(sources, store_root):
+    """Image files under the source folders, skipping the store and the folders other stages generate"""
+    skipped = {Path(store_root).resolve()} | {(Path(IMAGES_DIR) / name).resolve() for name in GENERATED_IMAGE_DIRS}
+    for source in sources:
+        source = Path(source)
+        if not source.exists():
+            continue
+        for path in sorted(source.rglob("*")):
+            if not path.is_file() or path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            if skipped & set(path.resolve().parents):
+                continue
+            yield path
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the content-addressed media store")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES,
+                        help="image folders to add (default: images, artwork, Exhibition Chapters/Image)")
+    parser.add_argument("--store", default=MEDIA_STORE_DIR, help=f"store directory (default: {MEDIA_STORE_DIR})")
+    parser.add_argument("--manifest", default=MEDIA_MANIFEST_FILE, help=f"manifest file (default: {MEDIA_MANIFEST_FILE})")
+    parser.add_argument("--placement", choices=BLOB_STRATEGIES, default="clone",
+                        help="how blobs are made from source files (default: clone, a reflink where possible)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    store = MediaStore(args.store, args.manifest)
+    state = BuildState()
+
+    total_files = 0
+    total_bytes = 0
+    for path in iter_images(args.sources, args.store):
+        # Unchanged files reuse the hash recorded in the build state
+        digest, blob = store.add_file(path, state.fingerprint(path), args.placement)
+        size = path.stat().st_size
+        store.record(path, digest, blob, size)
+        total_files += 1
+        total_bytes += size
+
+    removed = store.prune()
+    store.save()
+    state.save()
+
+    stored_bytes = sum(blob['size'] for blob in store.blobs.values())
+    print(f"📦 {total_files} images -> {len(store.blobs)} unique blobs in {store.root} ({removed} unused removed)")
+    print(f"💾 {total_bytes / 1e6:.1f} MB of images stored as {stored_bytes / 1e6:.1f} MB")
+
+    duplicates = store.duplicates()
+    if duplicates:
+        print(f"🔁 {len(duplicates)} images appear more than once:")
+        for digest, paths in duplicates.items():
+            print(f"  {digest[:12]}: {', '.join(paths)}")
+
+if __name__ == "__main__":
+    main()
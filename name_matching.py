@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Name normalization and fuzzy matching for the Sensitive Beings build scripts.
+Artist and title names drift between sources ("Damade night" and "Damade
+Night", "Bei  Han", "Wu Jun" for Jun Wu, "Frank James Meuschke" for the
+key frank_meuschke). NameMatcher resolves such free-text names to their
+canonical keys with a confidence score, using a character trigram
+inverted index so a lookup only scores the few names that share its
+rarest trigrams, however large the catalog.
+"""
+
+import re
+import sys
+import math
+import json
+import time
+import argparse
+from collections import namedtuple
+
+# Trigram Dice similarity a fuzzy match needs by default
+MATCH_THRESHOLD = 0.6
+
+GRAM_SIZE = 3
+
+Match = namedtuple('Match', ['key', 'name', 'score'])
+
+def name_key(value):
+    """Lowercase alphanumeric words, so "Damade night " and "Damade Night" agree"""
+    return ' '.join(re.findall(r'[a-z0-9]+', value.lower().replace("'", '').replace('’', '')))
+
+def artist_key(value):
+    # Cards sometimes put the family name first ("Wu Jun" for Jun Wu)
+    return ' '.join(sorted(name_key(value).split()))
+
+def match_text(value):
+    """Text names are compared on; database keys like frank_meuschke read as words"""
+    return name_key(value.replace('_', ' '))
+
+def artist_text(value):
+    return artist_key(value.replace('_', ' '))
+
+def safe_title(title):
+    """File name stem for an artwork title: "Rain: The Apparent Threshold" -> rain_the_apparent_threshold"""
+    return title.lower().replace(' ', '_').translate({ord(c): None for c in '\'’",:'})
+
+def trigrams(text):
+    """Distinct character trigrams of text, padded so word starts and ends count"""
+    padded = f" {text} "
+    return frozenset(padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1))
+
+class NameMatcher:
+    """
+    Inverted index from character trigrams to names. Each canonical key can
+    have several names (aliases). match() returns the best key with its
+    trigram Dice score: 1.0 for an exact match after normalization, lower
+    for looser ones.
+
+    Postings are split by the trigram count of the name. For names of a
+    given length a score above the threshold needs a known minimum overlap
+    with the query, so only the postings of the query's rarest trigrams
+    can hold them (prefix filtering); the rest are never visited.
+    """
+
+    def __init__(self, names=(), normalize=match_text):
+        self.normalize = normalize
+        self.exact = {}
+        self.entries = []
+        self.postings = {}
+        self.frequency = {}
+        for key, name in names:
+            self.add(key, name)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, name):
+        """Index name as a way of writing key"""
+        text = self.normalize(name)
+        if not text:
+            return
+        self.exact.setdefault(text, (key, name))
+        grams = trigrams(text)
+        entry_id = len(self.entries)
+        self.entries.append((key, name, grams))
+        for gram in grams:
+            self.postings.setdefault(gram, {}).setdefault(len(grams), []).append(entry_id)
+            self.frequency[gram] = self.frequency.get(gram, 0) + 1
+
+    def candidates(self, query, threshold=MATCH_THRESHOLD, limit=5):
+        """Up to limit Matches scoring at least threshold, best first, one per key"""
+        text = self.normalize(query)
+        if not text:
+            return []
+        if text in self.exact:
+            key, name = self.exact[text]
+            return [Match(key, name, 1.0)]
+
+        grams = trigrams(text)
+        size = len(grams)
+        rarest = sorted((gram for gram in grams if gram in self.postings), key=self.frequency.get)
+
+        # Dice = 2 * overlap / (size + n) >= threshold bounds both n and the overlap
+        shortest = math.ceil(threshold * size / (2 - threshold))
+        longest = math.floor((2 - threshold) * size / threshold)
+
+        best = {}
+        for length in range(shortest, longest + 1):
+            min_overlap = math.ceil(threshold * (size + length) / 2)
+            seen = set()
+            for gram in rarest[:size - min_overlap + 1]:
+                for entry_id in self.postings[gram].get(length, ()):
+                    if entry_id in seen:
+                        continue
+                    seen.add(entry_id)
+                    key, name, entry_grams = self.entries[entry_id]
+                    score = 2 * len(grams & entry_grams) / (size + length)
+                    if score >= threshold and score > best.get(key, (0,))[0]:
+                        best[key] = (score, name)
+
+        ranked = sorted(best.items(), key=lambda item: -item[1][0])[:limit]
+        return [Match(key, name, round(score, 3)) for key, (score, name) in ranked]
+
+    def match(self, query, threshold=MATCH_THRESHOLD):
+        """Best Match for query, or None if nothing scores at least threshold"""
+        found = self.candidates(query, threshold, limit=1)
+        return found[0] if found else None
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resolve artist or title names against artwork_database.json")
+    parser.add_argument("names", nargs="+", help="free-text names to look up")
+    parser.add_argument("--artists", action="store_true", help="look up artists instead of titles")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD,
+                        help=f"minimum trigram similarity (default: {MATCH_THRESHOLD})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    with open('artwork_database.json', 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    matcher = NameMatcher(normalize=artist_text if args.artists else match_text)
+    for chapter in database.values():
+        for artist in chapter.get('artists', []):
+            if args.artists:
+                matcher.add(artist['key'], artist['key'])
+                matcher.add(artist['key'], artist['name'])
+            else:
+                for artwork in artist.get('artworks', []):
+                    matcher.add((artist['key'], artwork['title']), artwork['title'])
+
+    found_all = True
+    for name in args.names:
+        start = time.perf_counter()
+        found = matcher.candidates(name, args.threshold)
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(f"🔎 {name} ({elapsed:.3f} ms)")
+        for match in found:
+            key = ' / '.join(match.key) if isinstance(match.key, tuple) else match.key
+            print(f"  {match.score:.3f}  {key}")
+        if not found:
+            print("  no match")
+            found_all = False
+
+    if not found_all:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
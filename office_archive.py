@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Single-pass reader for docx and pptx archives.
+Opens each archive once and indexes its parts by type so text and image
+extraction can share the same open zip file and central directory scan.
+"""
+
+import re
+import zipfile
+import posixpath
+from contextlib import contextmanager
+import xml.etree.ElementTree as ET
+
+# Part types found in the office archives we process
+SLIDE = 'slide'
+SLIDE_RELS = 'slide_rels'
+MEDIA = 'media'
+DOCUMENT = 'document'
+OTHER = 'other'
+
+RELATIONSHIPS_NAMESPACE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+SLIDE_PATTERN = re.compile(r'^ppt/slides/slide(\d+)\.xml$')
+SLIDE_RELS_PATTERN = re.compile(r'^ppt/slides/_rels/slide(\d+)\.xml\.rels$')
+
+def part_type(name):
+    """Classify an archive member name by the part it holds"""
+    if SLIDE_PATTERN.match(name):
+        return SLIDE
+    if SLIDE_RELS_PATTERN.match(name):
+        return SLIDE_RELS
+    if name.startswith('word/media/') or name.startswith('ppt/media/'):
+        return MEDIA
+    if name == 'word/document.xml':
+        return DOCUMENT
+    return OTHER
+
+def slide_id(name):
+    """'ppt/slides/slide12.xml' -> 'slide12'"""
+    return posixpath.splitext(posixpath.basename(name))[0]
+
+class OfficeArchive:
+    """An open docx/pptx file with its members indexed by part type"""
+
+    def __init__(self, path):
+        self.path = path
+        self.zip_file = zipfile.ZipFile(path, 'r')
+        self.parts = {SLIDE: [], SLIDE_RELS: [], MEDIA: [], DOCUMENT: [], OTHER: []}
+        self.members = {}
+        self._media_index = None
+
+        # One scan of the central directory for every consumer
+        for info in self.zip_file.infolist():
+            self.members[info.filename] = info
+            self.parts[part_type(info.filename)].append(info)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip_file.close()
+
+    @property
+    def kind(self):
+        """'docx', 'pptx' or None for anything else"""
+        suffix = posixpath.splitext(str(self.path))[1].lower()
+        if suffix in ('.docx', '.pptx'):
+            return suffix[1:]
+        if self.parts[DOCUMENT]:
+            return 'docx'
+        if self.parts[SLIDE]:
+            return 'pptx'
+        return None
+
+    def slides(self):
+        """Slide members sorted the way extract_content has always listed them"""
+        return sorted(self.parts[SLIDE], key=lambda info: info.filename)
+
+    def media(self):
+        """Media members in archive order"""
+        return list(self.parts[MEDIA])
+
+    def media_index(self):
+        """
+        Slide/media relationships parsed once from ppt/slides/_rels/*.rels.
+        Returns (slide_media, media_slides): slide_media maps 'slide9' to the
+        media file names it uses in relationship order, media_slides maps
+        'image1.jpg' to the slides that show it in slide number order.
+        """
+        if self._media_index is not None:
+            return self._media_index
+
+        media_names = {info.filename for info in self.parts[MEDIA]}
+        slide_media = {}
+        media_slides = {}
+
+        rels_parts = sorted(self.parts[SLIDE_RELS], key=lambda info: int(SLIDE_RELS_PATTERN.match(info.filename).group(1)))
+        for rels in rels_parts:
+            slide = 'slide' + SLIDE_RELS_PATTERN.match(rels.filename).group(1)
+            used = []
+
+            for rel in self.read_xml(rels.filename).iter(RELATIONSHIPS_NAMESPACE + 'Relationship'):
+                if rel.get('TargetMode') == 'External':
+                    continue
+                # Targets are relative to ppt/slides/
+                target = posixpath.normpath(posixpath.join('ppt/slides', rel.get('Target', '')))
+                if target in media_names:
+                    filename = posixpath.basename(target)
+                    if filename not in used:
+                        used.append(filename)
+
+            if used:
+                slide_media[slide] = used
+                for filename in used:
+                    media_slides.setdefault(filename, []).append(slide)
+
+        self._media_index = (slide_media, media_slides)
+        return self._media_index
+
+    def read(self, name):
+        return self.zip_file.read(name)
+
+    def read_xml(self, name):
+        """Parse one XML member into an ElementTree root"""
+        return ET.fromstring(self.zip_file.read(name))
+
+    def open(self, member):
+        """Open a member for streaming reads"""
+        return self.zip_file.open(member)
+
+@contextmanager
+def open_archive(source):
+    """Yield an OfficeArchive for a path, or reuse one that is already open"""
+    if isinstance(source, OfficeArchive):
+        yield source
+        return
+
+    with OfficeArchive(source) as archive:
+        yield archive
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Lossless recompression of the Sensitive Beings image originals.
+PNGs are re-encoded with the strongest zlib settings, reduced to RGB or a
+palette when that loses nothing, and stripped of text/EXIF chunks. JPEGs are
+losslessly re-coded with jpegtran when it is installed, and always have
+EXIF, XMP and comment segments removed. EXIF orientation is applied before
+it is stripped, so images still display the right way up.
+
+Only files whose content changed since the last run are touched, and a
+file is only replaced when the result is smaller and decodes to the same
+pixels. Hard links to one file (such as artist-folder images placed from
+images/presentations/) are optimized once and all relinked to the
+result, and media_manifest.json is pointed at the new content of every
+file it records.
+Writes a before/after byte report to optimize_report.json.
+"""
+
+import os
+import sys
+import json
+import shutil
+import struct
+import argparse
+import subprocess
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageChops, ImageOps, PngImagePlugin
+except ImportError:
+    Image = None
+
+from build_cache import BuildState
+from image_folders import GENERATED_IMAGE_DIRS
+from image_probe import probe_image, exif_orientation
+from media_store import MediaStore, MEDIA_MANIFEST_FILE
+from parallel_jobs import run_tasks, report_errors
+
+OPTIMIZE_REPORT = "optimize_report.json"
+DEFAULT_SOURCES = ["images", "artwork", "Exhibition Chapters/Image"]
+
+# Bump when the optimizer changes so every file gets another pass
+OPTIMIZER_VERSION = 1
+
+# PNG modes Pillow can round-trip exactly
+PNG_MODES = {'1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'I;16'}
+
+# PNG chunks that change how the pixels are displayed, copied over as they are
+PNG_COLOUR_CHUNKS = {b'cHRM', b'gAMA', b'sRGB', b'cICP'}
+
+# JPEG segments needed to decode the image correctly: JFIF (APP0),
+# ICC profile (APP2) and the Adobe colour transform flag (APP14)
+JPEG_KEEP_APP = {0xE0, 0xE2, 0xEE}
+
+# jpegtran -rotate/-flip arguments for each EXIF orientation
+JPEGTRAN_ORIENTATION = {
+    2: ['-flip', 'horizontal'],
+    3: ['-rotate', '180'],
+    4: ['-flip', 'vertical'],
+    5: ['-transpose'],
+    6: ['-rotate', '90'],
+    7: ['-transverse'],
+    8: ['-rotate', '270']
+}
+
+def iter_originals(sources):
+    """Image files under the source folders, skipping folders the build scripts generate"""
+    for source in sources:
+        source = Path(source)
+        if not source.exists():
+            continue
+        for path in sorted(source.rglob("*")):
+            if not path.is_file() or path.suffix.lower() not in ['.png', '.jpg', '.jpeg']:
+                continue
+            if source.name == 'images' and path.relative_to(source).parts[0] in GENERATED_IMAGE_DIRS:
+                continue
+            yield path.as_posix()
+
+def same_pixels(a, b):
+    if a.size != b.size:
+        return False
+    if a.mode == b.mode and a.mode != 'P':
+        return a.tobytes() == b.tobytes()
+    mode = 'RGBA' if 'A' in a.mode or 'A' in b.mode or 'transparency' in a.info or 'transparency' in b.info else 'RGB'
+    return ImageChops.difference(a.convert(mode), b.convert(mode)).getbbox() is None
+
+def png_chunks(path):
+    """(type, data) of the chunks of a PNG before its image data"""
+    chunks = []
+    with open(path, 'rb') as f:
+        f.read(8)
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                break
+            length, chunk_type = struct.unpack('>I4s', header)
+            if chunk_type == b'IDAT':
+                break
+            chunks.append((chunk_type, f.read(length)))
+            f.read(4)
+    return chunks
+
+def reduce_png_mode(img):
+    """Drop an all-opaque alpha channel and palettize images with 256 colours or fewer, when exact"""
+    if img.mode == 'RGBA' and img.getchannel('A').getextrema() == (255, 255):
+        img = img.convert('RGB')
+
+    # A colour-key transparency would not survive the palette conversion
+    if img.mode == 'RGB' and 'transparency' not in img.info and img.getcolors(256):
+        palettized = img.convert('P', palette=Image.ADAPTIVE, colors=256)
+        if same_pixels(img, palettized):
+            img = palettized
+    return img
+
+def optimize_png(path, tmp_path):
+    """Write an optimized copy of a PNG to tmp_path; returns False if it cannot be done losslessly"""
+    if Image is None:
+        return False
+
+    with Image.open(path) as original:
+        original.load()
+        if original.mode not in PNG_MODES or getattr(original, 'is_animated', False):
+            return False
+
+        # eXIf orientation is rare in PNGs, but honour it before the chunk goes;
+        # text and EXIF chunks are only written when asked for, so they are dropped
+        upright = ImageOps.exif_transpose(original)
+        img = reduce_png_mode(upright)
+
+        options = {'optimize': True}
+        for key in ('icc_profile', 'transparency', 'dpi'):
+            if key in img.info:
+                options[key] = img.info[key]
+        # Pillow only writes gamma and chromaticity chunks it is handed
+        colour = [(chunk_type, data) for chunk_type, data in png_chunks(path) if chunk_type in PNG_COLOUR_CHUNKS]
+        if colour:
+            options['pnginfo'] = PngImagePlugin.PngInfo()
+            for chunk_type, data in colour:
+                options['pnginfo'].add(chunk_type, data)
+        img.save(tmp_path, 'PNG', **options)
+
+        with Image.open(tmp_path) as result:
+            return same_pixels(upright, result)
+
+def jpeg_segments(data):
+    """(marker, segment bytes) for every segment before the scan data, then (None, rest)"""
+    pos = 2
+    while pos < len(data):
+        if data[pos] != 0xFF:
+            raise ValueError(f"bad JPEG marker at byte {pos}")
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0xDA:
+            yield None, data[pos:]
+            return
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            yield marker, data[pos:pos + 2]
+            pos += 2
+            continue
+        length = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        yield marker, data[pos:pos + 2 + length]
+        pos += 2 + length
+
+def strip_jpeg(data, keep_exif=False):
+    """JPEG bytes without metadata segments; the image data itself is copied untouched"""
+    kept = [data[:2]]
+    for marker, segment in jpeg_segments(data):
+        if marker is None:
+            kept.append(segment)
+        elif marker == 0xFE:
+            continue
+        elif 0xE0 <= marker <= 0xEF:
+            if marker in JPEG_KEEP_APP or (keep_exif and marker == 0xE1 and segment[4:10] == b'Exif\x00\x00'):
+                kept.append(segment)
+        else:
+            kept.append(segment)
+    return b''.join(kept)
+
+def jpeg_orientation(data):
+    for marker, segment in jpeg_segments(data):
+        if marker is None:
+            break
+        if marker == 0xE1 and segment[4:10] == b'Exif\x00\x00':
+            return exif_orientation(segment[4:])
+    return 1
+
+def optimize_jpeg(path, tmp_path):
+    """Write an optimized copy of a JPEG to tmp_path; returns False if it cannot be done losslessly"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    orientation = jpeg_orientation(data)
+    jpegtran = shutil.which('jpegtran')
+
+    if jpegtran:
+        # -perfect refuses rotations that would drop partial edge blocks
+        args = [jpegtran, '-copy', 'all', '-optimize', '-progressive']
+        if orientation in JPEGTRAN_ORIENTATION:
+            args += JPEGTRAN_ORIENTATION[orientation] + ['-perfect']
+        result = subprocess.run(args + [path], capture_output=True)
+        if result.returncode == 0:
+            rotated = orientation in JPEGTRAN_ORIENTATION
+            data = result.stdout
+        else:
+            # Keep the original scan, and the orientation with it
+            rotated = False
+    else:
+        rotated = False
+
+    # Without a lossless rotation the EXIF block has to stay for its orientation tag
+    data = strip_jpeg(data, keep_exif=orientation != 1 and not rotated)
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    return True
+
+def relink(path, link):
+    """Replace link with a hard link to path"""
+    tmp_path = os.path.join(os.path.dirname(link), f".{os.path.basename(link)}.{os.getpid()}.link")
+    os.link(path, tmp_path)
+    os.replace(tmp_path, link)
+
+def optimize_file(path, links=()):
+    """
+    Optimize one image in place if that makes it smaller, then point links
+    (other hard links to the same file) at the result. The old data is
+    replaced, never written over, so links outside the sources keep it.
+    Returns (bytes before, bytes after, method); method is None when the
+    file was left alone.
+    """
+    info = probe_image(path)
+    before = os.path.getsize(path)
+    if not info or info['format'] not in ('png', 'jpeg'):
+        return before, before, None
+
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.opt")
+    try:
+        if info['format'] == 'png':
+            ok = optimize_png(path, tmp_path)
+        else:
+            ok = optimize_jpeg(path, tmp_path)
+
+        if not ok or os.path.getsize(tmp_path) >= before:
+            return before, before, None
+
+        shutil.copystat(path, tmp_path)
+        os.replace(tmp_path, path)
+        for link in links:
+            relink(path, link)
+        return before, os.path.getsize(path), info['format']
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def link_groups(paths):
+    """
+    {path: [other paths]} with one entry per file on disk: hard links to
+    the same file are listed under the first of them. Symbolic links are
+    left out, they show whatever their target becomes.
+    """
+    groups = {}
+    first = {}
+    for path in paths:
+        if os.path.islink(path):
+            continue
+        stat = os.stat(path)
+        key = (stat.st_dev, stat.st_ino)
+        if key in first:
+            groups[first[key]].append(path)
+        else:
+            first[key] = path
+            groups[path] = []
+    return groups
+
+def update_store(paths):
+    """Point the media store manifest's records of paths at their new content; returns how many changed"""
+    if not os.path.exists(MEDIA_MANIFEST_FILE):
+        return 0
+    store = MediaStore()
+    stored = {Path(path).as_posix(): path for path in store.files}
+    updated = 0
+    for path in paths:
+        if path in stored:
+            digest, blob = store.add_file(path)
+            store.record(stored[path], digest, blob, os.path.getsize(path))
+            updated += 1
+    if updated:
+        store.save()
+    return updated
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Losslessly recompress PNG and JPEG originals")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES,
+                        help="image folders to optimize (default: images, artwork, Exhibition Chapters/Image)")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="worker processes (0 = one per CPU, default: 0)")
+    parser.add_argument("--force", action="store_true", help="re-optimize every file")
+    parser.add_argument("--dry-run", action="store_true", help="only list the files that would be optimized")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if Image is None:
+        print("⚠️  Pillow not found, PNGs will be skipped (pip install Pillow)")
+    if not shutil.which('jpegtran'):
+        print("⚠️  jpegtran not found, JPEGs only get their metadata stripped")
+
+    state = BuildState(force=args.force)
+    params = {'version': OPTIMIZER_VERSION, 'jpegtran': bool(shutil.which('jpegtran')), 'pillow': Image is not None}
+    paths = list(iter_originals(args.sources))
+    groups = link_groups(paths)
+    linked = sum(len(links) for links in groups.values())
+    if linked:
+        print(f"🔗 {linked} images are hard links to another one, each file is optimized once")
+
+    # A file is fresh if it still has the content the last pass left behind
+    stale = [path for path in groups if not state.is_fresh(f"optimize:{path}", [path], params)]
+    print(f"🗜️  {len(groups)} images, {len(stale)} new or changed since the last pass")
+    if args.dry_run:
+        for path in stale:
+            print(f"  {path}" + (f" (also {', '.join(groups[path])})" if groups[path] else ""))
+        return
+
+    results = run_tasks(optimize_file, [(path, groups[path]) for path in stale], args.jobs)
+
+    report = {}
+    if os.path.exists(OPTIMIZE_REPORT):
+        with open(OPTIMIZE_REPORT, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+
+    errors = []
+    changed = []
+    for path, (result, error) in zip(stale, results):
+        if error:
+            errors.append((path, error))
+            continue
+        before, after, method = result
+        if method:
+            print(f"  {path}: {before / 1e3:.0f} KB -> {after / 1e3:.0f} KB")
+            changed += [path] + groups[path]
+        for link in [path] + groups[path]:
+            if method:
+                # Steps that produced this file should treat the smaller version as theirs
+                state.adopt_output(link)
+            state.record(f"optimize:{link}", [link], [], params)
+        report[path] = {'before': before, 'after': after}
+
+    updated = update_store(changed)
+    if updated:
+        print(f"📦 {updated} media store records moved to the optimized files")
+
+    report = {path: report[path] for path in groups if path in report}
+    with open(OPTIMIZE_REPORT, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    state.save()
+
+    total_before = sum(entry['before'] for entry in report.values())
+    total_after = sum(entry['after'] for entry in report.values())
+    saved = total_before - total_after
+    print(f"📉 {total_before / 1e6:.1f} MB -> {total_after / 1e6:.1f} MB "
+          f"({saved / 1e6:.1f} MB, {100 * saved / max(total_before, 1):.1f}% saved)")
+
+    if report_errors(errors):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,21 @@ Based on the extracted content and known artwork titles.
 """
 
 import os
-import shutil
 import json
+import argparse
 from pathlib import Path
 
-# Artwork mapping based on our extracted content
+from build_cache import BuildState, place_if_changed
+from file_placement import STRATEGIES
+from name_matching import NameMatcher, safe_title, name_key, artist_text
+from catalog_join import build_catalog, catalog_index, find_artwork, card_image, print_conflicts, FACT_FIELDS
+from catalog_model import CHAPTERS, Catalog, Artist, Artwork, MediaAsset
+from image_probe import find_image, extension_matches
+from database_shards import write_database
+from image_hash_index import load_assignments, MATCHES_FILE
+
+# Curated image mapping, only used until image_hash_index.py has matched
+# the presentation images to the catalog
 ARTWORK_MAPPING = {
     # Chapter 1 - The Replicated Self
     "chris_bowes": {
@@ -68,182 +78,183 @@ ARTWORK_MAPPING = {
     }
 }
 
-def organize_images():
-    """Organize images into artist directories"""
+# Curated roster: the database key of each artist, and the chapter of
+# artists the catalog join found no catalog number for
+ARTIST_CHAPTERS = {
+    "chapter1": ["chris_bowes", "jun_wu", "haojun_yang", "sharleen_cu"],
+    "chapter2": ["jiahong_lang", "heng_wang", "frank_meuschke", "vivian_qiu", "qianxun_li", "yilin_zhang", "bei_han", "shiyin_li", "marina_rodriguez"]
+}
+
+def curated_assignments():
+    """Image assignments in the load_assignments() shape from ARTWORK_MAPPING"""
+    return [{"artist": artist, "title": data["artworks"][min(i, len(data["artworks"]) - 1)], "image": f"images/{image}"}
+            for artist, data in ARTWORK_MAPPING.items() for i, image in enumerate(data["images"])]
+
+def organize_images(state=None, placement='auto', joined=None):
+    """
+    Organize images into artist directories, skipping images already in place.
+    Which image shows which artwork comes from the perceptual-hash matches
+    of image_hash_index.py, or ARTWORK_MAPPING until those exist; files are
+    named after the artwork as the catalog join titles it.
+    placement picks how each image lands in its artist folder (see
+    file_placement.STRATEGIES); 'auto' links instead of copying when it can.
+    """
     images_dir = Path("images")
+    state = state or BuildState()
+    joined = joined or build_catalog()
+    keys = artist_keys(artist["artist"] for artist in joined["artists"])
+    index = catalog_index(joined)
+    
+    assignments = load_assignments()
+    if assignments:
+        print(f"🎯 {len(assignments)} images assigned by {MATCHES_FILE}")
+    else:
+        print(f"⚠️  No {MATCHES_FILE} (run image_hash_index.py), using the curated ARTWORK_MAPPING")
+        assignments = curated_assignments()
     
-    for artist, data in ARTWORK_MAPPING.items():
+    by_artist = {}
+    for assignment in assignments:
+        record, score = find_artwork(index, assignment["artist"], assignment["title"])
+        if record is None:
+            print(f"Warning: no catalog artwork for {assignment['artist']} - {assignment['title']}")
+            continue
+        by_artist.setdefault(keys[record["artist"]], []).append((record["title"], Path(assignment["image"])))
+    
+    for artist, images in by_artist.items():
         artist_dir = images_dir / artist
-        artist_dir.mkdir(exist_ok=True)
+        artist_dir.mkdir(parents=True, exist_ok=True)
         
         print(f"Processing {artist}...")
         
-        for i, image_path in enumerate(data["images"]):
-            source_path = images_dir / image_path
-            
+        for artwork_name, source_path in images:
             if source_path.exists():
                 # Create meaningful filename
-                artwork_name = data["artworks"][min(i, len(data["artworks"]) - 1)]
                 file_extension = source_path.suffix
-                new_filename = f"{artwork_name.lower().replace(' ', '_').replace(':', '')}{file_extension}"
+                new_filename = f"{safe_title(artwork_name)}{file_extension}"
                 
                 destination_path = artist_dir / new_filename
                 
-                # Copy (don't move) the image
-                shutil.copy2(source_path, destination_path)
-                print(f"  Copied {source_path.name} -> {new_filename}")
+                # Place (don't move) the image
+                method = place_if_changed(state, source_path, destination_path, placement)
+                if method:
+                    print(f"  Placed {source_path.name} -> {new_filename} ({method})")
+                else:
+                    print(f"  Up to date: {new_filename}")
             else:
                 print(f"  Warning: {source_path} not found")
 
-def create_artwork_database():
+def artist_keys(names):
+    """
+    {joined artist name: database key}. Artists of the curated roster keep
+    their key ("Wu Jun" is jun_wu, "Frank James Meuschke" frank_meuschke);
+    anyone new gets one made from their name.
+    """
+    roster = NameMatcher(((key, key) for keys in ARTIST_CHAPTERS.values() for key in keys), normalize=artist_text)
+    keys = {}
+    for name in names:
+        match = roster.match(name)
+        keys[name] = match.key if match else '_'.join(name_key(name).split())
+    return keys
+
+def create_artwork_database(joined=None):
     """Create a comprehensive artwork database with image paths"""
     
-    artwork_db = {
-        "chapter1": {
-            "title": "The Replicated Self",
-            "description": "Selfhood is not self-made, but shaped in subtle repetitions, negotiated glances, and quiet adjustments to what is expected.",
-            "artists": []
-        },
-        "chapter2": {
-            "title": "The Rewilded Senses", 
-            "description": "Even in the default disciplinary reality, feelings still find their way to nurturing the part of us that continues to listen beneath it all.",
-            "artists": []
-        }
-    }
+    # Artists, chapters and artwork facts come from the cards, price list and slides
+    joined = joined or build_catalog()
+    keys = artist_keys(artist["artist"] for artist in joined["artists"])
+    catalog = Catalog(CHAPTERS)
     
-    # Chapter 1 artists
-    chapter1_artists = ["chris_bowes", "jun_wu", "haojun_yang", "sharleen_cu"]
-    # Chapter 2 artists
-    chapter2_artists = ["jiahong_lang", "heng_wang", "frank_meuschke", "vivian_qiu", "qianxun_li", "yilin_zhang", "bei_han", "shiyin_li", "marina_rodriguez"]
-    
-    # Artist information from our extracted content
-    artist_info = {
-        "chris_bowes": {
-            "name": "Chris Bowes",
-            "bio": "Multidisciplinary artist based in Melbourne whose practice incorporates photography, video and installation.",
-            "specialty": "Digital Interactive Art"
-        },
-        "jun_wu": {
-            "name": "Jun Wu", 
-            "bio": "Chinese artist whose upbringing and education have shaped a sensitive and reflective approach to art-making.",
-            "specialty": "Screen Printing"
-        },
-        "haojun_yang": {
-            "name": "Haojun Yang",
-            "bio": "Enjoys wandering alone through the wilderness; the quietude of nature serves as the wellspring of his creativity.",
-            "specialty": "Oil Painting"
-        },
-        "sharleen_cu": {
-            "name": "Sharleen Cu",
-            "bio": "Multidisciplinary artist exploring identity as a Chinese-Filipino living in Australia through mixed media.",
-            "specialty": "Mixed Media"
-        },
-        "jiahong_lang": {
-            "name": "Jiahong Lang",
-            "bio": "Hangzhou-based artist and designer focused on installation art and digital interactive media.",
-            "specialty": "Digital Interactive Media"
-        },
-        "heng_wang": {
-            "name": "Heng Wang",
-            "bio": "Untamable and wild-spirited extreme photographer specializing in nature and macro photography.",
-            "specialty": "Photography"
-        },
-        "frank_meuschke": {
-            "name": "Frank James Meuschke",
-            "bio": "Photographer exploring melancholy, memory, nature, and place through experimental techniques.",
-            "specialty": "Photography"
-        },
-        "vivian_qiu": {
-            "name": "Vivian Qiu",
-            "bio": "Emerging artist combining wearable art and sculpture, exploring cultural identity and healing.",
-            "specialty": "Mixed Media Sculpture"
-        },
-        "qianxun_li": {
-            "name": "Qianxun Li",
-            "bio": "Chinese artist focusing on capturing sensory details of daily life and microscopic beauty in nature.",
-            "specialty": "Fine Crafts"
-        },
-        "yilin_zhang": {
-            "name": "Yilin Zhang",
-            "bio": "Mystic and astrologer exploring trauma, mythology, and healing through cross-cultural experiences.",
-            "specialty": "Painting & Mixed Media"
-        },
-        "bei_han": {
-            "name": "Bei Han",
-            "bio": "Contemporary gansai artist merging ancient Eastern mineral pigments with personal emotional experiences.",
-            "specialty": "Mineral Pigment Painting"
-        },
-        "shiyin_li": {
-            "name": "Shiyin Li",
-            "bio": "Artist with 16 years of practice, creating through intuitive and spontaneous strokes.",
-            "specialty": "Digital & Traditional Painting"
-        },
-        "marina_rodriguez": {
-            "name": "Marina Rodriguez",
-            "bio": "Visual artist, ceramist, and architect from Argentina exploring fusion of cultural identities.",
-            "specialty": "Ceramics"
-        }
-    }
+    by_artist = {}
+    for record in joined["artworks"]:
+        by_artist.setdefault(record["artist"], []).append(record)
     
     # Build database
-    for artist_key in chapter1_artists:
-        if artist_key in ARTWORK_MAPPING and artist_key in artist_info:
-            artist_data = {
-                "key": artist_key,
-                "name": artist_info[artist_key]["name"],
-                "bio": artist_info[artist_key]["bio"],
-                "specialty": artist_info[artist_key]["specialty"],
-                "artworks": []
-            }
-            
-            # Add artworks
-            for i, artwork_title in enumerate(ARTWORK_MAPPING[artist_key]["artworks"]):
-                artwork_data = {
-                    "title": artwork_title,
-                    "image": f"images/{artist_key}/{artwork_title.lower().replace(' ', '_').replace(':', '')}.jpg"
-                }
-                # Add specific artwork details here if available
-                artist_data["artworks"].append(artwork_data)
-            
-            artwork_db["chapter1"]["artists"].append(artist_data)
-    
-    # Same for chapter 2
-    for artist_key in chapter2_artists:
-        if artist_key in ARTWORK_MAPPING and artist_key in artist_info:
-            artist_data = {
-                "key": artist_key,
-                "name": artist_info[artist_key]["name"],
-                "bio": artist_info[artist_key]["bio"],
-                "specialty": artist_info[artist_key]["specialty"],
-                "artworks": []
-            }
-            
-            for i, artwork_title in enumerate(ARTWORK_MAPPING[artist_key]["artworks"]):
-                artwork_data = {
-                    "title": artwork_title,
-                    "image": f"images/{artist_key}/{artwork_title.lower().replace(' ', '_').replace(':', '')}.jpg"
-                }
-                artist_data["artworks"].append(artwork_data)
-            
-            artwork_db["chapter2"]["artists"].append(artist_data)
-    
-    # Save database
-    with open("artwork_database.json", 'w') as f:
-        json.dump(artwork_db, f, indent=2)
+    for info in joined["artists"]:
+        key = keys[info["artist"]]
+        
+        # The catalog numbers on the slides say which chapter an artist hangs in
+        chapter = next((chapter for chapter in info["chapters"] if chapter in CHAPTERS), None)
+        if chapter is None:
+            chapter = next((chapter for chapter, artists in ARTIST_CHAPTERS.items() if key in artists), next(iter(CHAPTERS)))
+            if info["chapters"]:
+                print(f"⚠️  {info['name']} is catalogued in unknown {', '.join(info['chapters'])}, keeping them in {chapter}")
+            else:
+                print(f"⚠️  No catalog number for any artwork by {info['name']}, keeping them in {chapter}")
+        
+        artworks = []
+        for record in by_artist[info["artist"]]:
+            artwork = Artwork(record["title"], **{field: record[field] for field in FACT_FIELDS if record.get(field)},
+                              slides=[source for source in record["sources"] if source.startswith("slide")])
+            # The picture beside the artwork's card stands in until a placed image is found
+            image_path, image_info = card_image(record)
+            if image_path:
+                artwork.image = MediaAsset.from_probe(image_path.as_posix(), image_info)
+            artworks.append(artwork)
+        catalog.add(Artist(key, info["name"], chapter, info["slides"], bio=info["bio"], specialty=info["specialty"],
+                           artworks=artworks))
+    
+    if joined["conflicts"]:
+        print(f"{len(joined['conflicts'])} conflicts between catalog sources:")
+        print_conflicts(joined["conflicts"])
+    
+    # Use the file that is really there, with its real extension and size;
+    # works without one keep their card's picture, or an empty image rather
+    # than a guessed path
+    for artist, artwork in catalog.artworks():
+        image_path, image_info = find_image(Path("images") / artist.key, safe_title(artwork.title))
+        if image_path is None:
+            if not artwork.image:
+                print(f"  ⚠️  No image found for {artist.key}/{safe_title(artwork.title)}")
+            continue
+        if not extension_matches(image_path, image_info):
+            print(f"  ⚠️  {image_path} is really {image_info['format']}")
+        artwork.image = MediaAsset.from_probe(image_path.as_posix(), image_info)
+    
+    # Descriptions are not in any catalog source; keep those written before
+    if os.path.exists("artwork_database.json"):
+        with open("artwork_database.json", "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        index = catalog_index({"artworks": [{"artist": artist.key, "title": artwork.title, "artwork": artwork}
+                                            for artist, artwork in catalog.artworks()]})
+        for chapter in previous.values():
+            for artist in chapter.get("artists", []):
+                for old in artist.get("artworks", []):
+                    record, score = find_artwork(index, artist["key"], old["title"])
+                    if record and old.get("description") and not record["artwork"].description:
+                        record["artwork"].description = old["description"]
+    
+    artwork_db = catalog.to_database()
+    
+    # Save database with its shards, NDJSON stream and search index
+    write_database(artwork_db)
     
     print("Created artwork database with image mappings")
     return artwork_db
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Organize artwork images by artist")
+    parser.add_argument("--force", action="store_true",
+                        help="place every image even if it is already current")
+    parser.add_argument("--placement", choices=STRATEGIES, default="auto",
+                        help="how images land in artist folders (default: auto = reflink, else hardlink, else copy)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    state = BuildState(force=args.force)
+    
+    joined = build_catalog()
+    
     print("Organizing artwork images...")
-    organize_images()
+    organize_images(state, args.placement, joined)
+    state.save()
     
     print("\nCreating artwork database...")
-    db = create_artwork_database()
+    db = create_artwork_database(joined)
     
     print(f"\nOrganization completed!")
-    print(f"Chapter 1: {len(db['chapter1']['artists'])} artists")
-    print(f"Chapter 2: {len(db['chapter2']['artists'])} artists")
+    for chapter in CHAPTERS:
+        print(f"{db[chapter]['title']}: {len(db[chapter]['artists'])} artists")
     print("Check 'artwork_database.json' for the complete mapping")
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Shared process-pool helpers for the Sensitive Beings extraction scripts.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+def default_jobs():
+    """Number of worker processes to use when --jobs 0 is given"""
+    return os.cpu_count() or 1
+
+def _call(func, args):
+    """Run one task, turning any exception into an error message"""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def run_tasks(func, tasks, jobs=1):
+    """
+    Run func(*args) for every args tuple in tasks.
+    Returns (result, error) pairs in the same order as tasks, so output stays
+    deterministic no matter which worker finishes first.
+    """
+    tasks = list(tasks)
+    if jobs == 0:
+        jobs = default_jobs()
+
+    if jobs <= 1 or len(tasks) <= 1:
+        return [_call(func, args) for args in tasks]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+        futures = [pool.submit(_call, func, args) for args in tasks]
+        return [future.result() for future in futures]
+
+def report_errors(errors):
+    """Print a merged per-file error report, returning the number of failed files"""
+    if not errors:
+        return 0
+
+    print(f"\nErrors in {len(errors)} file(s):")
+    for source, message in errors:
+        print(f"  {source}: {message}")
+    return len(errors)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Static pre-rendering of the Sensitive Beings artwork pages.
+The artwork slides of artworks.html, and of one page per chapter
+(artworks-chapter1.html, ...), are written straight from
+artwork_database.json with image paths, intrinsic sizes, palette colours
+and loading/fetchpriority hints baked in, so the browser shows them
+without fetching the database and rewriting the page. Every page is
+rendered from artworks.template.html, the hand-written shell with an
+empty slide section, so a rendered page is never read back as input.
+A page is only rewritten when its slides or its shell changed.
+
+The hand-written slides artworks.html used to carry are recorded in
+artwork_slides.json (--record). Nothing is rendered while the database
+would drop a title, price, dimensions, image or position those slides
+show; --check lists the differences.
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import hashlib
+import argparse
+
+from build_cache import BuildState
+from build_derivatives import DERIVATIVES_MANIFEST, picture_markup
+from catalog_store import database_chapters
+from catalog_join import same_fact, title_key
+from database_shards import write_if_changed
+
+ARTWORK_DATABASE = "artwork_database.json"
+ARTWORKS_PAGE = "artworks.html"
+ARTWORKS_TEMPLATE = "artworks.template.html"
+SLIDES_REFERENCE = "artwork_slides.json"
+CHAPTER_PAGE = "artworks-{chapter}.html"
+
+# Bump when the slide markup changes so every page is rendered again
+RENDER_VERSION = 1
+
+SLIDES_START = "<!-- artworks:start -->"
+SLIDES_END = "<!-- artworks:end -->"
+SLIDE_INDENT = " " * 16
+
+SLIDE_PATTERN = re.compile(r'<div class="artwork-slide"[^>]*?data-artist="([^"]*)"(.*?)(?=<div class="artwork-slide"|$)', re.S)
+SLIDE_FIELDS = {
+    'title': re.compile(r'<h2 class="artwork-title">(.*?)</h2>', re.S),
+    'price': re.compile(r'<p class="artwork-price">(.*?)</p>', re.S),
+    'dimensions': re.compile(r'<p class="artwork-dimensions">(.*?)</p>', re.S),
+    'image': re.compile(r'<img[^>]*?\ssrc="([^"]*)"', re.S)
+}
+
+def slide_hints(position, count):
+    """Loading attributes for the slide at position; the carousel opens on slide 0 between the last and slide 1"""
+    if position == 0:
+        return {'loading': 'eager', 'fetchpriority': 'high'}
+    if position == 1 or position == count - 1:
+        return {'loading': 'eager'}
+    return {'loading': 'lazy'}
+
+def render_image(artist, artwork, hints, derivatives):
+    attributes = {
+        'src': artwork.get('image', ''),
+        'alt': f"{artwork['title']} by {artist['name']}"
+    }
+    if artwork.get('width') and artwork.get('height'):
+        attributes['width'] = artwork['width']
+        attributes['height'] = artwork['height']
+    attributes.update(hints)
+    attributes['decoding'] = 'async'
+
+    tag = '<img ' + ' '.join(f'{name}="{html.escape(str(value))}"' for name, value in attributes.items()) + '>'
+    entry = derivatives.get(attributes['src'])
+    if entry and any(entry['variants'].values()):
+        tag = picture_markup(tag, entry)
+    return tag
+
+def render_slide(chapter_key, artist, artwork, hints, derivatives):
+    """Markup of one carousel slide, in the shape the hand-written page used"""
+    escape = html.escape
+    # The dominant colour fills the frame until the image arrives
+    style = f' style="background-color: {escape(artwork["palette"][0])}"' if artwork.get('palette') else ''
+    # Only a slide whose image exists is left alone by artwork-loader.js
+    loaded = ' data-artwork-loaded="true"' if os.path.isfile(artwork.get('image', '')) else ''
+
+    lines = [
+        f'<div class="artwork-slide" data-artist="{escape(artist["key"])}" data-chapter="{escape(chapter_key)}"{loaded}>',
+        '    <div class="slide-content">',
+        f'        <div class="artwork-image"{style}>',
+        f'            {render_image(artist, artwork, hints, derivatives)}',
+        '        </div>',
+        '        <div class="artwork-info">',
+        f'            <h2 class="artwork-title">{escape(artwork["title"])}</h2>',
+        f'            <h3 class="artist-name">{escape(artist["name"])}</h3>'
+    ]
+    if artwork.get('price'):
+        lines.append(f'            <p class="artwork-price">{escape(artwork["price"])}</p>')
+    lines.append('            <div class="artwork-details">')
+    lines.append(f'                <p class="artwork-medium">{escape(artwork.get("medium", ""))}</p>')
+    if artwork.get('dimensions'):
+        lines.append(f'                <p class="artwork-dimensions">{escape(artwork["dimensions"])}</p>')
+    lines.append(f'                <p class="artwork-year">{escape(artwork.get("year", ""))}</p>')
+    lines += [
+        '            </div>',
+        '        </div>',
+        '    </div>',
+        '</div>'
+    ]
+    return '\n'.join(SLIDE_INDENT + line for line in lines)
+
+def render_slides(chapters, derivatives):
+    """The slides of every artwork in chapters, in display order"""
+    works = [(key, artist, artwork) for key, chapter in chapters
+             for artist in chapter['artists'] for artwork in artist.get('artworks', [])]
+    slides = [render_slide(key, artist, artwork, slide_hints(position, len(works)), derivatives)
+              for position, (key, artist, artwork) in enumerate(works)]
+    return '\n\n'.join(slides), len(slides)
+
+def lookup_key(name):
+    """Same as ArtworkLoader.artistLookupKey(): "wu-jun", "jun_wu" and "Jun Wu" are one artist"""
+    return ' '.join(sorted(re.findall(r'[a-z0-9]+', name.lower())))
+
+def slide_section(shell):
+    start = shell.index(SLIDES_START) + len(SLIDES_START)
+    return shell[start:shell.index(SLIDES_END, start)]
+
+def page_slides(shell):
+    """{artist, title, price, dimensions, image} of every slide between the markers of shell, in page order"""
+    slides = []
+    for artist, body in SLIDE_PATTERN.findall(slide_section(shell)):
+        slide = {'artist': artist}
+        for field, pattern in SLIDE_FIELDS.items():
+            match = pattern.search(body)
+            slide[field] = html.unescape(match.group(1).strip()) if match else ''
+        slides.append(slide)
+    return slides
+
+def record_slides(page_path=ARTWORKS_PAGE, reference_path=SLIDES_REFERENCE):
+    """
+    Record the hand-written slides of page_path in reference_path, as the
+    slides a render has to reproduce. Returns how many were recorded.
+    """
+    with open(page_path, 'r', encoding='utf-8') as f:
+        shell = f.read()
+    if 'data-chapter=' in slide_section(shell):
+        raise ValueError(f"{page_path} holds rendered slides, not hand-written ones")
+    slides = page_slides(shell)
+    write_if_changed(reference_path, json.dumps(slides, indent=2, ensure_ascii=False).encode('utf-8'))
+    return len(slides)
+
+def render_problems(database, reference):
+    """
+    Reasons rendering database would lose something the recorded slides
+    show: a slide whose title has no artwork, or whose price, dimensions,
+    image or position the database does not reproduce. Titles, prices and
+    sizes are compared the way catalog_join.py compares them, so "120cm ×
+    78cm" and "120 cm × 78 cm" agree.
+    """
+    problems = []
+    works = []
+    artists = {}
+    for _, chapter in database_chapters(database):
+        for artist in chapter['artists']:
+            artists[lookup_key(artist['key'])] = artists[lookup_key(artist.get('name', ''))] = artist['key']
+            for artwork in artist.get('artworks', []):
+                works.append((artist['key'], artwork))
+
+    order = []
+    for slide in reference:
+        key = artists.get(lookup_key(slide['artist']))
+        matches = [(position, artwork) for position, (artist_key, artwork) in enumerate(works)
+                   if artist_key == key and title_key(artwork['title']) == title_key(slide['title'])]
+        if not matches:
+            problems.append(f"{slide['title']} ({slide['artist']}): no artwork with this title in the database")
+            continue
+        position, artwork = matches[0]
+        order.append(position)
+        for field in ('price', 'dimensions'):
+            if slide[field] and not (artwork.get(field) and same_fact(field, slide[field], artwork[field])):
+                problems.append(f"{slide['title']} ({slide['artist']}): {field} {slide[field]!r} would become "
+                                f"{artwork.get(field, '')!r}")
+        if os.path.isfile(slide.get('image', '')) and not os.path.isfile(artwork.get('image', '')):
+            problems.append(f"{slide['title']} ({slide['artist']}): image {slide['image']} would become "
+                            f"{artwork.get('image') or 'none'}, which is not found")
+    if order != sorted(order):
+        problems.append("the database lists artworks in a different order than the recorded slides")
+    return problems
+
+def fill_shell(shell, slides, chapter=None):
+    """shell with its slides replaced, and its titles set to chapter's if given"""
+    start = shell.index(SLIDES_START) + len(SLIDES_START)
+    end = shell.index(SLIDES_END, start)
+    page = f"{shell[:start]}\n{slides}\n{SLIDE_INDENT}{shell[end:]}" if slides else shell[:start] + shell[end:]
+
+    if chapter:
+        title = html.escape(chapter.get('title', ''))
+        description = html.escape(chapter.get('description', ''))
+        page = re.sub(r'<title>.*?</title>', lambda m: f'<title>{title} - Sensitive Beings</title>', page, count=1)
+        page = re.sub(r'(<h1 class="gallery-title">).*?(</h1>)', lambda m: m.group(1) + title + m.group(2), page, count=1)
+        page = re.sub(r'(<p class="gallery-subtitle">).*?(</p>)', lambda m: m.group(1) + description + m.group(2), page, count=1)
+    return page
+
+def render_pages(database, state, template_path=ARTWORKS_TEMPLATE, page_path=ARTWORKS_PAGE, derivatives=None):
+    """
+    Render artworks.html and the chapter pages from the template. Returns
+    (pages rendered, pages left alone because nothing they show changed).
+    """
+    derivatives = derivatives or {}
+    chapters = database_chapters(database)
+    pages = [(page_path, chapters, None)]
+    pages += [(CHAPTER_PAGE.format(chapter=key), [(key, chapter)], chapter) for key, chapter in chapters]
+
+    with open(template_path, 'r', encoding='utf-8') as f:
+        shell = f.read()
+    if SLIDES_START not in shell or SLIDES_END not in shell:
+        raise ValueError(f"{template_path} has no {SLIDES_START} ... {SLIDES_END} section to render into")
+    layout = hashlib.sha256(fill_shell(shell, '').encode('utf-8')).hexdigest()
+
+    rendered = 0
+    skipped = 0
+    for page, page_chapters, chapter in pages:
+        # Only this page's own slice of the data (and image variants) decides if it is stale
+        shown = [(key, data) for key, data in page_chapters]
+        used = {artwork.get('image') for _, data in shown for artist in data['artists'] for artwork in artist.get('artworks', [])}
+        digest = hashlib.sha256(json.dumps([shown, {path: derivatives[path] for path in sorted(used) if path in derivatives}],
+                                           sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        params = {'version': RENDER_VERSION, 'layout': layout, 'data': digest}
+        step = f"render:{page}"
+        if os.path.exists(page) and state.is_fresh(step, [], params):
+            skipped += 1
+            continue
+
+        slides, count = render_slides(page_chapters, derivatives)
+        content = fill_shell(shell, slides, chapter)
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(content)
+        state.record(step, [], [page], params)
+        rendered += 1
+        print(f"  📄 {page}: {count} artworks")
+
+    return rendered, skipped
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pre-render the artwork pages from artwork_database.json")
+    parser.add_argument("--database", default=ARTWORK_DATABASE, help=f"database to render (default: {ARTWORK_DATABASE})")
+    parser.add_argument("--force", action="store_true", help="render every page even if it is current")
+    parser.add_argument("--check", action="store_true",
+                        help=f"only list what rendering would lose from the slides in {SLIDES_REFERENCE}, write nothing")
+    parser.add_argument("--record", action="store_true",
+                        help=f"record the hand-written slides of {ARTWORKS_PAGE} in {SLIDES_REFERENCE} and exit")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.record:
+        try:
+            count = record_slides()
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"✅ Recorded {count} slides of {ARTWORKS_PAGE} in {SLIDES_REFERENCE}")
+        return
+
+    with open(args.database, 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    derivatives = {}
+    if os.path.exists(DERIVATIVES_MANIFEST):
+        with open(DERIVATIVES_MANIFEST, 'r', encoding='utf-8') as f:
+            derivatives = json.load(f)
+
+    try:
+        with open(SLIDES_REFERENCE, 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ No {SLIDES_REFERENCE}: run render_pages.py --record on the hand-written {ARTWORKS_PAGE} first")
+        sys.exit(1)
+
+    # Nothing is written until the database reproduces the hand-written slides
+    problems = render_problems(database, reference)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        print(f"❌ Not rendering: {len(problems)} differences from the slides in {SLIDES_REFERENCE}")
+        sys.exit(1)
+    if args.check:
+        print(f"✅ {args.database} reproduces every slide in {SLIDES_REFERENCE}")
+        return
+
+    state = BuildState(force=args.force)
+    try:
+        rendered, skipped = render_pages(database, state, derivatives=derivatives)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    state.save()
+    print(f"✅ {rendered} pages rendered, {skipped} already up to date")
+
+if __name__ == "__main__":
+    main()
@@ -6,18 +6,66 @@ Maps presentation images to correct artists and artworks based on slide order.
 
 import json
 import os
-import shutil
+import argparse
 from pathlib import Path
 
+from build_cache import BuildState, place_if_changed
+from file_placement import STRATEGIES
+from image_probe import find_image, extension_matches
+from catalog_model import Catalog, MediaAsset
+from catalog_store import sync_database
+from database_shards import write_database
+from image_hash_index import load_assignments, MATCHES_FILE
+from image_placeholders import add_placeholders
+from name_matching import safe_title
+from catalog_join import build_catalog, catalog_index, find_artwork, card_image, print_conflicts, FACT_FIELDS
+
 # Load the extracted presentation content
 def load_presentation_data():
     with open('extracted_content/artist and artwork.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
+# Hand-curated slide -> image map, only used when there are no hash matches
+# and the extracted content predates the slide relationship index
+CURATED_SLIDE_IMAGE_MAP = {
+    'slide9': ['image1.jpg'],  # Chris Bowes - Mirror
+    'slide11': ['image2.jpg', 'image3.png'],  # Jun Wu - Joy of Fish, N Series  
+    'slide13': ['image4.jpg', 'image5.JPG', 'image6.png'],  # Haojun Yang - Wild Grass, Predicament I&II
+    'slide15': ['image7.png'],  # Sharleen Cu - In Good Company
+    'slide18': ['image8.png', 'image9.png'],  # Jiahong Lang - Null's Lamp, Bohemian Rhapsody
+    'slide20': ['image10.JPG'],  # Heng Wang - Myriad of Dust
+    'slide22': ['image11.jpg', 'image12.JPG', 'image13.JPG', 'image14.png'],  # Frank Meuschke - 4 artworks
+    'slide24': ['image15.png', 'image16.png'],  # Vivian Qiu - We've Come A Long Way, Use What You've Got
+    'slide26': ['image17.png'],  # Qianxun Li - Rain: The Apparent Threshold
+    'slide27': ['image18.png', 'image19.jpeg', 'image20.jpeg', 'image21.jpeg', 'image22.jpeg'],  # Qianxun Li - Water Droplet Series
+    'slide29': ['image23.jpg', 'image24.PNG', 'image25.png'],  # Yilin Zhang - Falling to Me, Firework Candy, Angel's Whisper
+    'slide31': ['image26.png'],  # Bei Han - Echo
+    'slide33': ['image27.png'],  # Shiyin Li - Bird of Paradise
+    'slide35': ['image28.png', 'image29.jpg']  # Marina Rodriguez - Damade Night, Santa Lucia Flower
+}
+
+def build_slide_media_index(presentation_data):
+    """
+    Build slide -> images and image -> slides lookups from the 'media' lists
+    extract_content.py records for each slide.
+    """
+    slide_media = {}
+    media_slides = {}
+    
+    for slide_data in presentation_data.get('slides', []):
+        media = slide_data.get('media', [])
+        if media:
+            slide_media[slide_data['slide']] = media
+            for img_name in media:
+                media_slides.setdefault(img_name, []).append(slide_data['slide'])
+    
+    return slide_media, media_slides
+
 # Create proper artist-artwork mapping based on slide structure
 def create_artwork_mapping():
     """
-    Based on the PowerPoint presentation structure, map slides to artists and artworks
+    Based on the PowerPoint presentation structure, map slides to artists and artworks.
+    Returns the Catalog every later step reads and fills in.
     """
     
     # Artist and artwork mapping based on slide analysis
@@ -30,9 +78,6 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Mirror',
-                    'medium': 'Digital Interactive Art',
-                    'year': '2017',
-                    'price': 'PoA',
                     'description': 'An interactive artwork that employs a random dithering algorithm to compress and reproduce the form of the spectator standing before the screen.',
                     'slides': ['slide9']
                 }
@@ -46,19 +91,11 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'The Joy of Fish',
-                    'medium': 'Screen printing',
-                    'dimensions': '120 cm × 78 cm',
-                    'year': '2023',
-                    'price': '$1820',
                     'description': 'Explores everyday sensory experiences through screen printing techniques, questioning the repetitiveness embedded in routine.',
                     'slides': ['slide11']
                 },
                 {
                     'title': 'N Series',
-                    'medium': 'Screen printing', 
-                    'dimensions': '58 cm × 70 cm',
-                    'year': '2023',
-                    'price': '$1495',
                     'description': 'Part of a series exploring repetitive patterns and daily life rhythms.',
                     'slides': ['slide11']
                 }
@@ -72,25 +109,16 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Wild Grass',
-                    'medium': 'Oil on canvas',
-                    'dimensions': '15 cm × 15 cm', 
-                    'year': '2021',
                     'description': 'Captures the spirituality and timelessness found in nature\'s subtle details.',
                     'slides': ['slide13']
                 },
                 {
                     'title': 'Predicament',
-                    'medium': 'Oil on wood panel',
-                    'dimensions': '10 cm × 10 cm',
-                    'year': '2024',
                     'description': 'Explores the relationship between natural decay and spiritual renewal.',
                     'slides': ['slide13']
                 },
                 {
                     'title': 'Predicament II',
-                    'medium': 'Oil on wood panel',
-                    'dimensions': '10 cm × 10 cm', 
-                    'year': '2024',
                     'description': 'Continuation of the Predicament series exploring life\'s spiritual dimensions.',
                     'slides': ['slide13']
                 }
@@ -104,8 +132,6 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'In Good Company',
-                    'medium': 'Acrylic, color pencil, wood and wire',
-                    'year': '2025',
                     'description': 'Explores the complicated mess of identity as a Chinese-Filipino living in Australia through mixed media self-portraiture.',
                     'slides': ['slide15']
                 }
@@ -120,16 +146,11 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Null\'s Lamp',
-                    'medium': 'Metal, acrylic',
-                    'dimensions': '45 × 15 × 15 cm',
-                    'year': '2025',
                     'description': 'Through the skillful use of reflective color, this work creates a rich spatial atmosphere and guides human behavior and visual flow.',
                     'slides': ['slide18']
                 },
                 {
                     'title': 'Bohemian Rhapsody', 
-                    'medium': 'Color, Video, Digital Art',
-                    'year': '2025',
                     'description': 'An experimental video composed of dot matrix colors containing hidden 3D imagery using autostereogram technique.',
                     'slides': ['slide18']
                 }
@@ -143,9 +164,6 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Myriad of Dust',
-                    'medium': 'Velvet photographic paper (giclée print)',
-                    'dimensions': '80 cm × 60 cm',
-                    'year': '2025', 
                     'description': 'The microscopic structure of a butterfly\'s wings revealed in entirely different forms under microscopic lens.',
                     'slides': ['slide20']
                 }
@@ -159,33 +177,21 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Touch The Sky',
-                    'medium': 'Sublimation print on polyethylene fabric',
-                    'dimensions': '129 × 172 cm',
-                    'year': '2022',
                     'description': 'Expression of melancholy, memory, nature, and place using petroleum-based plastic filters.',
                     'slides': ['slide22']
                 },
                 {
                     'title': 'Whitewater River',
-                    'medium': 'Sublimation print on polyethylene fabric', 
-                    'dimensions': '129 × 172cm',
-                    'year': '2022',
                     'description': 'Part of the artist\'s exploration of ecologically significant sites at perceptual thresholds.',
                     'slides': ['slide22']
                 },
                 {
                     'title': 'Fishing, Smith Point, New York',
-                    'medium': 'Pigment Print on Hahnemuhle Photo Rag',
-                    'dimensions': '57 × 76 cm',
-                    'year': '2024',
                     'description': 'Engages dialogue between nature, national identity, place and personal experience.',
                     'slides': ['slide22']
                 },
                 {
                     'title': 'Mountain House, Aspen, Colorado',
-                    'medium': 'Pigment Print on Hahnemuhle Photo Rag',
-                    'dimensions': '57 × 76 cm', 
-                    'year': '2024',
                     'description': 'Part of the "Aesthetics of Melancholy" series exploring nature and personal experience.',
                     'slides': ['slide22']
                 }
@@ -199,17 +205,11 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'We\'ve Come A Long Way',
-                    'medium': 'Rice, embroidery thread, coffee grounds, grass, herbs, tea, grains, hemp yarns',
-                    'dimensions': 'Various sizes, 6 x 4 x 4 cm per object',
-                    'year': '2025',
                     'description': 'Recreates ancient Chinese clay pots using rice and natural fibers, reconnecting with history and Chinese heritage.',
                     'slides': ['slide24']
                 },
                 {
                     'title': 'Use What You\'ve Got',
-                    'medium': 'Rice, coffee grounds, grass, tea, sand, metal',
-                    'dimensions': '15 x 12 x 5cm',
-                    'year': '2025',
                     'description': 'Inspired by repurposed ceramic pot walls, exploring resourcefulness and cultural heritage.',
                     'slides': ['slide24']
                 }
@@ -223,41 +223,26 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Rain: The Apparent Threshold',
-                    'medium': 'Deconstructed umbrella frame, nylon filament, glass, UV-cured',
-                    'dimensions': '105x90cm',
-                    'year': '2025',
                     'description': 'Reimagines the umbrella as a skeletal structure, exploring boundaries between shelter and exposure.',
                     'slides': ['slide26']
                 },
                 {
                     'title': 'Raindrop',
-                    'medium': 'Aluminum, UV Resin, Vegetable Oil, Steel Wire, Transparent Thread',
-                    'dimensions': '8 × 8 × 3.5 cm',
-                    'year': '2024',
                     'description': 'Captures the instant of rain hitting metal, with droplets suspended on transparent threads.',
                     'slides': ['slide27']
                 },
                 {
                     'title': 'After the Rain',
-                    'medium': 'Aluminum, UV resin, vegetable oil, steel wire',
-                    'dimensions': '8 × 8 × 3.5 cm',
-                    'year': '2024',
                     'description': 'Captures the quiet aftermath of rainfall, when droplets remain on metal surfaces.',
                     'slides': ['slide27']
                 },
                 {
                     'title': 'World',
-                    'medium': 'Aluminum, wood, UV glue, vegetable oil, plastic, handmade paper',
-                    'dimensions': '7 × 6 × 6 cm',
-                    'year': '2024',
                     'description': 'Incorporates elements of light, shadow, and trees with movable leaves and embedded leaf fragments.',
                     'slides': ['slide27']
                 },
                 {
                     'title': 'Water Between Fingers',
-                    'medium': 'UV glue, vegetable oil, plastic',
-                    'dimensions': '3 × 4 × 5 cm',
-                    'year': '2024',
                     'description': 'Captures the sensation of water droplets slipping between fingers, symbolizing the flow of life.',
                     'slides': ['slide27']
                 }
@@ -271,26 +256,16 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Falling to Me',
-                    'medium': 'Acrylic on canvas',
-                    'dimensions': '40 x 50 cm',
-                    'year': '2025',
-                    'price': '$2200',
                     'description': 'Explores themes of mysticism, trauma, and healing through cross-cultural experiences and intuitive artistic practice.',
                     'slides': ['slide29']
                 },
                 {
                     'title': 'Firework Candy',
-                    'medium': 'Pastel on wood panel',
-                    'dimensions': '30 x 40 cm',
-                    'year': '2025',
                     'description': 'Part of the artist\'s exploration of mysticism and healing through color and form.',
                     'slides': ['slide29']
                 },
                 {
                     'title': 'Angel\'s Whisper',
-                    'medium': 'Pastel on wood panel',
-                    'dimensions': '30 x 40 cm', 
-                    'year': '2025',
                     'description': 'Explores spiritual themes and the artist\'s intuitive approach to healing through art.',
                     'slides': ['slide29']
                 }
@@ -304,10 +279,6 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Echo',
-                    'medium': 'Paper mounted on wood panel, natural mineral pigments, synthetic pigments, gold leaf',
-                    'dimensions': '41 x 31.8cm',
-                    'year': '2025',
-                    'price': '$1400',
                     'description': 'Connects natural symbols with the act of creation, evoking the viewer\'s sensory experience of the ocean\'s sound.',
                     'slides': ['slide31']
                 }
@@ -321,9 +292,6 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Bird of Paradise',
-                    'medium': 'Digital tablet drawing + archival pigment print',
-                    'dimensions': '100cm x 50 cm',
-                    'year': '2025',
                     'description': 'A magical story of children and a glowing bird during wartime, exploring themes of hope and rescue.',
                     'slides': ['slide33']
                 }
@@ -337,18 +305,11 @@ def create_artwork_mapping():
             'artworks': [
                 {
                     'title': 'Damade Night',
-                    'medium': 'Glazed ceramic with iridescent lusters',
-                    'dimensions': '28x10x8cm',
-                    'year': '2025',
                     'description': 'Celebrates the hidden beauty that emerges in darkness and the adaptability of life.',
                     'slides': ['slide35']
                 },
                 {
                     'title': 'Santa Lucia Flower',
-                    'medium': 'Glazed ceramic with iridescent lusters',
-                    'dimensions': '20x14x8cm',
-                    'year': '2025',
-                    'price': '$210 or $310',
                     'description': 'Celebrates the fleeting nature of life through vibrant ceramic flowers with blue luster details.',
                     'slides': ['slide35']
                 }
@@ -356,15 +317,61 @@ def create_artwork_mapping():
         }
     }
     
-    return artist_artwork_mapping
+    catalog = Catalog.from_mapping(artist_artwork_mapping)
+    
+    # Medium, size, year and price come from the cards, price list and slides
+    joined = build_catalog(artists=[artist.name for artist in catalog])
+    apply_catalog(catalog, joined)
+    
+    return catalog
+
+def apply_catalog(catalog, joined):
+    """
+    Copy the joined catalog facts onto the artworks of the catalog, and
+    report the artworks no source knows and the sources that disagree
+    """
+    index = catalog_index(joined)
+    missing = []
+    fuzzy = []
+    total = 0
+    
+    for artist, artwork in catalog.artworks():
+        total += 1
+        record, score = find_artwork(index, artist.name, artwork.title)
+        if record is None:
+            missing.append(f"{artist.name} - {artwork.title}")
+            continue
+        if score < 1:
+            fuzzy.append(f"{artwork.title} ≈ {record['title']} ({score:.2f})")
+        # Titles as the cards write them, so the database and pages agree with the catalog
+        artwork.title = record['title']
+        for field in FACT_FIELDS:
+            if record.get(field):
+                artwork.set_fact(field, record[field])
+        # The picture beside the artwork's card stands in until a placed image is found
+        image_path, image_info = card_image(record)
+        if image_path:
+            artwork.image = MediaAsset.from_probe(image_path.as_posix(), image_info)
+    
+    print(f"🔗 Catalog facts joined for {total - len(missing)} artworks")
+    for name in fuzzy:
+        print(f"  🔎 {name}")
+    for name in missing:
+        print(f"  ⚠️  No catalog record for {name}")
+    if joined['conflicts']:
+        print(f"⚠️  {len(joined['conflicts'])} conflicts between catalog sources (see catalog_join.py):")
+        print_conflicts(joined['conflicts'])
 
-def reorganize_images():
+def reorganize_images(state=None, placement='auto'):
     """
-    Reorganize presentation images based on slide structure
+    Reorganize presentation images based on slide structure.
+    placement picks how each image lands in its artist folder (see
+    file_placement.STRATEGIES); 'auto' links instead of copying when it can.
     """
     print("🎨 Reorganizing artwork images based on PowerPoint presentation structure...")
+    state = state or BuildState()
     
-    mapping = create_artwork_mapping()
+    catalog = create_artwork_mapping()
     presentation_data = load_presentation_data()
     
     # Create directories for properly organized images
@@ -382,143 +389,142 @@ def reorganize_images():
     
     print(f"📁 Found {len(presentation_images)} presentation images")
     
-    # Map slides to images based on slide numbers
-    slide_to_image = {}
-    slides_with_content = []
+    # Perceptual-hash matches (image_hash_index.py) say which image shows which
+    # artwork; until there are any, the slide -> media index from the pptx
+    # relationship parts does
+    assignments = load_assignments()
+    assigned = catalog_index({'artworks': assignments})
+    slide_image_map, image_slide_map = build_slide_media_index(presentation_data)
     
-    # Extract slides that contain artwork content
-    for slide_data in presentation_data.get('slides', []):
-        slide_id = slide_data.get('slide', '')
-        content = slide_data.get('content', [])
-        
-        # Look for artwork-related content
-        content_text = ' '.join(content).lower()
-        if any(keyword in content_text for keyword in ['title:', 'material:', 'artwork', 'size:', 'year:']):
-            slides_with_content.append(slide_id)
+    if assignments:
+        print(f"🎯 {len(assignments)} images assigned by {MATCHES_FILE}")
+    elif slide_image_map:
+        print(f"🎯 Indexed {len(image_slide_map)} images across {len(slide_image_map)} slides from slide relationships")
+    else:
+        print("⚠️  No slide media in extracted content (re-run extract_content.py), using the curated slide map")
+        slide_image_map = CURATED_SLIDE_IMAGE_MAP
     
-    print(f"🎯 Found {len(slides_with_content)} slides with artwork content")
+    # Artworks that share a slide take that slide's images in order
+    slide_positions = {}
+    artwork_position = {}
+    for artist, artwork in catalog.artworks():
+        for slide in artwork.slides:
+            artwork_position[(slide, id(artwork))] = slide_positions.get(slide, 0)
+            slide_positions[slide] = artwork_position[(slide, id(artwork))] + 1
     
-    # Create a mapping between image numbers and slides
-    # Assuming presentation images are roughly in slide order
-    image_slide_mapping = {}
-    
-    # Manual mapping based on analysis of the presentation structure
-    slide_image_map = {
-        'slide9': ['image1.jpg'],  # Chris Bowes - Mirror
-        'slide11': ['image2.jpg', 'image3.png'],  # Jun Wu - Joy of Fish, N Series  
-        'slide13': ['image4.jpg', 'image5.JPG', 'image6.png'],  # Haojun Yang - Wild Grass, Predicament I&II
-        'slide15': ['image7.png'],  # Sharleen Cu - In Good Company
-        'slide18': ['image8.png', 'image9.png'],  # Jiahong Lang - Null's Lamp, Bohemian Rhapsody
-        'slide20': ['image10.JPG'],  # Heng Wang - Myriad of Dust
-        'slide22': ['image11.jpg', 'image12.JPG', 'image13.JPG', 'image14.png'],  # Frank Meuschke - 4 artworks
-        'slide24': ['image15.png', 'image16.png'],  # Vivian Qiu - We've Come A Long Way, Use What You've Got
-        'slide26': ['image17.png'],  # Qianxun Li - Rain: The Apparent Threshold
-        'slide27': ['image18.png', 'image19.jpeg', 'image20.jpeg', 'image21.jpeg', 'image22.jpeg'],  # Qianxun Li - Water Droplet Series
-        'slide29': ['image23.jpg', 'image24.PNG', 'image25.png'],  # Yilin Zhang - Falling to Me, Firework Candy, Angel's Whisper
-        'slide31': ['image26.png'],  # Bei Han - Echo
-        'slide33': ['image27.png'],  # Shiyin Li - Bird of Paradise
-        'slide35': ['image28.png', 'image29.jpg']  # Marina Rodriguez - Damade Night, Santa Lucia Flower
-    }
+    def artwork_images(artist, artwork):
+        """Presentation images of one artwork, matched or by slide position"""
+        if assignments:
+            record, score = find_artwork(assigned, artist.key, artwork.title)
+            if record is None:
+                print(f"  ⚠️  No image matched to {artwork.title}")
+                return []
+            return [Path(record['image'])]
+        
+        images = []
+        for slide in artwork.slides:
+            slide_images = slide_image_map.get(slide, [])
+            position = artwork_position[(slide, id(artwork))]
+            if position >= len(slide_images):
+                print(f"  ⚠️  No image left on {slide} for {artwork.title}")
+                continue
+            images.append(presentations_dir / slide_images[position])
+        return images
     
     # Create proper artist directories and copy images
     images_copied = 0
     
-    for artist_key, artist_data in mapping.items():
+    for artist in catalog:
+        artist_key = artist.key
         artist_dir = base_images_dir / artist_key
         artist_dir.mkdir(exist_ok=True)
         
-        print(f"👤 Processing {artist_data['name']}...")
+        print(f"👤 Processing {artist.name}...")
         
         # Process each artwork for this artist
-        for artwork in artist_data['artworks']:
-            artwork_slides = artwork.get('slides', [])
-            
-            for slide in artwork_slides:
-                if slide in slide_image_map:
-                    slide_images = slide_image_map[slide]
+        for artwork in artist.artworks:
+            for src_path in artwork_images(artist, artwork):
+                img_name = src_path.name
+                if src_path.exists():
+                    # Create safe filename from artwork title
+                    title_stem = safe_title(artwork.title)
+                    dst_filename = f"{title_stem}{src_path.suffix}"
+                    dst_path = artist_dir / dst_filename
                     
-                    for img_name in slide_images:
-                        src_path = presentations_dir / img_name
-                        if src_path.exists():
-                            # Create safe filename from artwork title
-                            safe_title = artwork['title'].lower().replace(' ', '_').replace("'", '').replace('"', '').replace(',', '').replace(':', '')
-                            dst_filename = f"{safe_title}{src_path.suffix}"
-                            dst_path = artist_dir / dst_filename
-                            
-                            try:
-                                shutil.copy2(src_path, dst_path)
-                                print(f"  ✅ Copied {img_name} → {artist_key}/{dst_filename}")
-                                images_copied += 1
-                            except Exception as e:
-                                print(f"  ❌ Failed to copy {img_name}: {e}")
+                    try:
+                        method = place_if_changed(state, src_path, dst_path, placement)
+                        if method:
+                            print(f"  ✅ Placed {img_name} → {artist_key}/{dst_filename} ({method})")
                         else:
-                            print(f"  ⚠️  Image not found: {img_name}")
+                            print(f"  ⏭️  Up to date: {artist_key}/{dst_filename}")
+                        images_copied += 1
+                    except Exception as e:
+                        print(f"  ❌ Failed to place {img_name}: {e}")
+                else:
+                    print(f"  ⚠️  Image not found: {img_name}")
     
     print(f"\n🎉 Successfully reorganized {images_copied} images!")
-    return mapping
+    return catalog
 
-def update_artwork_database(mapping):
+def update_artwork_database(catalog, state=None, db=None):
     """
-    Update the artwork database with correct image paths
+    Update the artwork database with correct image paths, and the SQLite
+    catalog at db too when one is given
     """
     print("📝 Updating artwork database with correct image paths...")
     
-    database = {
-        'chapter1': {
-            'title': 'The Replicated Self',
-            'description': 'Selfhood is not self-made, but shaped in subtle repetitions, negotiated glances, and quiet adjustments to what is expected.',
-            'artists': []
-        },
-        'chapter2': {
-            'title': 'The Rewilded Senses', 
-            'description': 'Even in the default disciplinary reality, feelings still find their way to nurturing the part of us that continues to listen beneath it all.',
-            'artists': []
-        }
-    }
-    
-    for artist_key, artist_data in mapping.items():
-        chapter = artist_data['chapter']
-        
-        artist_entry = {
-            'key': artist_key,
-            'name': artist_data['name'],
-            'bio': f"Artist information from {artist_data['name']}",
-            'specialty': artist_data['artworks'][0]['medium'] if artist_data['artworks'] else 'Mixed Media',
-            'artworks': []
-        }
-        
-        for artwork in artist_data['artworks']:
-            safe_title = artwork['title'].lower().replace(' ', '_').replace("'", '').replace('"', '').replace(',', '').replace(':', '')
-            
-            artwork_entry = {
-                'title': artwork['title'],
-                'image': f"images/{artist_key}/{safe_title}.jpg",  # Default to .jpg, will be corrected if needed
-                'medium': artwork.get('medium', ''),
-                'dimensions': artwork.get('dimensions', ''),
-                'year': artwork.get('year', ''),
-                'price': artwork.get('price', ''),
-                'description': artwork.get('description', '')
-            }
-            
-            artist_entry['artworks'].append(artwork_entry)
+    for artist, artwork in catalog.artworks():
+        title_stem = safe_title(artwork.title)
         
-        database[chapter]['artists'].append(artist_entry)
+        # Use the file that is really there, with its real extension and size
+        image_path, image_info = find_image(Path('images') / artist.key, title_stem)
+        if image_path is None:
+            if not artwork.image:
+                print(f"  ⚠️  No image found for {artist.key}/{title_stem}")
+            continue
+        if not extension_matches(image_path, image_info):
+            print(f"  ⚠️  {image_path} is really {image_info['format']}")
+        artwork.image = MediaAsset.from_probe(image_path.as_posix(), image_info)
+    
+    # No guessed path for artworks without a file or card picture: an empty
+    # image leaves the slide's own in place
+    database = catalog.to_database()
+    
+    # Placeholders of images that did not change are carried over from the old database
+    previous = None
+    if os.path.exists('artwork_database.json'):
+        with open('artwork_database.json', 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    add_placeholders(database, state, previous=previous)
     
     # Save updated database
-    with open('artwork_database.json', 'w', encoding='utf-8') as f:
-        json.dump(database, f, indent=2, ensure_ascii=False)
+    write_database(database)
+    if db:
+        sync_database(database, db)
     
     print("✅ Artwork database updated successfully!")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reorganize artwork images based on the presentation structure")
+    parser.add_argument("--force", action="store_true",
+                        help="place every image even if it is already current")
+    parser.add_argument("--placement", choices=STRATEGIES, default="auto",
+                        help="how images land in artist folders (default: auto = reflink, else hardlink, else copy)")
+    parser.add_argument("--db", metavar="PATH", help="also upsert the result into this SQLite catalog (see catalog_store.py)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     print("🎨 Starting artwork image reorganization based on PowerPoint structure...")
     
     try:
         # Reorganize images based on presentation structure
-        mapping = reorganize_images()
+        state = BuildState(force=args.force)
+        catalog = reorganize_images(state, args.placement)
         
         # Update the artwork database
-        update_artwork_database(mapping)
+        update_artwork_database(catalog, state, args.db)
+        state.save()
         
         print("\n🎉 Image reorganization completed successfully!")
         print("📁 Images are now properly organized by artist in the images/ directory")
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Parse the artwork cards in artwork/*.rtf for the Sensitive Beings website.
+Each card is a short RTF document with "Title:", "Artist:", "Material:",
+"Size:", "Year:" and "Price:" lines. A small RTF tokenizer turns every card
+into plain text, the lines become structured records, and the records are
+merged into artwork_database.json.
+"""
+
+import re
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from parallel_jobs import run_tasks, report_errors
+from name_matching import NameMatcher, name_key, artist_key, artist_text
+from catalog_store import sync_database
+from database_shards import write_database
+
+CARDS_DIR = "artwork"
+
+# Folders with at least this many cards are parsed on the process pool
+PARALLEL_CARD_COUNT = 64
+
+# Card labels -> artwork_database.json fields
+CARD_FIELDS = {
+    'title': 'title',
+    'artist': 'artist',
+    'material': 'medium',
+    'medium': 'medium',
+    'size': 'dimensions',
+    'dimensions': 'dimensions',
+    'year': 'year',
+    'price': 'price',
+    'techniques': 'techniques'
+}
+
+# Card fields copied onto the database entries
+MERGED_FIELDS = ['medium', 'dimensions', 'year', 'price']
+
+# Title similarity (see name_matching.py) a card needs to match an artwork whose title differs
+CARD_MATCH_THRESHOLD = 0.8
+
+# Control words, hex escapes, escaped characters, group braces and plain text
+RTF_TOKEN = re.compile(
+    r"\\([a-zA-Z]+)(-?\d+)? ?"
+    r"|\\'([0-9a-fA-F]{2})"
+    r"|\\([^a-zA-Z'])"
+    r"|([{}])"
+    r"|([^\\{}]+)",
+    re.DOTALL
+)
+
+# Groups whose text is formatting data rather than document content
+RTF_SKIP_DESTINATIONS = {
+    'fonttbl', 'colortbl', 'stylesheet', 'info', 'pict', 'object', 'header',
+    'footer', 'expandedcolortbl', 'listtable', 'listoverridetable', 'themedata'
+}
+
+# Control words that stand for a character
+RTF_CHARACTERS = {
+    'par': '\n', 'line': '\n', 'sect': '\n', 'page': '\n', 'tab': '\t', 'cell': '\t', 'row': '\n',
+    'emdash': '\u2014', 'endash': '\u2013', 'bullet': '\u2022',
+    'lquote': '\u2018', 'rquote': '\u2019', 'ldblquote': '\u201c', 'rdblquote': '\u201d'
+}
+
+def rtf_to_text(data):
+    """Plain text of an RTF document given as bytes or str"""
+    if isinstance(data, bytes):
+        # RTF is 7-bit; anything else arrives as escapes decoded below
+        data = data.decode('latin-1')
+
+    codepage = 'cp1252'
+    out = []
+    stack = []
+    skip = False
+    unicode_skip = 1
+    pending_skip = 0
+    group_start = False
+
+    for match in RTF_TOKEN.finditer(data):
+        word, arg, hex_code, symbol, brace, text = match.groups()
+
+        if brace == '{':
+            stack.append((skip, unicode_skip))
+            group_start = True
+            continue
+        if brace == '}':
+            if stack:
+                skip, unicode_skip = stack.pop()
+            group_start = False
+            continue
+
+        first_in_group = group_start
+        group_start = False
+
+        # Characters standing in for the previous \uN are dropped
+        if pending_skip and (hex_code or text):
+            if text:
+                dropped = min(pending_skip, len(text))
+                pending_skip -= dropped
+                text = text[dropped:]
+                if not text:
+                    continue
+            else:
+                pending_skip -= 1
+                continue
+
+        if word:
+            if word in RTF_SKIP_DESTINATIONS and first_in_group:
+                skip = True
+            elif word == 'ansicpg' and arg:
+                codepage = f"cp{arg}"
+            elif word == 'uc' and arg:
+                unicode_skip = int(arg)
+            elif skip:
+                continue
+            elif word == 'u' and arg:
+                out.append(chr(int(arg) % 0x10000))
+                pending_skip = unicode_skip
+            elif word in RTF_CHARACTERS:
+                out.append(RTF_CHARACTERS[word])
+        elif symbol:
+            if symbol == '*' and first_in_group:
+                # \* marks a destination readers may ignore
+                skip = True
+            elif skip:
+                continue
+            elif symbol in '\r\n':
+                out.append('\n')
+            elif symbol == '~':
+                out.append('\u00a0')
+            elif symbol in '\\{}':
+                out.append(symbol)
+        elif skip:
+            continue
+        elif hex_code:
+            out.append(bytes([int(hex_code, 16)]).decode(codepage, errors='replace'))
+        elif text:
+            # Raw line breaks in RTF source are not part of the text
+            out.append(text.replace('\r', '').replace('\n', ''))
+
+    return ''.join(out)
+
+def normalize_spaces(value):
+    return re.sub(r'\s+', ' ', value.replace('\u00a0', ' ')).strip()
+
+def normalize_price(value):
+    """'1026' -> '$1026', matching the database; 'PoA' and other text stay as they are"""
+    if re.fullmatch(r'\d+(?:\.\d+)?', value):
+        return f"${value}"
+    return value
+
+def normalize_dimensions(value):
+    """'57cm x 76 cm' -> '57 cm × 76 cm', the way the database writes sizes"""
+    value = re.sub(r'(\d)\s*(cm|mm|in)\b', r'\1 \2', value)
+    return re.sub(r'(\d|cm|mm|in)\s*[x×]\s*(?=\d)', r'\1 × ', value)
+
+def parse_card_text(text):
+    """Record from a card's 'Label: value' lines; unknown labels are kept lowercased"""
+    record = {}
+    for line in text.splitlines():
+        label, sep, value = line.partition(':')
+        if not sep:
+            continue
+        label = normalize_spaces(label).lower()
+        field = CARD_FIELDS.get(label, label)
+        value = normalize_spaces(value)
+        if value and field not in record:
+            record[field] = value
+
+    if 'price' in record:
+        record['price'] = normalize_price(record['price'])
+    if 'dimensions' in record:
+        record['dimensions'] = normalize_dimensions(record['dimensions'])
+    return record
+
+def parse_card(path):
+    """Record for one card file, with its source path"""
+    with open(path, 'rb') as f:
+        record = parse_card_text(rtf_to_text(f.read()))
+    record['source'] = Path(path).as_posix()
+    return record
+
+def card_sort_key(path):
+    # artwork2.rtf before artwork10.rtf
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', Path(path).name)]
+
+def parse_cards(folder=CARDS_DIR, jobs=1):
+    """Records for every .rtf card in folder, in card number order, plus (path, error) pairs"""
+    paths = sorted((p.as_posix() for p in Path(folder).glob("*.rtf")), key=card_sort_key)
+    if len(paths) < PARALLEL_CARD_COUNT:
+        jobs = 1
+
+    records = []
+    errors = []
+    for path, (record, error) in zip(paths, run_tasks(parse_card, [(path,) for path in paths], jobs)):
+        if error:
+            errors.append((path, error))
+        elif 'title' not in record:
+            errors.append((path, "no Title: line"))
+        else:
+            records.append(record)
+    return records, errors
+
+def merge_cards(database, records, add_new=False, threshold=CARD_MATCH_THRESHOLD):
+    """
+    Copy card fields onto the matching database artworks. Cards are matched
+    on exact artist and title first; the rest by title similarity among
+    that artist's artworks no card has claimed yet. Cards whose artist is
+    known but whose title is not are added as new artworks when add_new
+    is set. Returns (updated, added, unmatched records, fuzzy matches as
+    (record, artwork title, score)).
+    """
+    artists = {}
+    artworks = {}
+    artist_matcher = NameMatcher(normalize=artist_text)
+    for chapter in database.values():
+        for artist in chapter.get('artists', []):
+            artists[artist_key(artist['name'])] = artist
+            artist_matcher.add(artist_key(artist['name']), artist['name'])
+            artist_matcher.add(artist_key(artist['name']), artist.get('key', ''))
+            for artwork in artist.get('artworks', []):
+                artworks[(artist_key(artist['name']), name_key(artwork['title']))] = artwork
+
+    def resolve_artist(name):
+        match = artist_matcher.match(name, threshold)
+        return match.key if match else artist_key(name)
+
+    claimed = set()
+    matched = []
+    leftovers = []
+    for record in records:
+        key = (resolve_artist(record.get('artist', '')), name_key(record['title']))
+        if key in artworks and key not in claimed:
+            claimed.add(key)
+            matched.append((record, artworks[key]))
+        else:
+            leftovers.append(record)
+
+    title_matcher = NameMatcher((key, artworks[key]['title']) for key in artworks if key not in claimed)
+    added = 0
+    unmatched = []
+    fuzzy = []
+    for record in leftovers:
+        artist_name = resolve_artist(record.get('artist', ''))
+        match = next((candidate for candidate in title_matcher.candidates(record['title'], threshold, limit=10)
+                      if candidate.key[0] == artist_name and candidate.key not in claimed), None)
+        if match:
+            claimed.add(match.key)
+            artwork = artworks[match.key]
+            fuzzy.append((record, artwork['title'], match.score))
+        else:
+            artist = artists.get(artist_name)
+            if not add_new or artist is None:
+                unmatched.append(record)
+                continue
+            artwork = {'title': record['title'], 'image': '', 'description': ''}
+            artist.setdefault('artworks', []).append(artwork)
+            artworks[(artist_name, name_key(record['title']))] = artwork
+            added += 1
+        matched.append((record, artwork))
+
+    updated = 0
+    for record, artwork in matched:
+        changed = False
+        for field in MERGED_FIELDS:
+            if record.get(field) and artwork.get(field) != record[field]:
+                artwork[field] = record[field]
+                changed = True
+        if artwork.get('card') != record['source']:
+            artwork['card'] = record['source']
+            changed = True
+        updated += changed
+
+    return updated, added, unmatched, fuzzy
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parse artwork RTF cards into artwork_database.json")
+    parser.add_argument("folder", nargs="?", default=CARDS_DIR, help=f"folder of .rtf cards (default: {CARDS_DIR})")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help=f"worker processes for folders of {PARALLEL_CARD_COUNT}+ cards (0 = one per CPU, default: 0)")
+    parser.add_argument("--add-new", action="store_true", help="add cards for known artists but unknown titles as new artworks")
+    parser.add_argument("--dry-run", action="store_true", help="print the parsed cards without touching the database")
+    parser.add_argument("--db", metavar="PATH", help="also upsert the result into this SQLite catalog (see catalog_store.py)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    records, errors = parse_cards(args.folder, args.jobs)
+    print(f"🗂️  Parsed {len(records)} cards from {args.folder}")
+
+    if args.dry_run:
+        print(json.dumps(records, indent=2, ensure_ascii=False))
+    else:
+        with open('artwork_database.json', 'r', encoding='utf-8') as f:
+            database = json.load(f)
+
+        updated, added, unmatched, fuzzy = merge_cards(database, records, args.add_new)
+
+        write_database(database)
+        if args.db:
+            sync_database(database, args.db)
+
+        print(f"📝 {updated} artworks updated, {added} added")
+        for record, title, score in fuzzy:
+            print(f"  🔎 {record['source']}: {record['title']} ≈ {title} ({score:.2f})")
+        if unmatched:
+            print(f"⚠️  {len(unmatched)} cards match no artwork in the database:")
+            for record in unmatched:
+                print(f"  {record['source']}: {record['title']} ({record.get('artist', 'no artist')})")
+
+    if report_errors(errors):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,39 @@
  * Dynamically loads artwork images and replaces placeholders
  */
 
+// Written by database_shards.py next to artwork_database.json
+const ARTWORK_SHARD_DIR = 'artwork_shards';
+const ARTWORK_CATALOG_STREAM = 'artwork_catalog.ndjson';
+
 class ArtworkLoader {
     constructor() {
         this.artworkDatabase = null;
+        this.shardIndex = null;
+        this.artistKeys = new Map();
+        this.artistShards = new Map();
         this.imageCache = new Map();
         this.retryAttempts = 3;
+        this.deepZoom = window.DeepZoomViewer ? new DeepZoomViewer() : null;
         
         this.init();
     }
 
     async init() {
+        // The zoom manifest downloads alongside the artwork data rather than after it
+        this.zoomReady = this.deepZoom ? this.deepZoom.loadManifest() : Promise.resolve();
+        
+        // Pages written by render_pages.py already carry every image; only zoom is left to add
+        const slides = document.querySelectorAll('.artwork-slide');
+        if (slides.length && Array.from(slides).every(slide => slide.dataset.artworkLoaded)) {
+            await this.zoomReady;
+            slides.forEach(slide => this.enhanceRenderedSlide(slide));
+            return;
+        }
+        
         try {
             await this.loadArtworkDatabase();
-            this.replaceImagePlaceholders();
+            await this.zoomReady;
+            await this.replaceImagePlaceholders();
             this.setupLazyLoading();
         } catch (error) {
             console.warn('Failed to load artwork database:', error);
@@ -24,12 +44,49 @@ class ArtworkLoader {
     }
 
     async loadArtworkDatabase() {
+        // The three forms are requested together, so a missing one costs no extra round trip.
+        // The first that exists, in this order, is used and the others are cancelled.
+        const sources = [`${ARTWORK_SHARD_DIR}/index.json`, ARTWORK_CATALOG_STREAM, 'artwork_database.json']
+            .map(url => {
+                const controller = new AbortController();
+                const response = fetch(url, { signal: controller.signal })
+                    .then(response => (response.ok ? response : null), () => null);
+                return { controller, response };
+            });
+        const cancelAfter = index => sources.slice(index + 1).forEach(source => source.controller.abort());
+        
+        // The small shard index is enough to start; artists are fetched as slides need them
+        let response = await sources[0].response;
+        if (response) {
+            cancelAfter(0);
+            this.shardIndex = await response.json();
+            Object.entries(this.shardIndex.artists).forEach(([key, artist]) => {
+                this.addArtistKey(key, key);
+                this.addArtistKey(artist.name, key);
+            });
+            return;
+        }
+        
+        response = await sources[1].response;
+        if (response) {
+            cancelAfter(1);
+            await this.streamCatalog(response);
+            return;
+        }
+        
         try {
-            const response = await fetch('artwork_database.json');
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}`);
+            response = await sources[2].response;
+            if (!response) {
+                throw new Error('No artwork database');
             }
             this.artworkDatabase = await response.json();
+            Object.values(this.artworkDatabase).forEach(chapter => {
+                (chapter.artists || []).forEach(artist => {
+                    this.artistShards.set(artist.key, Promise.resolve(artist));
+                    this.addArtistKey(artist.key, artist.key);
+                    this.addArtistKey(artist.name, artist.key);
+                });
+            });
             console.log('Loaded artwork database:', this.artworkDatabase);
         } catch (error) {
             console.warn('Could not load artwork database, using fallback images');
@@ -37,58 +94,160 @@ class ArtworkLoader {
         }
     }
 
-    replaceImagePlaceholders() {
-        if (!this.artworkDatabase) return;
-        
-        // Get all artwork slides
-        const artworkSlides = document.querySelectorAll('.artwork-slide');
-        
-        artworkSlides.forEach(slide => {
-            const artistKey = slide.dataset.artist;
-            if (!artistKey) return;
-            
-            // Find artist in database
-            let artistData = null;
-            if (this.artworkDatabase.chapter1?.artists) {
-                artistData = this.artworkDatabase.chapter1.artists.find(a => a.key === artistKey);
-            }
-            if (!artistData && this.artworkDatabase.chapter2?.artists) {
-                artistData = this.artworkDatabase.chapter2.artists.find(a => a.key === artistKey);
+    async streamCatalog(response) {
+        // One record per line: chapter, then each artist followed by their artworks.
+        // An artist's slides are filled in as soon as the next artist starts.
+        let artist = null;
+        let count = 0;
+        const finishArtist = () => {
+            if (!artist) return;
+            const done = artist;
+            this.artistShards.set(done.key, Promise.resolve(done));
+            this.addArtistKey(done.key, done.key);
+            this.addArtistKey(done.name, done.key);
+            this.zoomReady.then(() => this.replaceArtistSlides(done.key));
+            artist = null;
+            count++;
+        };
+        const handleLine = line => {
+            if (!line.trim()) return;
+            const record = JSON.parse(line);
+            if (record.type === 'artwork') {
+                artist?.artworks.push(record);
+            } else {
+                finishArtist();
+                if (record.type === 'artist') {
+                    artist = { ...record, artworks: [] };
+                }
             }
-            
-            if (!artistData) {
-                console.warn(`Artist data not found for: ${artistKey}`);
-                return;
+        };
+        
+        if (!response.body?.getReader) {
+            (await response.text()).split('\n').forEach(handleLine);
+        } else {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffered = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffered += decoder.decode(value, { stream: true });
+                const lines = buffered.split('\n');
+                buffered = lines.pop();
+                lines.forEach(handleLine);
             }
-            
-            // Get artwork title from slide
-            const artworkTitleElement = slide.querySelector('.artwork-title');
-            const artworkTitle = artworkTitleElement?.textContent;
-            
-            if (!artworkTitle) return;
-            
-            // Find matching artwork
-            const artworkData = artistData.artworks.find(artwork => 
-                artwork.title.toLowerCase() === artworkTitle.toLowerCase()
-            );
-            
-            if (artworkData) {
-                this.replaceSlideImage(slide, artworkData, artistData);
+            handleLine(buffered + decoder.decode());
+        }
+        finishArtist();
+        return count;
+    }
+
+    replaceArtistSlides(artistKey) {
+        document.querySelectorAll('.artwork-slide').forEach(slide => {
+            const slideArtist = slide.dataset.artist;
+            if (slideArtist && this.artistKeys.get(this.artistLookupKey(slideArtist)) === artistKey) {
+                this.replaceSlidePlaceholder(slide);
             }
         });
     }
 
+    async fetchJson(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return response.json();
+    }
+
+    artistLookupKey(value) {
+        // "wu-jun", "jun_wu" and "Jun Wu" all name the same artist
+        return value.toLowerCase().split(/[^a-z0-9]+/).filter(Boolean).sort().join(' ');
+    }
+
+    addArtistKey(value, key) {
+        if (value) {
+            this.artistKeys.set(this.artistLookupKey(value), key);
+        }
+    }
+
+    loadArtist(slideArtist) {
+        const key = this.artistKeys.get(this.artistLookupKey(slideArtist));
+        if (!key) return Promise.resolve(null);
+        
+        // One request per artist, however many slides show their work
+        if (!this.artistShards.has(key)) {
+            const shard = this.shardIndex.artists[key];
+            this.artistShards.set(key, this.fetchJson(`${ARTWORK_SHARD_DIR}/${shard.shard}?v=${shard.hash}`));
+        }
+        return this.artistShards.get(key);
+    }
+
+    async replaceImagePlaceholders() {
+        if (!this.artistKeys.size) return;
+        
+        // Request the shard of the slide on screen first
+        const artworkSlides = Array.from(document.querySelectorAll('.artwork-slide'));
+        artworkSlides.sort((a, b) => b.classList.contains('active') - a.classList.contains('active'));
+        
+        await Promise.all(artworkSlides.map(slide => this.replaceSlidePlaceholder(slide)));
+    }
+
+    async replaceSlidePlaceholder(slide) {
+        const artistKey = slide.dataset.artist;
+        if (!artistKey) return;
+        
+        // Find artist in database
+        let artistData = null;
+        try {
+            artistData = await this.loadArtist(artistKey);
+        } catch (error) {
+            console.warn(`Could not load artist data for ${artistKey}:`, error);
+        }
+        
+        if (!artistData) {
+            console.warn(`Artist data not found for: ${artistKey}`);
+            return;
+        }
+        
+        // Get artwork title from slide
+        const artworkTitleElement = slide.querySelector('.artwork-title');
+        const artworkTitle = artworkTitleElement?.textContent;
+        
+        if (!artworkTitle) return;
+        
+        // Find matching artwork
+        const artworkData = artistData.artworks.find(artwork => 
+            artwork.title.toLowerCase() === artworkTitle.toLowerCase()
+        );
+        
+        // A streamed artist's slides may already have been filled in; an artwork
+        // without an image file keeps the slide's own image
+        if (artworkData && artworkData.image && !slide.dataset.artworkLoaded) {
+            slide.dataset.artworkLoaded = 'true';
+            this.replaceSlideImage(slide, artworkData, artistData);
+        }
+    }
+
     replaceSlideImage(slide, artworkData, artistData) {
         const imageContainer = slide.querySelector('.artwork-image');
         const placeholder = slide.querySelector('.image-placeholder');
         
         if (!imageContainer || !placeholder) return;
-        
+
+        // Paint the inline blurred preview and dominant colour while the original loads
+        this.applyPlaceholder(imageContainer, placeholder, artworkData);
+
         // Create image element
         const img = document.createElement('img');
         img.src = artworkData.image;
         img.alt = `${artworkData.title} by ${artistData.name}`;
         img.loading = 'lazy';
+        
+        // Intrinsic size from the database lets the browser reserve layout space
+        if (artworkData.width && artworkData.height) {
+            img.width = artworkData.width;
+            img.height = artworkData.height;
+        }
         img.style.cssText = `
             width: 100%;
             height: 100%;
@@ -118,6 +277,65 @@ class ArtworkLoader {
         
         // Add hover effects
         this.addImageHoverEffects(img, slide);
+        
+        // Large artworks get a full-screen tiled zoom view
+        const zoomEntry = this.deepZoom?.entryFor(artworkData.image);
+        if (zoomEntry) {
+            this.addZoomButton(imageContainer, zoomEntry, img.alt);
+        }
+    }
+
+    enhanceRenderedSlide(slide) {
+        const imageContainer = slide.querySelector('.artwork-image');
+        const img = imageContainer?.querySelector('img');
+        if (!img) return;
+        
+        this.addImageHoverEffects(img, slide);
+        const zoomEntry = this.deepZoom?.entryFor(img.getAttribute('src'));
+        if (zoomEntry) {
+            this.addZoomButton(imageContainer, zoomEntry, img.alt);
+        }
+    }
+
+    addZoomButton(imageContainer, zoomEntry, title) {
+        const button = document.createElement('button');
+        button.className = 'deep-zoom-button';
+        button.textContent = '🔍';
+        button.setAttribute('aria-label', `Zoom into ${title}`);
+        button.style.cssText = `
+            position: absolute;
+            bottom: 0.75rem;
+            right: 0.75rem;
+            width: 2.5rem;
+            height: 2.5rem;
+            border: none;
+            border-radius: 50%;
+            background: rgba(255, 255, 255, 0.85);
+            cursor: pointer;
+            font-size: 1.1rem;
+        `;
+        button.addEventListener('click', event => {
+            event.stopPropagation();
+            this.deepZoom.open(zoomEntry, title);
+        });
+        
+        imageContainer.style.position = 'relative';
+        imageContainer.appendChild(button);
+    }
+
+    applyPlaceholder(imageContainer, placeholder, artworkData) {
+        if (artworkData.palette && artworkData.palette.length) {
+            imageContainer.style.backgroundColor = artworkData.palette[0];
+        }
+        if (!artworkData.placeholder) return;
+
+        placeholder.innerHTML = '';
+        placeholder.style.cssText += `
+            background: ${artworkData.palette?.[0] || 'transparent'} url("${artworkData.placeholder}") center / 100% 100% no-repeat;
+            filter: blur(12px);
+            box-shadow: none;
+            transition: opacity 0.5s ease;
+        `;
     }
 
     addImageHoverEffects(img, slide) {
@@ -308,6 +526,7 @@ class ArtworkLoader {
     // Clean up method
     destroy() {
         this.imageCache.clear();
+        this.artistShards.clear();
     }
 }
 
@@ -0,0 +1,128 @@
+/**
+ * Artwork Search
+ * Searches titles, artists, media, descriptions and bios with the
+ * prebuilt inverted index in search_index.json (see search_index.py),
+ * without loading the artwork database
+ */
+
+class ArtworkSearch {
+    constructor(url = 'search_index.json') {
+        this.url = url;
+        this.index = null;
+        this.loading = null;
+        this.decoded = new Map();
+    }
+
+    load() {
+        // Fetched once, on first use
+        if (!this.loading) {
+            this.loading = fetch(this.url)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then(index => {
+                    this.index = index;
+                    return index;
+                });
+        }
+        return this.loading;
+    }
+
+    tokenize(text) {
+        // Same words as search_index.tokenize(): no accents, apostrophes or stopwords
+        const words = text.toLowerCase()
+            .replace(/['’]/g, '')
+            .normalize('NFKD')
+            .replace(/\p{M}/gu, '')
+            .match(/[\p{L}\p{N}]+/gu) || [];
+        return words.filter(word => word.length > 1 && !ArtworkSearch.STOPWORDS.has(word));
+    }
+
+    termRange(prefix) {
+        // Terms are sorted, so every term starting with prefix follows the first one
+        const terms = this.index.terms;
+        let low = 0;
+        let high = terms.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (terms[mid] < prefix) {
+                low = mid + 1;
+            } else {
+                high = mid;
+            }
+        }
+        let end = low;
+        while (end < terms.length && terms[end].startsWith(prefix)) {
+            end++;
+        }
+        return [low, end];
+    }
+
+    postings(termId) {
+        // [doc, fieldMask] pairs, decoded from the delta-encoded list once per term
+        if (!this.decoded.has(termId)) {
+            const flat = this.index.postings[termId];
+            const pairs = [];
+            let doc = 0;
+            for (let i = 0; i < flat.length; i += 2) {
+                doc += flat[i];
+                pairs.push([doc, flat[i + 1]]);
+            }
+            this.decoded.set(termId, pairs);
+        }
+        return this.decoded.get(termId);
+    }
+
+    fieldScore(mask) {
+        let score = 0;
+        this.index.weights.forEach((weight, bit) => {
+            if (mask & (1 << bit)) score += weight;
+        });
+        return score;
+    }
+
+    search(query, limit = 20) {
+        // Every word must match; a word matching as a prefix scores half an exact match
+        if (!this.index) return [];
+
+        let scores = null;
+        for (const word of this.tokenize(query)) {
+            const wordScores = new Map();
+            const [start, end] = this.termRange(word);
+            for (let termId = start; termId < end; termId++) {
+                const exact = this.index.terms[termId] === word ? 2 : 1;
+                for (const [doc, mask] of this.postings(termId)) {
+                    const score = exact * this.fieldScore(mask);
+                    wordScores.set(doc, Math.max(wordScores.get(doc) || 0, score));
+                }
+            }
+            if (scores === null) {
+                scores = wordScores;
+            } else {
+                const combined = new Map();
+                wordScores.forEach((score, doc) => {
+                    if (scores.has(doc)) combined.set(doc, scores.get(doc) + score);
+                });
+                scores = combined;
+            }
+        }
+
+        return Array.from(scores || [])
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+            .slice(0, limit)
+            .map(([doc, score]) => {
+                const [artist, title] = this.index.docs[doc];
+                return { artist, title, score };
+            });
+    }
+}
+
+ArtworkSearch.STOPWORDS = new Set([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it', 'its',
+    'of', 'on', 'or', 'that', 'the', 'their', 'this', 'through', 'to', 'with'
+]);
+
+window.ArtworkSearch = ArtworkSearch;
@@ -0,0 +1,251 @@
+/**
+ * Deep Zoom Viewer
+ * Full-screen pan and zoom for large artworks, loading only the DZI tiles
+ * that are visible at the current zoom level (see tile_artworks.py)
+ */
+
+class DeepZoomViewer {
+    constructor() {
+        this.manifest = {};
+        this.overlay = null;
+        this.stage = null;
+        this.entry = null;
+        this.tiles = new Map();
+        this.scale = 1;
+        this.offsetX = 0;
+        this.offsetY = 0;
+        this.dragStart = null;
+        this.renderQueued = false;
+
+        this.handleKey = this.handleKey.bind(this);
+    }
+
+    async loadManifest() {
+        try {
+            const response = await fetch('deep_zoom.json');
+            if (response.ok) {
+                this.manifest = await response.json();
+            }
+        } catch (error) {
+            // Deep zoom is optional, the regular images still work without it
+            this.manifest = {};
+        }
+        return this.manifest;
+    }
+
+    entryFor(imagePath) {
+        return this.manifest[imagePath] || null;
+    }
+
+    createOverlay() {
+        this.overlay = document.createElement('div');
+        this.overlay.className = 'deep-zoom-overlay';
+        this.overlay.style.cssText = `
+            position: fixed;
+            inset: 0;
+            z-index: 10000;
+            background: rgba(10, 10, 10, 0.95);
+            overflow: hidden;
+            cursor: grab;
+            touch-action: none;
+        `;
+
+        this.stage = document.createElement('div');
+        this.stage.style.cssText = 'position: absolute; left: 0; top: 0; transform-origin: 0 0;';
+        this.overlay.appendChild(this.stage);
+
+        const closeButton = document.createElement('button');
+        closeButton.textContent = '×';
+        closeButton.setAttribute('aria-label', 'Close zoom view');
+        closeButton.style.cssText = `
+            position: absolute;
+            top: 1rem;
+            right: 1.5rem;
+            z-index: 1;
+            background: none;
+            border: none;
+            color: #fff;
+            font-size: 2.5rem;
+            cursor: pointer;
+        `;
+        closeButton.addEventListener('click', () => this.close());
+        this.overlay.appendChild(closeButton);
+
+        this.overlay.addEventListener('wheel', event => {
+            event.preventDefault();
+            this.zoomAt(event.clientX, event.clientY, event.deltaY < 0 ? 1.25 : 0.8);
+        }, { passive: false });
+
+        this.overlay.addEventListener('pointerdown', event => {
+            if (event.target === closeButton) return;
+            this.dragStart = { x: event.clientX - this.offsetX, y: event.clientY - this.offsetY };
+            this.overlay.setPointerCapture(event.pointerId);
+            this.overlay.style.cursor = 'grabbing';
+        });
+
+        this.overlay.addEventListener('pointermove', event => {
+            if (!this.dragStart) return;
+            this.offsetX = event.clientX - this.dragStart.x;
+            this.offsetY = event.clientY - this.dragStart.y;
+            this.queueRender();
+        });
+
+        this.overlay.addEventListener('pointerup', () => {
+            this.dragStart = null;
+            this.overlay.style.cursor = 'grab';
+        });
+
+        this.overlay.addEventListener('dblclick', event => {
+            this.zoomAt(event.clientX, event.clientY, 2);
+        });
+    }
+
+    open(entry, title) {
+        if (!this.overlay) {
+            this.createOverlay();
+        }
+        this.entry = entry;
+        this.tiles.forEach(tile => tile.remove());
+        this.tiles.clear();
+        this.overlay.setAttribute('aria-label', title || 'Artwork zoom view');
+
+        // Start with the whole artwork fitted to the screen
+        this.scale = Math.min(window.innerWidth / entry.width, window.innerHeight / entry.height);
+        this.offsetX = (window.innerWidth - entry.width * this.scale) / 2;
+        this.offsetY = (window.innerHeight - entry.height * this.scale) / 2;
+
+        document.body.appendChild(this.overlay);
+        document.addEventListener('keydown', this.handleKey);
+        this.render();
+    }
+
+    close() {
+        if (this.overlay && this.overlay.parentElement) {
+            this.overlay.remove();
+        }
+        document.removeEventListener('keydown', this.handleKey);
+    }
+
+    handleKey(event) {
+        const centerX = window.innerWidth / 2;
+        const centerY = window.innerHeight / 2;
+        if (event.key === 'Escape') this.close();
+        if (event.key === '+' || event.key === '=') this.zoomAt(centerX, centerY, 1.25);
+        if (event.key === '-') this.zoomAt(centerX, centerY, 0.8);
+    }
+
+    zoomAt(clientX, clientY, factor) {
+        const fitScale = Math.min(window.innerWidth / this.entry.width, window.innerHeight / this.entry.height);
+        const maxScale = 4 * (window.devicePixelRatio || 1);
+        const newScale = Math.min(maxScale, Math.max(fitScale / 2, this.scale * factor));
+
+        // Keep the point under the cursor fixed while zooming
+        this.offsetX = clientX - (clientX - this.offsetX) * (newScale / this.scale);
+        this.offsetY = clientY - (clientY - this.offsetY) * (newScale / this.scale);
+        this.scale = newScale;
+        this.queueRender();
+    }
+
+    queueRender() {
+        if (this.renderQueued) return;
+        this.renderQueued = true;
+        requestAnimationFrame(() => {
+            this.renderQueued = false;
+            this.render();
+        });
+    }
+
+    levelFor(scale) {
+        // Smallest level that still has at least one source pixel per device pixel
+        const maxLevel = this.entry.levels - 1;
+        const pixelScale = scale * (window.devicePixelRatio || 1);
+        const level = maxLevel + Math.ceil(Math.log2(Math.min(1, pixelScale)));
+        return Math.max(0, Math.min(maxLevel, level));
+    }
+
+    visibleTiles(level) {
+        const entry = this.entry;
+        const levelScale = Math.pow(2, level - (entry.levels - 1));
+        const levelWidth = Math.ceil(entry.width * levelScale);
+        const levelHeight = Math.ceil(entry.height * levelScale);
+
+        // Viewport in level pixels
+        const left = (-this.offsetX / this.scale) * levelScale;
+        const top = (-this.offsetY / this.scale) * levelScale;
+        const right = left + (window.innerWidth / this.scale) * levelScale;
+        const bottom = top + (window.innerHeight / this.scale) * levelScale;
+
+        const size = entry.tileSize;
+        const firstCol = Math.max(0, Math.floor(left / size));
+        const lastCol = Math.min(Math.ceil(levelWidth / size) - 1, Math.floor(right / size));
+        const firstRow = Math.max(0, Math.floor(top / size));
+        const lastRow = Math.min(Math.ceil(levelHeight / size) - 1, Math.floor(bottom / size));
+
+        const tiles = [];
+        for (let row = firstRow; row <= lastRow; row++) {
+            for (let col = firstCol; col <= lastCol; col++) {
+                tiles.push({ level, col, row, levelScale, levelWidth, levelHeight });
+            }
+        }
+        return tiles;
+    }
+
+    placeTile(tile) {
+        const entry = this.entry;
+        const size = entry.tileSize;
+        const overlap = entry.overlap;
+        const key = `${tile.level}/${tile.col}_${tile.row}`;
+
+        let img = this.tiles.get(key);
+        if (!img) {
+            img = document.createElement('img');
+            img.src = `${entry.tiles}/${key}.${entry.format}`;
+            img.alt = '';
+            img.draggable = false;
+            img.style.cssText = 'position: absolute; max-width: none; user-select: none;';
+            this.stage.appendChild(img);
+            this.tiles.set(key, img);
+        }
+
+        // Tile position and size in full-resolution image pixels, trimming the overlap
+        const x = Math.max(0, tile.col * size - (tile.col > 0 ? overlap : 0));
+        const y = Math.max(0, tile.row * size - (tile.row > 0 ? overlap : 0));
+        const width = Math.min(tile.levelWidth, (tile.col + 1) * size + overlap) - x;
+        const height = Math.min(tile.levelHeight, (tile.row + 1) * size + overlap) - y;
+
+        img.style.left = `${x / tile.levelScale}px`;
+        img.style.top = `${y / tile.levelScale}px`;
+        img.style.width = `${width / tile.levelScale}px`;
+        img.style.height = `${height / tile.levelScale}px`;
+        img.style.zIndex = tile.level;
+        return key;
+    }
+
+    render() {
+        if (!this.entry) return;
+
+        this.stage.style.transform = `translate(${this.offsetX}px, ${this.offsetY}px) scale(${this.scale})`;
+
+        // A coarse level stays underneath so there is never a blank gap while sharp tiles load
+        const level = this.levelFor(this.scale);
+        const backdropLevel = Math.min(level, Math.ceil(Math.log2(this.entry.tileSize)));
+        const needed = new Set();
+        for (const tile of this.visibleTiles(backdropLevel)) {
+            needed.add(this.placeTile(tile));
+        }
+        if (level !== backdropLevel) {
+            for (const tile of this.visibleTiles(level)) {
+                needed.add(this.placeTile(tile));
+            }
+        }
+
+        this.tiles.forEach((img, key) => {
+            if (!needed.has(key)) {
+                img.remove();
+                this.tiles.delete(key);
+            }
+        });
+    }
+}
+
+window.DeepZoomViewer = DeepZoomViewer;
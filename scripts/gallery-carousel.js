@@ -81,7 +81,8 @@ class GalleryCarousel {
             // Add click handler for slide interaction
             slide.addEventListener('click', () => {
                 if (!slide.classList.contains('active')) {
-                    this.goToSlide(index);
+                    // Position among the slides the filters leave visible
+                    this.goToSlide(this.getVisibleSlides().indexOf(slide));
                 } else {
                     this.openArtworkModal(slide);
                 }
@@ -181,14 +182,14 @@ class GalleryCarousel {
         console.log('updateCarousel called, current slide:', this.currentSlide);
         console.log('Total slides:', this.totalSlides);
         
-        this.slides.forEach((slide, index) => {
+        // Filtered-out slides take no position; the rest are placed by their index among the visible ones
+        this.slides.forEach(slide => slide.classList.remove('active', 'prev', 'next', 'far'));
+        
+        this.getVisibleSlides().forEach((slide, index) => {
             const diff = index - this.currentSlide;
             
             console.log(`Slide ${index}: diff=${diff}`);
             
-            // Remove all position classes
-            slide.classList.remove('active', 'prev', 'next', 'far');
-            
             // Add appropriate class and transform
             if (diff === 0) {
                 slide.classList.add('active');
@@ -322,33 +323,29 @@ class GalleryCarousel {
         // Reset animation state
         this.isAnimating = false;
         
-        if (chapter === 'all') {
-            this.slides.forEach(slide => {
+        this.applyFilters();
+        console.log('Total visible slides after filter:', this.totalSlides);
+    }
+
+    filterBySearch(matches) {
+        // matches(slide) says if a slide fits the search; null clears it
+        this.searchFilter = matches;
+        this.applyFilters();
+    }
+
+    applyFilters() {
+        // A slide shows when it is in the selected chapter and fits the search
+        this.slides.forEach(slide => {
+            const inChapter = !this.activeChapter || this.activeChapter === 'all' ||
+                              slide.dataset.chapter === this.activeChapter;
+            if (inChapter && (!this.searchFilter || this.searchFilter(slide))) {
                 slide.style.display = 'flex';
                 slide.style.position = 'absolute';
-            });
-        } else {
-            this.slides.forEach(slide => {
-                const slideChapter = slide.dataset.chapter;
-                if (slideChapter === chapter) {
-                    slide.style.display = 'flex';
-                    slide.style.position = 'absolute';
-                } else {
-                    slide.style.display = 'none';
-                }
-            });
-        }
-        
-        // Update slide count and reset to first slide
-        const visibleSlides = this.getVisibleSlides();
-        this.totalSlides = visibleSlides.length;
-        this.currentSlide = 0;
-        
-        console.log('Total visible slides after filter:', this.totalSlides);
-        
-        // Update indicators and carousel
-        this.createIndicators();
-        this.updateCarousel();
+            } else {
+                slide.style.display = 'none';
+            }
+        });
+        this.updateFilteredSlides();
     }
 
     updateTabButtons(activeBtn) {
@@ -501,6 +498,19 @@ class GalleryCarousel {
         document.removeEventListener('keydown', this.handleKeydown);
     }
 
+    getVisibleSlides() {
+        return this.slides.filter(slide => slide.style.display !== 'none');
+    }
+
+    updateFilteredSlides() {
+        // Start again from the first slide left after filtering
+        this.isAnimating = false;
+        this.totalSlides = this.getVisibleSlides().length;
+        this.currentSlide = 0;
+        this.createIndicators();
+        this.updateCarousel();
+    }
+
     getCurrentSlide() {
         return this.currentSlide;
     }
@@ -5,6 +5,7 @@
 document.addEventListener('DOMContentLoaded', function() {
     initViewToggle();
     initModalStyles();
+    initSearchFilter();
 });
 
 // View toggle between carousel and grid
@@ -273,29 +274,69 @@ function initSearchFilter() {
     const searchInput = document.getElementById('artworkSearch');
     if (!searchInput) return;
     
-    searchInput.addEventListener('input', (e) => {
+    // The prebuilt index (search_index.json) is fetched when the search box is first used
+    const artworkSearch = window.ArtworkSearch ? new ArtworkSearch() : null;
+    searchInput.addEventListener('focus', () => {
+        artworkSearch?.load().catch(() => {});
+    }, { once: true });
+    
+    searchInput.addEventListener('input', async (e) => {
         const searchTerm = e.target.value.toLowerCase();
-        const slides = document.querySelectorAll('.artwork-slide');
         
-        slides.forEach(slide => {
+        // Index hits as "artist|title" keys; null falls back to matching the slide text
+        let found = null;
+        const loader = window.artworkLoader;
+        if (artworkSearch && loader && artworkSearch.tokenize(searchTerm).length) {
+            try {
+                await artworkSearch.load();
+                found = new Set(artworkSearch.search(searchTerm, Infinity)
+                    .map(hit => slideSearchKey(loader.artistLookupKey(hit.artist), hit.title)));
+            } catch (error) {
+                console.warn('Search index unavailable, matching slide text instead');
+            }
+        }
+        
+        // A later keystroke has already filtered the slides
+        if (searchInput.value.toLowerCase() !== searchTerm) return;
+        
+        const slides = Array.from(document.querySelectorAll('.artwork-slide'));
+        const textMatches = slide => {
             const title = slide.querySelector('.artwork-title').textContent.toLowerCase();
             const artist = slide.querySelector('.artist-name').textContent.toLowerCase();
             const medium = slide.querySelector('.artwork-medium').textContent.toLowerCase();
-            
-            const matches = title.includes(searchTerm) || 
-                          artist.includes(searchTerm) || 
-                          medium.includes(searchTerm);
-            
-            slide.style.display = matches ? 'flex' : 'none';
-        });
+            return title.includes(searchTerm) || artist.includes(searchTerm) || medium.includes(searchTerm);
+        };
+        
+        let matches = null;
+        if (searchTerm) {
+            matches = textMatches;
+            if (found) {
+                const slideKey = slide => slideSearchKey(
+                    loader.artistLookupKey(slide.dataset.artist || ''),
+                    slide.querySelector('.artwork-title').textContent);
+                const hitSlides = new Set(slides.filter(slide => found.has(slideKey(slide))));
+                const mapped = new Set(Array.from(hitSlides, slideKey));
+                // Titles on the page can differ from the catalog's; hits no slide carries fall back to the text
+                const allMapped = mapped.size === found.size;
+                matches = slide => hitSlides.has(slide) || (!allMapped && textMatches(slide));
+            }
+        }
         
-        // Update carousel if filtering affected visible slides
+        // The carousel combines the search with the selected chapter
         if (window.galleryCarousel) {
-            window.galleryCarousel.updateFilteredSlides();
+            window.galleryCarousel.filterBySearch(matches);
+        } else {
+            slides.forEach(slide => {
+                slide.style.display = !matches || matches(slide) ? 'flex' : 'none';
+            });
         }
     });
 }
 
+function slideSearchKey(artistKey, title) {
+    return `${artistKey}|${title.trim().toLowerCase()}`;
+}
+
 // Export functions for use in other scripts
 window.galleryUtils = {
     populateGrid,
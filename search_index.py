@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Client-side search index for the Sensitive Beings artworks.
+Titles, artist names, media, descriptions and artist bios are tokenized
+into an inverted index written as search_index.json (with precompressed
+siblings, see database_shards.py). Terms are sorted, so a term's position
+is its ID and every term starting with a prefix sits in one contiguous
+run. Postings are flat [document gap, field mask, ...] lists, document
+ids being delta-encoded in display order. scripts/artwork-search.js runs
+the same search in the browser without loading the catalog.
+"""
+
+import re
+import sys
+import json
+import time
+import bisect
+import argparse
+import unicodedata
+
+from catalog_store import database_chapters
+
+SEARCH_INDEX = "search_index.json"
+SEARCH_INDEX_VERSION = 1
+
+# Indexed fields in bit order, with the score a match in each is worth
+SEARCH_FIELDS = ['title', 'artist', 'medium', 'description', 'bio']
+FIELD_WEIGHTS = [8, 6, 4, 2, 1]
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into', 'is', 'it', 'its',
+    'of', 'on', 'or', 'that', 'the', 'their', 'this', 'through', 'to', 'with'
+}
+
+WORD = re.compile(r"[^\W_]+")
+
+def tokenize(text):
+    """Lowercase words of text without accents, apostrophes or stopwords ("We’ve" -> weve)"""
+    text = unicodedata.normalize('NFKD', text.lower().replace("'", '').replace('’', ''))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [word for word in WORD.findall(text) if len(word) > 1 and word not in STOPWORDS]
+
+def build_search_index(database):
+    """The search index of a database in the artwork_database.json shape"""
+    docs = []
+    postings = {}
+    for _, chapter in database_chapters(database):
+        for artist in chapter['artists']:
+            for artwork in artist.get('artworks', []):
+                doc = len(docs)
+                docs.append([artist['key'], artwork['title']])
+                values = [artwork.get('title', ''), artist.get('name', ''), artwork.get('medium', ''),
+                          artwork.get('description', ''), artist.get('bio', '')]
+                for bit, value in enumerate(values):
+                    for term in tokenize(value or ''):
+                        masks = postings.setdefault(term, {})
+                        masks[doc] = masks.get(doc, 0) | (1 << bit)
+
+    terms = sorted(postings)
+    encoded = []
+    for term in terms:
+        flat = []
+        previous = 0
+        for doc in sorted(postings[term]):
+            flat += [doc - previous, postings[term][doc]]
+            previous = doc
+        encoded.append(flat)
+
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'fields': SEARCH_FIELDS,
+        'weights': FIELD_WEIGHTS,
+        'docs': docs,
+        'terms': terms,
+        'postings': encoded
+    }
+
+def term_range(terms, prefix):
+    """IDs of the terms starting with prefix"""
+    start = bisect.bisect_left(terms, prefix)
+    end = start
+    while end < len(terms) and terms[end].startswith(prefix):
+        end += 1
+    return range(start, end)
+
+def search(index, query, limit=20):
+    """
+    (score, doc) pairs of the documents matching every word of query, best
+    first. Each word also matches the terms it is a prefix of, for half
+    the score of an exact match.
+    """
+    scores = None
+    for word in tokenize(query):
+        word_scores = {}
+        for term_id in term_range(index['terms'], word):
+            exact = 2 if index['terms'][term_id] == word else 1
+            postings = index['postings'][term_id]
+            doc = 0
+            for i in range(0, len(postings), 2):
+                doc += postings[i]
+                mask = postings[i + 1]
+                score = exact * sum(weight for bit, weight in enumerate(index['weights']) if mask & (1 << bit))
+                word_scores[doc] = max(word_scores.get(doc, 0), score)
+        if scores is None:
+            scores = word_scores
+        else:
+            scores = {doc: scores[doc] + score for doc, score in word_scores.items() if doc in scores}
+
+    ranked = sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [(score, index['docs'][doc]) for doc, score in ranked]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Search artworks with the prebuilt index, as the website does")
+    parser.add_argument("query", nargs="+", help="words to search for; each also matches as a prefix")
+    parser.add_argument("--index", default=SEARCH_INDEX, help=f"search index to use (default: {SEARCH_INDEX})")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    try:
+        with open(args.index, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        print(f"❌ Search index not found: {args.index} (python3 database_shards.py writes it)")
+        sys.exit(1)
+
+    query = ' '.join(args.query)
+    start = time.perf_counter()
+    results = search(index, query)
+    elapsed = (time.perf_counter() - start) * 1e6
+    print(f"🔎 {query}: {len(results)} artworks ({elapsed:.0f} µs over {len(index['terms'])} terms)")
+    for score, (artist, title) in results:
+        print(f"  {score:3d}  {title} ({artist})")
+
+if __name__ == "__main__":
+    main()
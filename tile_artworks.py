@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Build deep-zoom tile pyramids for the Sensitive Beings exhibition website.
+Large artworks from artwork_database.json are cut into DZI tile pyramids
+under images/tiles and listed in deep_zoom.json, so the artwork viewer only
+downloads the tiles visible at the current zoom instead of the whole image.
+
+Uses pyvips (pip install pyvips), which streams the source row by row so
+even huge scans never sit fully in memory. Pillow cannot decode part of a
+PNG or JPEG, so without pyvips only sources up to PILLOW_MAX_PIXELS are
+tiled (decoded once, then one level at a time); larger ones fail with a
+message asking for pyvips instead of exhausting memory.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import shutil
+import argparse
+from pathlib import Path
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+from build_cache import BuildState
+from image_probe import probe_image
+from parallel_jobs import run_tasks, report_errors
+
+TILES_DIR = "images/tiles"
+DEEP_ZOOM_MANIFEST = "deep_zoom.json"
+
+# Bump when tiles_base_for() names pyramids differently so they are rebuilt
+TILES_LAYOUT = 2
+
+# 254 + 1px overlap on each side gives 256px tiles, the usual DZI setting
+TILE_SIZE = 254
+TILE_OVERLAP = 1
+TILE_FORMAT = 'jpg'
+TILE_QUALITY = 85
+
+# Below this many pixels on the longest side the normal image is sharp enough
+MIN_ZOOM_SIZE = 2500
+
+# Largest source the Pillow fallback decodes whole (about 120 MB as RGB)
+PILLOW_MAX_PIXELS = 40_000_000
+
+DZI_NAMESPACE = "http://schemas.microsoft.com/deepzoom/2008"
+
+def tiles_base_for(source):
+    """
+    images/tiles/<source path with its extension folded in>, made URL-safe,
+    so foo.png and foo.jpg get their own pyramids; .dzi and _files/ hang off it
+    """
+    stem, suffix = os.path.splitext(Path(source).as_posix())
+    stem = f"{stem}_{suffix.lstrip('.')}" if suffix else stem
+    if stem.startswith('images/'):
+        stem = stem[len('images/'):]
+    return Path(TILES_DIR) / re.sub(r'[^A-Za-z0-9._/-]+', '_', stem)
+
+def pyramid_levels(width, height):
+    """Number of DZI levels; level 0 is 1x1 and the last level is full size"""
+    return math.ceil(math.log2(max(width, height))) + 1
+
+def level_size(width, height, level, levels):
+    scale = 2 ** (levels - 1 - level)
+    return math.ceil(width / scale), math.ceil(height / scale)
+
+def write_dzi(path, width, height, tile_size, overlap, fmt):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<Image xmlns="{DZI_NAMESPACE}" Format="{fmt}" Overlap="{overlap}" TileSize="{tile_size}">\n')
+        f.write(f'  <Size Width="{width}" Height="{height}"/>\n')
+        f.write('</Image>\n')
+
+def save_tiles(img, level_dir, tile_size, overlap, fmt, quality):
+    """Cut one pyramid level into tiles named <col>_<row>.<fmt>"""
+    level_dir.mkdir(parents=True, exist_ok=True)
+    columns = math.ceil(img.width / tile_size)
+    rows = math.ceil(img.height / tile_size)
+
+    for row in range(rows):
+        top = max(0, row * tile_size - overlap)
+        bottom = min(img.height, (row + 1) * tile_size + overlap)
+        for col in range(columns):
+            left = max(0, col * tile_size - overlap)
+            right = min(img.width, (col + 1) * tile_size + overlap)
+            tile = img.crop((left, top, right, bottom))
+            tile.save(level_dir / f"{col}_{row}.{fmt}", 'JPEG' if fmt == 'jpg' else fmt.upper(), quality=quality)
+
+def tile_with_pyvips(source, base, tile_size, overlap, fmt, quality):
+    image = pyvips.Image.new_from_file(str(source), access='sequential')
+    # Rotating needs random access, so only give up streaming when EXIF asks for it
+    if image.get_typeof('orientation') and image.get('orientation') != 1:
+        image = pyvips.Image.new_from_file(str(source)).autorot()
+    image.dzsave(str(base), tile_size=tile_size, overlap=overlap,
+                 suffix=f".{fmt}[Q={quality}]", depth='onepixel', layout='dz')
+    return image.width, image.height
+
+def tile_with_pillow(source, base, tile_size, overlap, fmt, quality):
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        if fmt == 'jpg' and img.mode != 'RGB':
+            img = img.convert('RGB')
+        width, height = img.size
+
+        # Each level is halved from the one above, so only two levels are ever held
+        levels = pyramid_levels(width, height)
+        files_dir = Path(f"{base}_files")
+        level = img
+        for index in reversed(range(levels)):
+            size = level_size(width, height, index, levels)
+            if level.size != size:
+                level = level.resize(size, Image.LANCZOS)
+            save_tiles(level, files_dir / str(index), tile_size, overlap, fmt, quality)
+
+    write_dzi(f"{base}.dzi", width, height, tile_size, overlap, fmt)
+    return width, height
+
+def tile_image(source, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, fmt=TILE_FORMAT, quality=TILE_QUALITY):
+    """Build the DZI pyramid for one image; returns its manifest entry"""
+    base = tiles_base_for(source)
+    base.parent.mkdir(parents=True, exist_ok=True)
+
+    # Tiles from an earlier, differently sized source would otherwise linger
+    files_dir = Path(f"{base}_files")
+    if files_dir.exists():
+        shutil.rmtree(files_dir)
+
+    if pyvips is not None:
+        width, height = tile_with_pyvips(source, base, tile_size, overlap, fmt, quality)
+    else:
+        info = probe_image(source)
+        if info and info['width'] * info['height'] > PILLOW_MAX_PIXELS:
+            raise ValueError(f"{info['width']}x{info['height']} is too large to decode whole with Pillow; "
+                             f"install pyvips (pip install pyvips) to tile it in strips")
+        width, height = tile_with_pillow(source, base, tile_size, overlap, fmt, quality)
+
+    return {
+        'dzi': f"{base.as_posix()}.dzi",
+        'tiles': f"{base.as_posix()}_files",
+        'width': width,
+        'height': height,
+        'tileSize': tile_size,
+        'overlap': overlap,
+        'format': fmt,
+        'quality': quality,
+        'levels': pyramid_levels(width, height)
+    }
+
+def select_artworks(database, titles, min_size):
+    """
+    (artist key, artwork) pairs worth tiling: the named titles, or every
+    artwork whose image is at least min_size pixels on its longest side.
+    """
+    wanted = {title.lower() for title in titles}
+    selected = []
+
+    for chapter in database.values():
+        for artist in chapter.get('artists', []):
+            for artwork in artist.get('artworks', []):
+                image = artwork.get('image')
+                if not image or not os.path.isfile(image):
+                    continue
+                if wanted:
+                    if artwork['title'].lower() in wanted:
+                        selected.append((artist['key'], artwork))
+                    continue
+                # Header probe only, so scanning every artwork stays cheap
+                info = probe_image(image)
+                if info and max(info['width'], info['height']) >= min_size:
+                    selected.append((artist['key'], artwork))
+    return selected
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build deep-zoom tile pyramids for large artworks")
+    parser.add_argument("--artwork", action="append", default=[], metavar="TITLE",
+                        help="tile this artwork regardless of size (repeatable)")
+    parser.add_argument("--min-size", type=int, default=MIN_ZOOM_SIZE,
+                        help=f"tile artworks at least this many pixels on the longest side (default: {MIN_ZOOM_SIZE})")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help=f"tile size in pixels (default: {TILE_SIZE})")
+    parser.add_argument("--quality", type=int, default=TILE_QUALITY, help=f"JPEG tile quality (default: {TILE_QUALITY})")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="worker processes (0 = one per CPU, default: 1)")
+    parser.add_argument("--force", action="store_true", help="rebuild every pyramid")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if pyvips is None and Image is None:
+        print("❌ pyvips or Pillow is required to build tiles: pip install pyvips")
+        sys.exit(1)
+    if pyvips is None:
+        print(f"⚠️  pyvips not found, using Pillow for sources up to {PILLOW_MAX_PIXELS // 1_000_000} MP "
+              f"(larger ones need pyvips)")
+
+    with open('artwork_database.json', 'r', encoding='utf-8') as f:
+        database = json.load(f)
+
+    manifest = {}
+    if os.path.exists(DEEP_ZOOM_MANIFEST):
+        with open(DEEP_ZOOM_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    state = BuildState(force=args.force)
+    params = {'tile_size': args.tile_size, 'overlap': TILE_OVERLAP, 'format': TILE_FORMAT, 'quality': args.quality,
+              'layout': TILES_LAYOUT}
+    selected = select_artworks(database, args.artwork, args.min_size)
+
+    # Pyramids are only rebuilt when the source image or tiling settings changed
+    stale = [(key, artwork) for key, artwork in selected
+             if not (artwork['image'] in manifest and state.is_fresh(f"tile:{artwork['image']}", [artwork['image']], params))]
+    print(f"🔍 {len(selected)} artworks need deep zoom, {len(stale)} to tile")
+
+    tasks = [(artwork['image'], args.tile_size, TILE_OVERLAP, TILE_FORMAT, args.quality) for _, artwork in stale]
+    results = run_tasks(tile_image, tasks, args.jobs)
+
+    errors = []
+    for (key, artwork), (entry, error) in zip(stale, results):
+        if error:
+            errors.append((artwork['image'], error))
+            continue
+        entry = {'artist': key, 'title': artwork['title'], **entry}
+        manifest[artwork['image']] = entry
+        state.record(f"tile:{artwork['image']}", [artwork['image']], [entry['dzi']], params)
+        print(f"🧩 {artwork['title']}: {entry['width']}x{entry['height']}, {entry['levels']} levels")
+
+    manifest = {artwork['image']: manifest[artwork['image']] for _, artwork in selected if artwork['image'] in manifest}
+    with open(DEEP_ZOOM_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    state.save()
+
+    print(f"✅ {len(manifest)} deep-zoom pyramids listed in {DEEP_ZOOM_MANIFEST}")
+    if report_errors(errors):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()